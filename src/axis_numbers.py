@@ -0,0 +1,122 @@
+import math
+
+import numpy as np
+from matplotlib.artist import Artist
+from matplotlib.colors import to_rgba
+from matplotlib.font_manager import FontProperties
+from matplotlib.path import Path
+from matplotlib.textpath import TextPath
+from matplotlib.transforms import IdentityTransform
+
+from cache import LRUCache
+
+# Minimum on-screen spacing, in pixels, between neighbouring axis numbers and grid lines
+X_LABEL_SPACING = 40
+Y_LABEL_SPACING = 20
+GRID_SPACING = 5
+
+# Tick values and label strings keyed on (start, stop, step)
+_label_cache = LRUCache(maxsize=64)
+# Glyph outlines keyed on (label, font size, dpi)
+_glyph_cache = LRUCache(maxsize=1024)
+
+
+def thinned_step(axis_min, axis_max, step, pixel_length, min_spacing):
+    # Widens step by a whole factor so no more than one tick falls in each min_spacing pixels.
+    count = (axis_max - axis_min) / step + 1
+    max_count = max(pixel_length / min_spacing, 2)
+    if count <= max_count:
+        return step
+    return step * math.ceil(count / max_count)
+
+
+def tick_values(axis_min, axis_max, step):
+    # Multiples of step covering [axis_min, axis_max], so the grid moves with the graph when panned.
+    first = math.ceil(axis_min / step - 1e-9)
+    last = math.floor(axis_max / step + 1e-9)
+    return np.arange(first, last + 1) * step
+
+
+def format_number(value):
+    return str(int(value)) if float(value).is_integer() else f"{value:.2f}"
+
+
+def axis_labels(axis_min, axis_max, step):
+    # Returns the non-zero tick values and their label strings, cached per (range, step).
+    key = (float(axis_min), float(axis_max), float(step))
+    cached = _label_cache.get(key)
+    if cached is None:
+        values = tick_values(axis_min, axis_max, step)
+        values = values[values != 0]
+        cached = (values, [format_number(value) for value in values])
+        _label_cache.put(key, cached)
+
+    return cached
+
+
+def _glyphs(label, fontsize, dpi):
+    # Outline of a label in pixels, with its origin at the label's bounding-box corner (xmin, ymin).
+    key = (label, fontsize, dpi)
+    cached = _glyph_cache.get(key)
+    if cached is None:
+        path = TextPath((0, 0), label, size=fontsize * dpi / 72, prop=FontProperties())
+        vertices = path.vertices.copy()
+        extents = path.get_extents()
+        vertices -= (extents.x0, extents.y0)
+        cached = (vertices, path.codes, extents.width, extents.height)
+        _glyph_cache.put(key, cached)
+
+    return cached
+
+
+class AxisNumbers(Artist):
+    # Draws a whole axis of numbers as one compound glyph path instead of one Text per tick.
+
+    def __init__(self, ax, fontsize=7, ha="center", va="center", color="grey"):
+        super().__init__()
+        self.ax = ax
+        self.fontsize = fontsize
+        self.ha = ha
+        self.va = va
+        self.color = to_rgba(color)
+        self.positions = np.empty((0, 2))
+        self.labels = []
+
+    def set_labels(self, positions, labels):
+        self.positions = positions
+        self.labels = labels
+        self.stale = True
+
+    def draw(self, renderer):
+        if not self.get_visible() or not self.labels:
+            return
+
+        dpi = self.figure.dpi
+        anchors = self.ax.transData.transform(self.positions)
+        vertices, codes = [], []
+
+        for (x, y), label in zip(anchors, self.labels):
+            glyph_vertices, glyph_codes, width, height = _glyphs(label, self.fontsize, dpi)
+
+            if self.ha == "center":
+                x -= width / 2
+            elif self.ha == "right":
+                x -= width
+
+            if self.va == "center":
+                y -= height / 2
+            elif self.va == "top":
+                y -= height
+
+            vertices.append(glyph_vertices + (round(x), round(y)))
+            codes.append(glyph_codes)
+
+        path = Path(np.concatenate(vertices), np.concatenate(codes))
+
+        gc = renderer.new_gc()
+        gc.set_linewidth(0)
+        gc.set_foreground(self.color)
+        renderer.draw_path(gc, path, IdentityTransform(), self.color)
+        gc.restore()
+
+        self.stale = False
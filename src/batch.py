@@ -0,0 +1,214 @@
+import argparse
+import json
+import os
+import sys
+from collections import deque
+
+import core
+
+# What --ops can ask for, and the default
+OPERATIONS = ("roots", "extrema", "derivative", "area")
+# Results computed ahead of the one being written, per worker process
+WINDOW_PER_JOB = 4
+DEFAULT_TIMEOUT = 10
+# Longest wait for a result before running equations' time budgets are checked again
+POLL_INTERVAL = 0.05
+
+
+def equations(lines):
+    # (line number, equation text) for each line holding an equation; blank lines and
+    # lines starting with # are skipped but still counted.
+    for number, line in enumerate(lines, 1):
+        text = line.strip()
+        if text and not text.startswith("#"):
+            yield number, text
+
+
+def process(item):
+    # The output record for one equation. Runs in a worker process, which is stopped if it
+    # overruns the equation's time budget.
+    number, text, options = item
+    record = {"line": number, "equation": text}
+
+    try:
+        parsed = core.parse(text)
+    except Exception as e:
+        parsed, record["error"] = None, f"could not parse: {e}"
+    if parsed is None:
+        record.setdefault("error", "could not parse")
+        return record
+
+    record["type"] = parsed[0]
+    try:
+        if options["render"]:
+            record["file"] = _render(number, parsed, options)
+        else:
+            record.update(_results(parsed, options))
+    except Exception as e:
+        record["error"] = str(e) or type(e).__name__
+
+    return record
+
+
+def _results(parsed, options):
+    x_range, mode = options["x_range"], options["mode"]
+    results = {}
+
+    if "roots" in options["ops"]:
+        results["roots"] = [core.json_number(x) for x in core.roots(parsed, x_range, mode)]
+
+    if "extrema" in options["ops"]:
+        maxima, minima = core.extrema(parsed, mode)
+        results["maxima"] = [[core.json_number(x), core.json_number(y)] for x, y in maxima]
+        results["minima"] = [[core.json_number(x), core.json_number(y)] for x, y in minima]
+
+    if "derivative" in options["ops"]:
+        results["derivative"] = str(core.differentiate(parsed))
+
+    if "area" in options["ops"]:
+        area, error = core.area(parsed, x_range=x_range, mode=mode, area_mode=options["area_mode"])
+        results["area"] = None if area is None else core.json_number(area)
+        if area is not None and not isinstance(area, float):
+            results["area_exact"] = str(area)
+        results["area_error"] = core.json_number(error)
+
+    return results
+
+
+def _render(number, parsed, options):
+    path = os.path.join(options["output_dir"], f"{number:06d}.{options['render']}")
+    data = core.render_graph([parsed], options["viewport"], options["render"],
+                             unit_mode=options["unit_mode"])
+    with open(path, "wb") as file:
+        file.write(data)
+    return path
+
+
+def records(lines, options, jobs=1):
+    # Output records in input order. jobs worker processes each take one equation after
+    # another; one that overruns the --timeout budget is stopped, so nothing it started
+    # keeps running, and replaced for the next equation. Input is read only as far ahead as
+    # the results in flight, so memory stays bounded however long the input is.
+    from multiprocessing.connection import wait
+    from tasks import Worker, preload
+
+    if options["render"]:
+        preload(*core.RENDER_MODULES)
+    items = equations(lines)
+    workers = [Worker(process, options["timeout"]) for _ in range(jobs)]
+    # [item, record] in input order, the record None until it is done; queued entries are
+    # not yet given to a worker, and assigned maps each busy worker to its entry
+    pending = deque()
+    queued = deque()
+    assigned = {}
+    try:
+        while True:
+            while len(pending) < jobs * WINDOW_PER_JOB:
+                item = next(items, None)
+                if item is None:
+                    break
+                entry = [item, None]
+                pending.append(entry)
+                queued.append(entry)
+            if not pending:
+                return
+
+            # Polling busy workers enforces their budgets
+            for worker in workers:
+                if worker.busy() and worker.poll():
+                    entry = assigned.pop(worker)
+                    entry[1] = _outcome(entry[0], worker, options)
+                if not worker.busy() and queued:
+                    entry = queued.popleft()
+                    assigned[worker] = entry
+                    worker.submit(((*entry[0], options),))
+
+            if pending[0][1] is None:
+                wait([worker.conn for worker in assigned], POLL_INTERVAL)
+            while pending and pending[0][1] is not None:
+                yield pending.popleft()[1]
+    finally:
+        for worker in workers:
+            worker.close()
+
+
+def _outcome(item, worker, options):
+    # The record a worker produced, or one reporting why it did not.
+    from tasks import TaskError, TaskTimeout
+
+    number, text = item
+    try:
+        return worker.result()
+    except TaskTimeout:
+        error = f"timed out after {options['timeout']:g} seconds"
+    except TaskError as e:
+        error = str(e)
+    return {"line": number, "equation": text, "error": error}
+
+
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Render or solve equations, one per line, without the GUI. "
+                    "Writes one JSON object per equation to standard output."
+    )
+    parser.add_argument("input", nargs="?", default="-",
+                        help="file of equations, one per line (default: standard input)")
+    parser.add_argument("--ops", default=",".join(OPERATIONS),
+                        help=f"comma-separated results to compute, from {', '.join(OPERATIONS)} (default: all)")
+    parser.add_argument("--render", choices=("png", "svg"),
+                        help="draw each equation to a file in --output-dir instead of computing results")
+    parser.add_argument("-o", "--output-dir", default=".", help="directory for rendered plots (default: .)")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="worker processes (default: 1)")
+    parser.add_argument("--mode", choices=("auto", "symbolic", "numeric"), default="auto",
+                        help="solving mode, as in the calculator's settings (default: auto)")
+    parser.add_argument("--true-area", action="store_true",
+                        help="count area below the x-axis as positive instead of letting it cancel")
+    parser.add_argument("--x-range", type=float, nargs=2, default=(-10, 10), metavar=("MIN", "MAX"),
+                        help="x interval for roots, areas and plots (default: -10 10)")
+    parser.add_argument("--y-range", type=float, nargs=2, default=(-10, 10), metavar=("MIN", "MAX"),
+                        help="y interval for plots (default: -10 10)")
+    parser.add_argument("--size", type=int, nargs=2, default=(800, 600), metavar=("WIDTH", "HEIGHT"),
+                        help="plot size in pixels (default: 800 600)")
+    parser.add_argument("--degrees", action="store_true", help="plot trigonometric functions in degrees")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT,
+                        help=f"seconds allowed per equation (default: {DEFAULT_TIMEOUT})")
+    args = parser.parse_args(argv)
+
+    ops = [op.strip() for op in args.ops.split(",") if op.strip()]
+    unknown = set(ops) - set(OPERATIONS)
+    if unknown:
+        parser.error(f"unknown operation(s): {', '.join(sorted(unknown))}")
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+
+    return args, {
+        "ops": tuple(ops),
+        "render": args.render,
+        "output_dir": args.output_dir,
+        "mode": args.mode,
+        "area_mode": "true" if args.true_area else "net",
+        "x_range": tuple(args.x_range),
+        "viewport": (*args.x_range, *args.y_range, *args.size),
+        "unit_mode": "degrees" if args.degrees else "radians",
+        "timeout": args.timeout,
+    }
+
+
+def main(argv=None, stdout=None):
+    args, options = parse_arguments(argv)
+    stdout = stdout or sys.stdout
+    if options["render"]:
+        os.makedirs(options["output_dir"], exist_ok=True)
+
+    lines = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    try:
+        for record in records(lines, options, args.jobs):
+            stdout.write(json.dumps(record, ensure_ascii=False) + "\n")
+            stdout.flush()
+    finally:
+        if lines is not sys.stdin:
+            lines.close()
+
+
+if __name__ == "__main__":
+    main()
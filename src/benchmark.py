@@ -0,0 +1,386 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+# Benchmarks drive the real GraphCanvas and MainWindow; with no display Qt renders offscreen
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+# Equations parsed by the parse benchmark, covering each path through the parser
+CORPUS = (
+    "2x+3", "x^2-4", "x^3-2x", "x^4-5x^2+4", "x^5-x", "1/x", "1/x^2", "2^x", "e^x", "lnx",
+    "log[2](x)", "sinx", "cosx", "tanx", "arcsinx", "arctanx", "x*sin(x)", "x*e^(-x^2)",
+    "sqrt(x)", "abs(x)-2", "sin(2x)+cos(3x)", "(x^2+1)/(x-1)",
+)
+# One equation per family drawn by plot_equation
+FAMILIES = {
+    "linear": "2x+3",
+    "quadratic": "x^2-4",
+    "cubic": "x^3-2x",
+    "quartic": "x^4-5x^2+4",
+    "polynomial": "x^5-3x^3+x",
+    "rational": "(x^2+1)/(x-1)",
+    "exponential": "e^x",
+    "logarithmic": "lnx",
+    "trigonometric": "sin(2x)+cos(3x)",
+    "poles": "tanx",
+    "inverse_trig": "arcsinx",
+    "implicit_circle": "x^2+y^2=25",
+    "implicit_trigonometric": "sin(xy)=0.5",
+    "parametric": "x=cos(3t),y=sin(2t)",
+    "polar": "r=1+cos(theta)",
+}
+# Grid steps for plot_default_graph; small steps are thinned to the pixel density
+GRID_STEPS = (0.1, 0.5, 1, 5)
+# Zoom factors applied in turn, as by the toolbar buttons
+ZOOM_SEQUENCES = {
+    "in": (0.5,) * 5,
+    "out": (2,) * 5,
+    "in_and_out": (0.5, 0.5, 2, 2, 2, 2, 0.5, 0.5),
+}
+# Equations for the maths operations
+OPERATION_EQUATIONS = ("x^2-4", "x^3-2x", "x^4-5x^2+4", "sinx", "x*e^(-x^2)")
+AREA_EQUATIONS = (("x^2-4", "", ""), ("sinx", "0", "3.14159"), ("x*e^(-x^2)", "-2", "2"))
+
+DEFAULT_REPEAT = 5
+DEFAULT_THRESHOLD = 0.25
+# Cheap calls are looped until one measurement takes at least this long
+MIN_MEASUREMENT = 0.02
+
+
+class Benchmark:
+    # A named call to time. reset() runs before each measurement, untimed, to return state
+    # (caches, viewport) to where the measurement should start.
+
+    def __init__(self, name, func, reset=None):
+        self.name = name
+        self.func = func
+        self.reset = reset
+
+    def measure(self, repeat):
+        # Seconds per call for each of repeat measurements, after one untimed warm-up call.
+        if self.reset:
+            self.reset()
+        self.func()
+
+        # Calls that need a reset between them cannot be looped
+        number = 1
+        if self.reset is None:
+            start = time.perf_counter()
+            self.func()
+            once = time.perf_counter() - start
+            number = max(1, int(MIN_MEASUREMENT / max(once, 1e-9)))
+
+        times = []
+        for _ in range(repeat):
+            if self.reset:
+                self.reset()
+            start = time.perf_counter()
+            for _ in range(number):
+                self.func()
+            times.append((time.perf_counter() - start) / number)
+        return times, number
+
+
+class Fixture:
+    # The window and canvas the GUI benchmarks run against, built once on first use.
+
+    def __init__(self):
+        self.app = None
+        self.window = None
+
+    @property
+    def canvas(self):
+        if self.window is None:
+            from PyQt5.QtWidgets import QApplication
+            from gui import MainWindow
+            self.app = QApplication.instance() or QApplication([])
+            self.window = MainWindow()
+            self.window.show()
+            self.app.processEvents()
+        return self.window.graph_canvas
+
+    def show(self, *equations):
+        # Makes these the window's equations, as if typed into the equation boxes.
+        import core
+        model = self.window.equations
+        rows = []
+        for index, text in enumerate(equations):
+            equation = model.create(text)
+            equation.equation_type, equation.coefficients, _, equation.indep_var = core.parse(text)
+            equation.color = core.PALETTE[index % len(core.PALETTE)]
+            rows.append(equation)
+        model.clear()
+        model.append(rows)
+
+    def clear_samples(self):
+        canvas = self.canvas
+        canvas.tile_cache.clear()
+        canvas.contour_cache.clear()
+        canvas.parametric_cache.clear()
+        canvas.sampled_state.clear()
+
+
+def parse_benchmarks(fixture):
+    from calculations import clear_caches, parse_equation
+
+    def parse_corpus():
+        for text in CORPUS:
+            parse_equation("y=" + text)
+
+    yield Benchmark("parse/corpus", parse_corpus, clear_caches)
+    yield Benchmark("parse/corpus_cached", parse_corpus)
+
+
+def plot_equation_benchmarks(fixture):
+    import core
+
+    for family, text in FAMILIES.items():
+        def plot(parsed=core.parse(text)):
+            equation_type, coefficients, _, indep_var = parsed
+            fixture.canvas.plot_equation(equation_type, coefficients, indep_var, "#1f77b4", key="benchmark")
+
+        yield Benchmark(f"plot_equation/{family}", plot, fixture.clear_samples)
+
+
+def plot_default_graph_benchmarks(fixture):
+
+    for step in GRID_STEPS:
+        def reset(step=step):
+            canvas = fixture.canvas
+            fixture.show()
+            canvas.set_view(-10, 10, -10, 10)
+            canvas.x_step = canvas.y_step = step
+
+        def draw():
+            fixture.canvas.plot_default_graph()
+            fixture.canvas.flush_redraw()
+
+        yield Benchmark(f"plot_default_graph/step_{step:g}", draw, reset)
+
+
+def zoom_benchmarks(fixture):
+
+    def reset():
+        fixture.canvas
+        fixture.show("x^2-4", "sinx", "1/x")
+        fixture.window.reset_zoom()
+        fixture.canvas.flush_redraw()
+        fixture.clear_samples()
+
+    for name, factors in ZOOM_SEQUENCES.items():
+        def zoom(factors=factors):
+            for factor in factors:
+                fixture.canvas.zoom_view(factor)
+                fixture.canvas.flush_redraw()
+
+        yield Benchmark(f"zoom_view/{name}", zoom, reset)
+
+
+def operation_benchmarks(fixture):
+    import sympy as sp
+    import core
+    from operations import equation_area, find_maximum, find_minimum, solve_equation
+
+    # sympy caches results between calls; each measurement starts from an empty cache
+    reset = sp.core.cache.clear_cache
+    parsed = [core.parse(text) for text in OPERATION_EQUATIONS]
+
+    def run(operation):
+        def call():
+            for equation_type, coefficients, _, indep_var in parsed:
+                operation(equation_type, coefficients, indep_var)
+        return call
+
+    yield Benchmark("solve_equation", run(solve_equation), reset)
+    yield Benchmark("find_maximum", run(find_maximum), reset)
+    yield Benchmark("find_minimum", run(find_minimum), reset)
+
+    def area():
+        for text, lower, upper in AREA_EQUATIONS:
+            equation_area(text, core.parse(text), lower, upper)
+
+    yield Benchmark("perform_area_operation", area, reset)
+
+
+GROUPS = {
+    "parse": parse_benchmarks,
+    "plot_equation": plot_equation_benchmarks,
+    "plot_default_graph": plot_default_graph_benchmarks,
+    "zoom": zoom_benchmarks,
+    "operations": operation_benchmarks,
+}
+
+
+def metadata():
+    # What the numbers depend on, so runs from different machines or versions are not
+    # compared unknowingly.
+    import matplotlib
+    import numpy
+    import scipy
+    import sympy
+
+    info = {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "qt_platform": os.environ.get("QT_QPA_PLATFORM"),
+        "packages": {
+            "numpy": numpy.__version__,
+            "sympy": sympy.__version__,
+            "scipy": scipy.__version__,
+            "matplotlib": matplotlib.__version__,
+        },
+    }
+    try:
+        from PyQt5.QtCore import PYQT_VERSION_STR, QT_VERSION_STR
+        info["packages"]["PyQt5"] = PYQT_VERSION_STR
+        info["packages"]["Qt"] = QT_VERSION_STR
+    except ImportError:
+        pass
+    try:
+        info["commit"] = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        pass
+    return info
+
+
+def benchmarks(groups=None, pattern=None):
+    fixture = Fixture()
+    for group, cases in GROUPS.items():
+        if groups and group not in groups:
+            continue
+        for case in cases(fixture):
+            if pattern is None or pattern in case.name:
+                yield case
+
+
+def run(cases, repeat=DEFAULT_REPEAT, progress=None):
+    # {"metadata": ..., "benchmarks": {name: timings in seconds per call}}.
+    results = {}
+    for case in cases:
+        times, number = case.measure(repeat)
+        results[case.name] = {
+            "min": min(times),
+            "median": statistics.median(times),
+            "mean": statistics.fmean(times),
+            "stdev": statistics.stdev(times) if len(times) > 1 else 0.0,
+            "repeat": repeat,
+            "number": number,
+        }
+        if progress:
+            progress(case.name, results[case.name])
+    return {"metadata": metadata(), "benchmarks": results}
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    # [(name, baseline median, current median, ratio, status)] for benchmarks in both runs.
+    # A benchmark regressed if its median grew by more than threshold (0.25 = 25% slower).
+    comparison = []
+    for name, current in results["benchmarks"].items():
+        previous = baseline["benchmarks"].get(name)
+        if previous is None:
+            continue
+        ratio = current["median"] / previous["median"] if previous["median"] else float("inf")
+        if ratio > 1 + threshold:
+            status = "regressed"
+        elif ratio < 1 / (1 + threshold):
+            status = "improved"
+        else:
+            status = "unchanged"
+        comparison.append((name, previous["median"], current["median"], ratio, status))
+    return comparison
+
+
+def different_machine(results, baseline):
+    # Metadata fields that differ between the runs and make timings less comparable.
+    fields = ("python", "machine", "processor", "cpu_count", "packages")
+    return [field for field in fields
+            if results["metadata"].get(field) != baseline.get("metadata", {}).get(field)]
+
+
+def format_time(seconds):
+    if seconds >= 1:
+        return f"{seconds:8.3f} s "
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:8.2f} ms"
+    return f"{seconds * 1e6:8.1f} µs"
+
+
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Time parsing, plotting, zooming and maths operations. Runs headless; "
+                    "results are written as JSON and can be compared against a baseline run."
+    )
+    parser.add_argument("-o", "--output", help="file to write the JSON results to")
+    parser.add_argument("-b", "--baseline", help="earlier JSON results to compare against")
+    parser.add_argument("-t", "--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"fractional slowdown counted as a regression (default: {DEFAULT_THRESHOLD})")
+    parser.add_argument("-r", "--repeat", type=int, default=DEFAULT_REPEAT,
+                        help=f"measurements per benchmark (default: {DEFAULT_REPEAT})")
+    parser.add_argument("-g", "--group", action="append", choices=tuple(GROUPS),
+                        help="run only this group; may be given more than once")
+    parser.add_argument("-k", "--filter", help="run only benchmarks whose name contains this text")
+    parser.add_argument("--list", action="store_true", help="list the benchmarks and exit")
+    args = parser.parse_args(argv)
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+    return args
+
+
+def main(argv=None, stdout=None):
+    # Returns 1 if a benchmark regressed against the baseline, else 0.
+    args = parse_arguments(argv)
+    stdout = stdout or sys.stdout
+
+    cases = benchmarks(args.group, args.filter)
+    if args.list:
+        for case in cases:
+            print(case.name, file=stdout)
+        return 0
+
+    def progress(name, timing):
+        print(f"{name:40} {format_time(timing['median'])}  ± {format_time(timing['stdev'])}", file=stdout, flush=True)
+
+    results = run(cases, args.repeat, progress)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+
+    if not args.baseline:
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as file:
+        baseline = json.load(file)
+
+    changed = different_machine(results, baseline)
+    if changed:
+        print(f"\nNote: baseline differs in {', '.join(changed)}; timings may not be comparable", file=stdout)
+
+    comparison = compare(results, baseline, args.threshold)
+    print(f"\n{'benchmark':40} {'baseline':>11} {'current':>11}  ratio", file=stdout)
+    for name, previous, current, ratio, status in comparison:
+        print(f"{name:40} {format_time(previous)} {format_time(current)}  {ratio:5.2f}  {status}", file=stdout)
+
+    regressed = [name for name, *_, status in comparison if status == "regressed"]
+    if regressed:
+        print(f"\n{len(regressed)} regression(s) beyond {args.threshold:.0%}: {', '.join(regressed)}", file=stdout)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+from collections import OrderedDict
+
+
+class LRUCache:
+    # Bounded least-recently-used mapping with hit/miss counters.
+
+    def __init__(self, maxsize=128, maxbytes=None, sizeof=None):
+        # maxbytes bounds the summed sizeof(value) of the entries, when given.
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        if maxbytes is not None and sizeof is None:
+            raise ValueError("sizeof is required with maxbytes")
+
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.sizeof = sizeof
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        # Returns the cached value and marks it as most recently used.
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        # Stores a value, evicting the least recently used entries when full.
+        if key in self._data:
+            self.pop(key)
+
+        self._data[key] = value
+        if self.sizeof is not None:
+            self.bytes += self.sizeof(value)
+
+        while len(self._data) > self.maxsize or self._over_budget():
+            _, evicted = self._data.popitem(last=False)
+            if self.sizeof is not None:
+                self.bytes -= self.sizeof(evicted)
+            self.evictions += 1
+
+    def pop(self, key, default=None):
+        if key not in self._data:
+            return default
+
+        value = self._data.pop(key)
+        if self.sizeof is not None:
+            self.bytes -= self.sizeof(value)
+        return value
+
+    def keys(self):
+        return list(self._data)
+
+    def _over_budget(self):
+        # The newest entry is always kept, even if it alone exceeds the budget.
+        return self.maxbytes is not None and self.bytes > self.maxbytes and len(self._data) > 1
+
+    def clear(self):
+        self._data.clear()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -1,67 +1,258 @@
 import re
+import numpy as np
 import sympy as sp
-from sympy.parsing.sympy_parser import (
-    parse_expr,
-    standard_transformations,
-    implicit_multiplication_application,
-    convert_xor,
-    function_exponentiation
-)
+import equation_parser
+import polynomial
+import profiling
+from equation_parser import EquationSyntaxError
+from cache import LRUCache
+from implicit import IMPLICIT
+from curves import DEFAULT_RANGE, PARAMETRIC, POLAR
+
+# Parsed equations keyed on the whitespace-free equation text
+_parse_cache = LRUCache(maxsize=256)
+# NumPy callables keyed on (expression, independent variable, unit mode)
+_compile_cache = LRUCache(maxsize=256)
+# LaTeX labels keyed on expression
+_latex_cache = LRUCache(maxsize=256)
+
+_MISSING = object()
+
 
 def parse_equation(equation_str):
     equation_str = equation_str.replace(" ", "")
 
-    match = re.match(r"^([a-zA-Z])=(.+)", equation_str)
+    result = _parse_cache.get(equation_str, _MISSING)
+    if result is _MISSING:
+        with profiling.span("parse_equation", "calculations"):
+            result = _parse_equation(equation_str)
+        _parse_cache.put(equation_str, result)
+
+    return result
+
+
+def _parse_equation(equation_str):
+    if "," in equation_str:
+        return _parse_curve(equation_str)
+
+    match = re.match(r"^([a-zA-Z])=([^=]+)$", equation_str)
     if not match:
-        return None
+        return _parse_relation(equation_str)
 
     dependent_var = match.group(1)
     rhs_str = match.group(2)
 
-    # Fix bracketless trig/log/ln functions: sinx → sin(x), etc.
-    functions = ["sin", "cos", "tan", "log", "ln", "arcsin", "arccos", "arctan"]
-    for func in functions:
-        rhs_str = re.sub(rf"{func}([a-zA-Z0-9\(])", rf"{func}(\1", rhs_str)
-        rhs_str = re.sub(rf"{func}\(([^()]+)\)", rf"{func}(\1)", rhs_str)
+    try:
+        expr = equation_parser.parse(rhs_str)
+    except (EquationSyntaxError, TypeError):
+        return None
 
-    # Fix exponentials like e^3x → e^(3x)
-    rhs_str = re.sub(r"e\^([a-zA-Z0-9\+\-\*/\^]+)", r"e^(\1)", rhs_str)
+    # y on both sides, as in y = x + y^2, or x given in terms of y, as in x = y^2, makes it a
+    # relation rather than a function of x
+    names = {str(symbol) for symbol in expr.free_symbols}
+    if dependent_var == "r" and names <= {"θ"}:
+        return POLAR, (expr, DEFAULT_RANGE), "r", "θ"
+    if dependent_var in names or (dependent_var == "x" and names == {"y"}):
+        return _relation(sp.Symbol(dependent_var) - expr)
 
-    # Close all unmatched open brackets
-    open_count = rhs_str.count('(')
-    close_count = rhs_str.count(')')
-    if open_count > close_count:
-        rhs_str += ')' * (open_count - close_count)
+    return _classify(expr, dependent_var)
 
-    try:
-        transformations = standard_transformations + (
-            implicit_multiplication_application,
-            convert_xor,
-            function_exponentiation,
-        )
-
-        # Map 'e' to Euler's constant
-        local_dict = {
-            "e": sp.E,
-            "sin": sp.sin,
-            "cos": sp.cos,
-            "tan": sp.tan,
-            "log": sp.log,
-            "ln": sp.ln,
-            "arcsin": sp.asin,
-            "arccos": sp.acos,
-            "arctan": sp.atan,
-        }
-
-        expr = parse_expr(rhs_str, transformations=transformations, local_dict=local_dict)
-
-    except (sp.SympifyError, SyntaxError):
-        return None
 
+def _classify(expr, dependent_var):
     symbols = expr.free_symbols
     if not symbols:
         return None
 
     independent_var = str(list(symbols)[0])
 
-    return "symbolic", expr, dependent_var, independent_var
\ No newline at end of file
+    # Polynomials of any degree keep their coefficients, highest power first
+    if len(symbols) == 1:
+        with profiling.span("classify", "calculations"):
+            typed = polynomial.from_expression(expr, sp.Symbol(independent_var))
+        if typed is not None:
+            equation_type, coefficients = typed
+            return equation_type, coefficients, dependent_var, independent_var
+
+    return "symbolic", expr, dependent_var, independent_var
+
+
+def _parse_relation(equation_str):
+    # Equations such as x^2 + y^2 = 25 or sin(xy) = 0.5, as F(x, y) = lhs - rhs.
+    sides = equation_str.split("=")
+    if len(sides) != 2 or not all(sides):
+        return None
+
+    try:
+        lhs, rhs = (equation_parser.parse(side) for side in sides)
+    except (EquationSyntaxError, TypeError):
+        return None
+
+    return _relation(lhs - rhs)
+
+
+def _relation(expr):
+    # An implicit equation F(x, y) = 0 in x and y, or the function it defines when it is
+    # linear in y with a constant coefficient, as in x + 2y = 4.
+    names = {str(symbol) for symbol in expr.free_symbols}
+    if not names or not names <= {"x", "y"}:
+        return None
+
+    y = sp.Symbol("y")
+    if "y" in names and expr.is_polynomial(y):
+        coefficients = sp.Poly(expr, y).all_coeffs()
+        if len(coefficients) == 2 and coefficients[0].is_number:
+            slope, intercept = coefficients
+            return _classify(sp.expand(-intercept / slope), "y")
+
+    return IMPLICIT, expr, "y", "x"
+
+
+def _parse_curve(equation_str):
+    # Parametric curves, x = cos(3t), y = sin(2t), and polar curves, r = 1 + cos(θ), each
+    # optionally followed by a parameter range such as 0 < t < 4pi.
+    parts = equation_str.split(",")
+    parameter_range = None
+    if "<" in parts[-1]:
+        parameter_range = _parse_range(parts.pop())
+        if parameter_range is None:
+            return None
+
+    sides = {}
+    for part in parts:
+        match = re.match(r"^([xyr])=([^=]+)$", part)
+        if not match or match.group(1) in sides:
+            return None
+        try:
+            sides[match.group(1)] = equation_parser.parse(match.group(2))
+        except (EquationSyntaxError, TypeError):
+            return None
+
+    if set(sides) == {"r"}:
+        parameter = "θ"
+        coefficients = (sides["r"],)
+        equation_type, dependent_var = POLAR, "r"
+    elif set(sides) == {"x", "y"}:
+        names = {str(symbol) for expr in sides.values() for symbol in expr.free_symbols}
+        if len(names) != 1 or names & {"x", "y"}:
+            return None
+        (parameter,) = names
+        coefficients = (sides["x"], sides["y"])
+        equation_type, dependent_var = PARAMETRIC, "y"
+    else:
+        return None
+
+    if any(str(symbol) != parameter for expr in coefficients for symbol in expr.free_symbols):
+        return None
+    if parameter_range is None:
+        parameter_range = (parameter, DEFAULT_RANGE)
+    if parameter_range[0] != parameter:
+        return None
+
+    return equation_type, coefficients + (parameter_range[1],), dependent_var, parameter
+
+
+def _parse_range(range_str):
+    # (parameter, (low, high)) from "low < parameter < high", where either < may be <=.
+    bounds = re.split(r"<=?", range_str)
+    if len(bounds) != 3:
+        return None
+    low, name, high = bounds
+    try:
+        name = equation_parser.parse(name)
+        low, high = float(equation_parser.parse(low)), float(equation_parser.parse(high))
+    except (EquationSyntaxError, TypeError):
+        return None
+    if not isinstance(name, sp.Symbol) or not low < high:
+        return None
+    return str(name), (low, high)
+
+
+def compile_expression(expr, indep_var, unit_mode="radians"):
+    # Returns a cached NumPy callable for expr, converting degrees for trig input.
+    key = (expr, indep_var, unit_mode)
+
+    f = _compile_cache.get(key)
+    if f is None:
+        f = _compile_expression(expr, indep_var, unit_mode)
+        _compile_cache.put(key, f)
+
+    return f
+
+
+def _compile_expression(expr, indep_var, unit_mode):
+    x_sym = sp.Symbol(indep_var)
+    with profiling.span("lambdify", "calculations"):
+        f = sp.lambdify(x_sym, expr, modules=["numpy", "sympy"])
+
+    is_trig = any(expr.has(getattr(sp, func)) for func in ["sin", "cos", "tan"])
+    if is_trig and unit_mode == "degrees":
+        return lambda x_values: f(np.deg2rad(x_values))
+
+    return f
+
+
+def compile_curve(equation_type, coefficients, parameter):
+    # Returns a NumPy callable t_values -> (x_values, y_values) for a parametric or polar
+    # curve. Parameters are angles in radians whatever the unit mode, matching their range.
+    if equation_type == POLAR:
+        r = compile_expression(coefficients[0], parameter)
+
+        def curve(t_values):
+            r_values = r(t_values)
+            return r_values * np.cos(t_values), r_values * np.sin(t_values)
+    else:
+        x = compile_expression(coefficients[0], parameter)
+        y = compile_expression(coefficients[1], parameter)
+
+        def curve(t_values):
+            return x(t_values), y(t_values)
+
+    return curve
+
+
+def compile_relation(expr, unit_mode="radians"):
+    # Returns a cached NumPy callable F(x_values, y_values) for an implicit equation.
+    key = (expr, IMPLICIT, unit_mode)
+
+    f = _compile_cache.get(key)
+    if f is None:
+        f = _compile_relation(expr, unit_mode)
+        _compile_cache.put(key, f)
+
+    return f
+
+
+def _compile_relation(expr, unit_mode):
+    with profiling.span("lambdify", "calculations"):
+        f = sp.lambdify(sp.symbols("x y"), expr, modules=["numpy", "sympy"])
+
+    is_trig = any(expr.has(getattr(sp, func)) for func in ["sin", "cos", "tan"])
+    if is_trig and unit_mode == "degrees":
+        return lambda x_values, y_values: f(np.deg2rad(x_values), np.deg2rad(y_values))
+
+    return f
+
+
+def expression_latex(expr):
+    latex = _latex_cache.get(expr)
+    if latex is None:
+        with profiling.span("latex", "calculations"):
+            latex = sp.latex(expr)
+        _latex_cache.put(expr, latex)
+
+    return latex
+
+
+def cache_info():
+    # Hit/miss statistics for the parse and compile caches.
+    return {
+        "parse": _parse_cache.stats(),
+        "compile": _compile_cache.stats(),
+        "latex": _latex_cache.stats(),
+    }
+
+
+def clear_caches():
+    _parse_cache.clear()
+    _compile_cache.clear()
+    _latex_cache.clear()
@@ -0,0 +1,330 @@
+# Headless engine behind the GUI: parsing, compiling, sampling, maths and rendering with no
+# Qt. Equations are passed around as parse_equation results, (equation_type, coefficients,
+# dep_var, indep_var), and viewports as (x_min, x_max, y_min, y_max, width, height) in pixels.
+# sympy, scipy and matplotlib take most of a second to import, so they are imported when
+# first needed and importing this module stays cheap for scripts and batch jobs.
+import io
+
+import numpy as np
+
+from curves import CURVE_TYPES, PARAMETRIC, RELATION_TYPES, CurveCache
+from implicit import IMPLICIT, ContourCache
+from sampling import TileCache
+
+UNIT_MODES = ("radians", "degrees")
+DEFAULT_VIEWPORT = (-10, 10, -10, 10, 800, 600)
+# Curve colours for headless renders, where the GUI would pick random ones
+PALETTE = ("#1f77b4", "#d62728", "#2ca02c", "#9467bd", "#ff7f0e",
+           "#17becf", "#8c564b", "#e377c2", "#7f7f7f", "#bcbd22")
+RENDER_FORMATS = ("png", "svg", "rgba")
+# What render_graph imports; worth preloading in workers that render
+RENDER_MODULES = ("matplotlib.figure", "matplotlib.backends.backend_agg")
+
+_tile_cache = TileCache()
+_contour_cache = ContourCache()
+_curve_cache = CurveCache()
+
+
+def normalise(equation_text):
+    # Equation text as the parser expects it: "y=" is assumed when there is no "=", so an
+    # implicit equation such as x^2 + y^2 = 25 is left as it is.
+    equation_text = equation_text.strip()
+    if "=" not in equation_text:
+        equation_text = "y=" + equation_text
+    return equation_text
+
+
+def parse(equation_text):
+    # parse_equation result for the text, or None if it is not a valid equation.
+    from calculations import parse_equation
+    return parse_equation(normalise(equation_text))
+
+
+def equation_function(equation_type, coefficients, indep_var, unit_mode="radians"):
+    # Returns a vectorized function of x and a label for the equation. For implicit
+    # equations the function is F(x, y), whose zeros are the curve, and for parametric and
+    # polar curves it maps the parameter to (x_values, y_values).
+    import polynomial
+    from calculations import compile_curve, compile_expression, compile_relation, expression_latex
+
+    if equation_type == "linear":
+        m, b = coefficients
+        f = polynomial.evaluator(coefficients)
+        equation_label = f"{indep_var} = {m}x + {b}"
+
+    elif equation_type == "quadratic":
+        a, b, c = coefficients
+        f = polynomial.evaluator(coefficients)
+        equation_label = f"{indep_var} = {a}x² + {b}x + {c}"
+
+    elif equation_type == "cubic":
+        a, b, c, d = coefficients
+        f = polynomial.evaluator(coefficients)
+        equation_label = f"{indep_var} = {a}x³ + {b}x² + {c}x + {d}"
+
+    elif equation_type == "quartic":
+        a, b, c, d, e = coefficients
+        f = polynomial.evaluator(coefficients)
+        equation_label = f"{indep_var} = {a}x⁴ + {b}x³ + {c}x² + {d}x + {e}"
+
+    elif equation_type == "polynomial":
+        f = polynomial.evaluator(coefficients)
+        equation_label = expression_latex(polynomial.to_expression(coefficients, indep_var))
+
+    elif equation_type == "reciprocal":
+        numerator, exponent = coefficients
+        f = lambda x: numerator / (x ** exponent)
+        equation_label = f"{indep_var} = {numerator}/{indep_var}^{exponent}"
+
+    elif equation_type == "exponential":
+        (base,) = coefficients
+        if base == "e":
+            f = np.exp
+            equation_label = f"{indep_var} = e^{indep_var}"
+        else:
+            f = lambda x: np.power(float(base), x)
+            equation_label = f"{indep_var} = {base}^{indep_var}"
+
+    elif equation_type == "logarithmic":
+        (base,) = coefficients
+        # log of non-positive x evaluates to NaN and is left out of the curve
+        if base == "e":
+            f = np.log
+            equation_label = f"{indep_var} = ln({indep_var})"
+        else:
+            f = lambda x: np.log(x) / np.log(float(base))
+            equation_label = f"{indep_var} = log[{base}]({indep_var})"
+
+    elif equation_type == "trigonometric":
+        (func,) = coefficients
+        trig = {"sin": np.sin, "cos": np.cos, "tan": np.tan}[func]
+        if unit_mode == "degrees":
+            f = lambda x: trig(np.deg2rad(x))
+        else:
+            f = trig
+        equation_label = f"{indep_var} = {func}({indep_var})"
+
+    elif equation_type == "inverse_trig":
+        (func,) = coefficients
+        # arcsin/arccos outside [-1, 1] evaluate to NaN
+        f = {"arcsin": np.arcsin, "arccos": np.arccos, "arctan": np.arctan}[func]
+        equation_label = f"{indep_var} = {func}({indep_var})"
+
+    elif equation_type == "symbolic":
+        expr = coefficients
+
+        try:
+            # Compiled callables are cached per expression and unit mode
+            f = compile_expression(expr, indep_var, unit_mode)
+        except Exception:
+            f = lambda x: np.full_like(x, np.nan)
+
+        equation_label = expression_latex(expr)
+
+    elif equation_type == IMPLICIT:
+        expr = coefficients
+
+        try:
+            f = compile_relation(expr, unit_mode)
+        except Exception:
+            f = lambda x, y: np.full(np.broadcast(x, y).shape, np.nan)
+
+        equation_label = f"{expression_latex(expr)} = 0"
+
+    elif equation_type in CURVE_TYPES:
+        try:
+            f = compile_curve(equation_type, coefficients, indep_var)
+        except Exception:
+            f = lambda t: (np.full_like(t, np.nan), np.full_like(t, np.nan))
+
+        if equation_type == PARAMETRIC:
+            x_expr, y_expr, _ = coefficients
+            equation_label = f"x = {expression_latex(x_expr)}, y = {expression_latex(y_expr)}"
+        else:
+            equation_label = f"r = {expression_latex(coefficients[0])}"
+    else:
+        raise ValueError("Unsupported equation type")
+
+    return f, equation_label
+
+
+def function(parsed, unit_mode="radians"):
+    equation_type, coefficients, _, indep_var = parsed
+    return equation_function(equation_type, coefficients, indep_var, unit_mode)[0]
+
+
+def sample(parsed, viewport=DEFAULT_VIEWPORT, unit_mode="radians", tile_cache=None):
+    # (x_values, y_values) of the curve, adaptively sampled for the viewport. Tiles are
+    # cached, so overlapping viewports only sample what is new. Implicit equations are
+    # contoured into segments separated by NaN, and tile_cache must then be a ContourCache;
+    # parametric and polar curves need a CurveCache.
+    equation_type, coefficients, _, indep_var = parsed
+    x_min, x_max, y_min, y_max, width, height = viewport
+    spec = (equation_type, coefficients, indep_var, unit_mode)
+    if tile_cache is None:
+        tile_cache = curve_cache(equation_type)
+    x_values, y_values, _ = tile_cache.sample(
+        spec, function(parsed, unit_mode),
+        float(x_min), float(x_max), float(y_min), float(y_max), width, height
+    )
+    return x_values, y_values
+
+
+def curve_cache(equation_type):
+    # The module's cache for samples of equations of this type.
+    if equation_type == IMPLICIT:
+        return _contour_cache
+    if equation_type in CURVE_TYPES:
+        return _curve_cache
+    return _tile_cache
+
+
+def roots(parsed, x_range=(-10, 10), mode="auto"):
+    # Sorted real x-intercepts as floats.
+    import operations
+    equation_type, coefficients, _, indep_var = parsed
+    return operations.x_intercepts(equation_type, coefficients, indep_var, x_range, mode)[0]
+
+
+def solve(parsed, x_range=(-10, 10), mode="auto"):
+    # The x- and y-intercepts as the maths panel reports them.
+    import operations
+    equation_type, coefficients, _, indep_var = parsed
+    return operations.solve_equation(equation_type, coefficients, indep_var, x_range, mode)
+
+
+def differentiate(parsed):
+    # The derivative as a sympy expression.
+    import operations
+    equation_type, coefficients, _, indep_var = parsed
+    return operations.differentiate(equation_type, coefficients, indep_var)
+
+
+def integrate(parsed):
+    # The antiderivative as a sympy expression.
+    import operations
+    equation_type, coefficients, _, indep_var = parsed
+    return operations.integrate(equation_type, coefficients, indep_var)
+
+
+def area(parsed, lower=None, upper=None, x_range=(-10, 10), mode="auto", area_mode="net"):
+    # (area, error estimate) between the curve and the x-axis. A missing limit falls back to
+    # the outermost x-intercept in x_range. The area is exact where sympy finds it, and
+    # None if no area could be worked out.
+    import operations
+    _, value, error = operations.equation_area(
+        "", parsed, "" if lower is None else str(lower), "" if upper is None else str(upper),
+        x_range, mode, area_mode
+    )
+    return value, error
+
+
+def extrema(parsed, mode="auto"):
+    # ([(x, y)] maxima, [(x, y)] minima).
+    import operations
+    equation_type, coefficients, _, indep_var = parsed
+    return operations.extrema(equation_type, coefficients, indep_var, mode)
+
+
+def intersections(equations, x_range=(-10, 10), unit_mode="radians"):
+    # [(index_a, index_b, x, y)] where the curves in the list of parsed equations cross.
+    # Implicit, parametric and polar equations are not functions of x and are left out.
+    import intersections
+    functions = {index: function(parsed, unit_mode) for index, parsed in enumerate(equations)
+                 if parsed[0] not in RELATION_TYPES}
+    return intersections.find_intersections(functions, float(x_range[0]), float(x_range[1]))
+
+
+def json_number(value):
+    # A float for JSON output; NaN and infinities, which JSON cannot hold, become None.
+    value = float(value)
+    return value if np.isfinite(value) else None
+
+
+def render_latex(latex, fontsize=20, dpi=300, color="white"):
+    # RGBA array of the rendered LaTeX; see rendering.render_latex.
+    import rendering
+    return rendering.render_latex(latex, fontsize, dpi, color)
+
+
+def static_layer(viewport, x_step=1, y_step=1):
+    # What the graph draws beneath the curves: (grid segments, (x number positions, labels),
+    # (y number positions, labels)), with steps thinned to the viewport's pixel density.
+    from axis_numbers import (axis_labels, thinned_step, tick_values,
+                              GRID_SPACING, X_LABEL_SPACING, Y_LABEL_SPACING)
+    x_min, x_max, y_min, y_max, width, height = viewport
+
+    # Tiny user-entered steps are thinned to a pixel-density limit
+    x_grid_step = thinned_step(x_min, x_max, x_step, width, GRID_SPACING)
+    y_grid_step = thinned_step(y_min, y_max, y_step, height, GRID_SPACING)
+
+    xticks = tick_values(x_min, x_max, x_grid_step)
+    yticks = tick_values(y_min, y_max, y_grid_step)
+
+    # Prevent borders
+    xticks = xticks[xticks > x_min]
+    yticks = yticks[yticks < y_max]
+
+    segments = ([((x, y_min), (x, y_max)) for x in xticks] +
+                [((x_min, y), (x_max, y)) for y in yticks])
+
+    x_offset = (y_max - y_min) * 0.02
+    y_offset = (x_max - x_min) * 0.02
+
+    x_label_step = thinned_step(x_min, x_max, x_step, width, X_LABEL_SPACING)
+    y_label_step = thinned_step(y_min, y_max, y_step, height, Y_LABEL_SPACING)
+
+    x_values, x_labels = axis_labels(x_min, x_max, x_label_step)
+    y_values, y_labels = axis_labels(y_min, y_max, y_label_step)
+
+    x_numbers = (np.column_stack([x_values, np.full_like(x_values, -x_offset)]), x_labels)
+    y_numbers = (np.column_stack([np.full_like(y_values, -y_offset), y_values]), y_labels)
+    return segments, x_numbers, y_numbers
+
+
+def render_graph(equations, viewport=DEFAULT_VIEWPORT, output_format="png", colors=None, unit_mode="radians",
+                 x_step=1, y_step=1, grid=True, axis_numbers=True, dpi=100):
+    # Draws the parsed equations as the graph panel would, on a standalone Agg figure of the
+    # viewport's pixel size. Returns PNG or SVG bytes, or an RGBA array for "rgba".
+    if output_format not in RENDER_FORMATS:
+        raise ValueError(f"Unknown output format {output_format!r}")
+
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.collections import LineCollection
+    from matplotlib.figure import Figure
+    from axis_numbers import AxisNumbers
+
+    x_min, x_max, y_min, y_max, width, height = viewport
+    figure = Figure(figsize=(width / dpi, height / dpi), dpi=dpi)
+    canvas = FigureCanvasAgg(figure)
+    ax = figure.add_axes((0, 0, 1, 1))
+    ax.set_axis_off()
+    ax.set_xlim(x_min, x_max)
+    ax.set_ylim(y_min, y_max)
+
+    segments, x_numbers, y_numbers = static_layer(viewport, x_step, y_step)
+    if grid:
+        ax.add_collection(LineCollection(segments, colors="grey", linestyles="--", linewidths=0.8, alpha=0.6),
+                          autolim=False)
+    ax.axhline(0, color='grey', linewidth=1)
+    ax.axvline(0, color='grey', linewidth=1)
+
+    if axis_numbers:
+        for (positions, labels), alignment in ((x_numbers, dict(ha='center', va='top')),
+                                               (y_numbers, dict(ha='right', va='center'))):
+            numbers = AxisNumbers(ax, fontsize=7, color='grey', **alignment)
+            numbers.set_labels(positions, labels)
+            ax.add_artist(numbers)
+
+    colors = colors or PALETTE
+    for index, parsed in enumerate(equations):
+        x_values, y_values = sample(parsed, viewport, unit_mode)
+        ax.plot(x_values, y_values, color=colors[index % len(colors)])
+
+    if output_format == "rgba":
+        canvas.draw()
+        return np.array(canvas.buffer_rgba())
+
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format=output_format)
+    return buffer.getvalue()
@@ -0,0 +1,206 @@
+import math
+import threading
+
+import numpy as np
+
+from cache import LRUCache
+from implicit import IMPLICIT
+
+# Equation types traced by a parameter rather than given as y = f(x). Parametric
+# coefficients are (x expression, y expression, (t_min, t_max)) and polar coefficients
+# (r expression, (θ_min, θ_max)); both are plotted from a function of the parameter
+# returning (x_values, y_values).
+PARAMETRIC = "parametric"
+POLAR = "polar"
+CURVE_TYPES = (PARAMETRIC, POLAR)
+DEFAULT_RANGE = (0.0, 2 * math.pi)
+# Equation types that are not functions y = f(x), which maths operations and intersections skip
+RELATION_TYPES = (IMPLICIT, PARAMETRIC, POLAR)
+
+# Longest segment, in pixels, between neighbouring samples
+MAX_SEGMENT_PIXELS = 2
+# Neighbouring segments turning by more than this many radians are split further, so
+# cusps and small loops are not cut short by a chord
+MAX_TURN = 0.35
+# Pieces a segment may be split into per pass, and the number of passes
+MAX_SPLIT = 64
+REFINE_PASSES = 4
+# Evaluations allowed per pixel of the canvas's larger side
+BUDGET_PER_PIXEL = 16
+# A segment still this long after refinement joins two sides of a pole, and is broken
+JUMP_PIXELS = 100
+CURVE_CACHE_BYTES = 16 * 1024 * 1024
+
+_GOLDEN = (np.sqrt(5) - 1) / 2
+
+
+def evaluate(f, t_values):
+    # (x_values, y_values) of the curve at t_values, with complex, infinite and failed
+    # results as NaN.
+    with np.errstate(all="ignore"):
+        try:
+            points = [np.asarray(values) for values in f(t_values)]
+        except (TypeError, ValueError, ZeroDivisionError, OverflowError):
+            return np.full_like(t_values, np.nan), np.full_like(t_values, np.nan)
+
+        coordinates = []
+        for values in points:
+            if np.iscomplexobj(values):
+                values = np.where(np.abs(np.imag(values)) < 1e-12, np.real(values), np.nan)
+            try:
+                values = np.broadcast_to(values, t_values.shape).astype(float)
+            except (TypeError, ValueError):
+                values = np.full_like(t_values, np.nan)
+            coordinates.append(np.where(np.isfinite(values), values, np.nan))
+
+    x_values, y_values = coordinates
+    # A point is only usable if both coordinates are
+    missing = np.isnan(x_values) | np.isnan(y_values)
+    return np.where(missing, np.nan, x_values), np.where(missing, np.nan, y_values)
+
+
+def sample_curve(f, t_min, t_max, x_scale, y_scale, window=None, budget=4096):
+    # Samples the curve over [t_min, t_max] by arc length: one vectorized pass over a uniform
+    # grid, then each segment is split in proportion to its length in pixels (x_scale and
+    # y_scale are pixels per unit) and around sharp turns. Only segments touching window,
+    # (x_min, x_max, y_min, y_max), are refined. Returns (x_values, y_values, evaluations).
+    initial = max(65, budget // 8)
+    t_values = np.linspace(t_min, t_max, initial)
+
+    # Jitter interior points so periodic curves cannot alias with a uniform grid
+    spacing = (t_max - t_min) / (initial - 1)
+    t_values[1:-1] += ((np.arange(1, initial - 1) * _GOLDEN) % 1.0 - 0.5) * 0.5 * spacing
+    x_values, y_values = evaluate(f, t_values)
+    evaluations = initial
+
+    for _ in range(REFINE_PASSES):
+        dx = np.diff(x_values) * x_scale
+        dy = np.diff(y_values) * y_scale
+        length = np.hypot(dx, dy)
+        finite = np.isfinite(length)
+
+        with np.errstate(invalid="ignore"):
+            pieces = np.where(finite, np.ceil(length / MAX_SEGMENT_PIXELS), 1)
+
+            # The angle between each segment and the next; both segments at a sharp turn are split
+            heading = np.arctan2(dy, dx)
+            turn = np.abs((np.diff(heading) + np.pi) % (2 * np.pi) - np.pi)
+            sharp = np.zeros(length.shape, dtype=bool)
+            sharp[:-1] |= turn > MAX_TURN
+            sharp[1:] |= turn > MAX_TURN
+            pieces = np.where(sharp & (length > MAX_SEGMENT_PIXELS / 4), np.maximum(pieces, 4), pieces)
+
+        # Segments crossing the edge of the curve's domain are bisected to find it
+        x_finite = np.isfinite(x_values)
+        edge = x_finite[:-1] != x_finite[1:]
+        pieces = np.where(edge, np.maximum(pieces, 2), pieces)
+
+        if window is not None:
+            pieces = np.where(_outside(x_values, y_values, window), 1, pieces)
+
+        extra = np.minimum(pieces, MAX_SPLIT).astype(int) - 1
+        total = extra.sum()
+        remaining = budget - evaluations
+        if total == 0 or remaining <= 0:
+            break
+        if total > remaining:
+            extra = np.floor(extra * (remaining / total)).astype(int)
+            total = extra.sum()
+            if total == 0:
+                break
+
+        # Each segment gets its extra points evenly spaced in t
+        segment = np.repeat(np.arange(extra.size), extra)
+        position = np.arange(total) - np.repeat(np.cumsum(extra) - extra, extra) + 1
+        fraction = position / np.repeat(extra + 1, extra)
+        new_t = t_values[segment] + fraction * (t_values[segment + 1] - t_values[segment])
+        new_x, new_y = evaluate(f, new_t)
+        evaluations += total
+
+        order = np.argsort(np.concatenate([t_values, new_t]), kind="stable")
+        t_values = np.concatenate([t_values, new_t])[order]
+        x_values = np.concatenate([x_values, new_x])[order]
+        y_values = np.concatenate([y_values, new_y])[order]
+
+    if evaluations < budget:
+        x_values, y_values = _break_jumps(x_values, y_values, x_scale, y_scale)
+    return x_values, y_values, evaluations
+
+
+def _outside(x_values, y_values, window):
+    # Segments with both ends beyond the same side of window, which cannot be seen.
+    x_min, x_max, y_min, y_max = window
+    with np.errstate(invalid="ignore"):
+        return (((x_values[:-1] < x_min) & (x_values[1:] < x_min)) |
+                ((x_values[:-1] > x_max) & (x_values[1:] > x_max)) |
+                ((y_values[:-1] < y_min) & (y_values[1:] < y_min)) |
+                ((y_values[:-1] > y_max) & (y_values[1:] > y_max)))
+
+
+def _break_jumps(x_values, y_values, x_scale, y_scale):
+    # Inserts NaN into segments that refinement could not shorten, so the two sides of a
+    # pole (x = tan t) are not joined by a line.
+    length = np.hypot(np.diff(x_values) * x_scale, np.diff(y_values) * y_scale)
+    with np.errstate(invalid="ignore"):
+        jump = length > JUMP_PIXELS
+    if not jump.any():
+        return x_values, y_values
+
+    at = np.nonzero(jump)[0] + 1
+    return np.insert(x_values, at, np.nan), np.insert(y_values, at, np.nan)
+
+
+def _curve_nbytes(curve):
+    x_values, y_values = curve
+    return x_values.nbytes + y_values.nbytes
+
+
+class CurveCache:
+    # Sampled parametric and polar curves. Like sampling.TileCache, samples are made for a
+    # power-of-two scale and a window of several viewports around the view, so pans within
+    # the window and zooms within a factor of two reuse them.
+
+    def __init__(self, max_bytes=CURVE_CACHE_BYTES):
+        self.curves = LRUCache(maxsize=1024, maxbytes=max_bytes, sizeof=_curve_nbytes)
+        self.evaluations = 0
+        # Guards the LRU; curves may be sampled from a background thread
+        self.lock = threading.Lock()
+
+    def sample(self, spec, f, x_min, x_max, y_min, y_max, pixel_width, pixel_height):
+        # spec identifies the curve and unit mode, and its coefficients end with the parameter
+        # range; returns (x_values, y_values, evaluations).
+        x_block = 2.0 ** math.ceil(math.log2(x_max - x_min))
+        y_block = 2.0 ** math.ceil(math.log2(y_max - y_min))
+        x_low = math.floor(x_min / x_block) * x_block - x_block
+        y_low = math.floor(y_min / y_block) * y_block - y_block
+        key = (spec, x_block, y_block, x_low, y_low, round(pixel_width), round(pixel_height))
+
+        with self.lock:
+            curve = self.curves.get(key)
+        if curve is not None:
+            return curve[0], curve[1], 0
+
+        # Sample at the finest pixel density any viewport at this scale can show
+        x_scale = max(pixel_width, 1.0) / (x_block / 2)
+        y_scale = max(pixel_height, 1.0) / (y_block / 2)
+        window = (x_low, x_low + 4 * x_block, y_low, y_low + 4 * y_block)
+        budget = int(max(pixel_width, pixel_height, 64) * BUDGET_PER_PIXEL)
+
+        t_min, t_max = spec[1][-1]
+        x_values, y_values, evaluations = sample_curve(f, t_min, t_max, x_scale, y_scale, window, budget)
+        with self.lock:
+            self.curves.put(key, (x_values, y_values))
+            self.evaluations += evaluations
+        return x_values, y_values, evaluations
+
+    def invalidate(self, spec):
+        # Drops every sampling of a curve, e.g. after it was edited.
+        with self.lock:
+            for key in self.curves.keys():
+                if key[0] == spec:
+                    self.curves.pop(key)
+
+    def clear(self):
+        with self.lock:
+            self.curves.clear()
+            self.evaluations = 0
@@ -0,0 +1,279 @@
+import os
+from PyQt5.QtWidgets import QAbstractItemView, QLineEdit, QListView, QSizePolicy, QStyledItemDelegate
+from PyQt5.QtGui import QColor, QFont, QIcon, QPen
+from PyQt5.QtCore import QAbstractListModel, QEvent, QModelIndex, QRect, QSize, Qt, QTimer
+
+ICON_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "assets", "icons"))
+
+# Item data roles beyond Qt's display and edit roles
+ID_ROLE = Qt.UserRole
+COLOR_ROLE = Qt.UserRole + 1
+VISIBLE_ROLE = Qt.UserRole + 2
+
+# Row geometry: number, eye button and input box side by side, as the equation boxes were
+ROW_HEIGHT = 40
+NUMBER_WIDTH = 20
+EYE_SIZE = 20
+SPACING = 5
+INPUT_STYLE = "color: #595959; background-color: white; border: 1px solid #ccc; padding: 5px;"
+
+
+class Equation:
+    # One row of the equation panel. Slots keep each row a few fixed fields, so thousands of
+    # rows cost little memory; nothing is parsed or plotted until equation_type is set.
+    __slots__ = ("id", "text", "equation_type", "coefficients", "color", "visible", "indep_var")
+
+    def __init__(self, equation_id, text=""):
+        self.id = equation_id
+        self.text = text
+        self.equation_type = None
+        self.coefficients = None
+        self.color = None
+        self.visible = True
+        self.indep_var = None
+
+    def plotted(self):
+        # (id, equation_type, coefficients, color, visible, indep_var), as the graph draws it.
+        return self.id, self.equation_type, self.coefficients, self.color, self.visible, self.indep_var
+
+
+class EquationModel(QAbstractListModel):
+    # The equations in the equation panel, in display order. Each row has a stable integer
+    # id that graph lines, intersections and undo refer to; ids are looked up in dicts, so
+    # finding, editing or toggling one equation does not scan the others.
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows = []
+        self.by_id = {}
+        self.positions = {}
+        self.next_id = 1
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        equation = self.rows[index.row()]
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            return equation.text
+        if role == ID_ROLE:
+            return equation.id
+        if role == COLOR_ROLE:
+            return equation.color
+        if role == VISIBLE_ROLE:
+            return equation.visible
+        return None
+
+    def setData(self, index, value, role=Qt.EditRole):
+        # Edits keep the typed text; it is parsed when the equation is entered.
+        if not index.isValid() or role != Qt.EditRole:
+            return False
+        equation = self.rows[index.row()]
+        if equation.text != value:
+            equation.text = value
+            self.dataChanged.emit(index, index, [Qt.DisplayRole, Qt.EditRole])
+        return True
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsEditable
+
+    def __len__(self):
+        return len(self.rows)
+
+    def create(self, text=""):
+        # A new equation with a fresh id, not yet in the model.
+        equation = Equation(self.next_id, text)
+        self.next_id += 1
+        return equation
+
+    def append(self, equations):
+        # Adds equations at the end in a single insertion, so views update once.
+        equations = list(equations)
+        if not equations:
+            return
+        first = len(self.rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(equations) - 1)
+        for row, equation in enumerate(equations, first):
+            self.rows.append(equation)
+            self.by_id[equation.id] = equation
+            self.positions[equation.id] = row
+        self.endInsertRows()
+
+    def pop(self):
+        # Removes and returns the last equation, or None if there are none.
+        if not self.rows:
+            return None
+        row = len(self.rows) - 1
+        self.beginRemoveRows(QModelIndex(), row, row)
+        equation = self.rows.pop()
+        del self.by_id[equation.id]
+        del self.positions[equation.id]
+        self.endRemoveRows()
+        return equation
+
+    def clear(self):
+        self.beginResetModel()
+        self.rows = []
+        self.by_id = {}
+        self.positions = {}
+        self.endResetModel()
+
+    def get(self, equation_id):
+        return self.by_id.get(equation_id)
+
+    def index_of(self, equation_id):
+        row = self.positions.get(equation_id)
+        return QModelIndex() if row is None else self.index(row)
+
+    def update(self, equation_id, **fields):
+        # Sets fields of one equation and repaints its row.
+        equation = self.by_id[equation_id]
+        for name, value in fields.items():
+            setattr(equation, name, value)
+        index = self.index(self.positions[equation_id])
+        self.dataChanged.emit(index, index)
+
+    def texts(self):
+        return [equation.text for equation in self.rows]
+
+    def plotted(self):
+        # The entered equations, in order, as (id, equation_type, coefficients, color, visible, indep_var).
+        for equation in self.rows:
+            if equation.equation_type is not None:
+                yield equation.plotted()
+
+
+def number_rect(rect):
+    return QRect(rect.left(), rect.top(), NUMBER_WIDTH, rect.height())
+
+
+def eye_rect(rect):
+    left = rect.left() + NUMBER_WIDTH + SPACING
+    return QRect(left, rect.top() + (rect.height() - EYE_SIZE) // 2, EYE_SIZE, EYE_SIZE)
+
+
+def input_rect(rect):
+    left = rect.left() + NUMBER_WIDTH + 2 * SPACING + EYE_SIZE
+    return QRect(left, rect.top() + 2, rect.right() - left, rect.height() - 4)
+
+
+class EquationDelegate(QStyledItemDelegate):
+    # Paints each row as a number, an eye button and an input box. Only the row being edited
+    # has a real QLineEdit; the rest are drawn, so the view costs the same for any number of
+    # equations. entered(equation_id) is called when Enter is pressed in the editor.
+
+    def __init__(self, entered, parent=None):
+        super().__init__(parent)
+        self.entered = entered
+        self.enter_pressed = False
+        self.font = QFont("Times New Roman", 14)
+        self.number_font = QFont("Helvetica")
+        self.number_font.setBold(True)
+        self.open_eye = QIcon(os.path.join(ICON_PATH, "grey_open_eye.png"))
+        self.closed_eye = QIcon(os.path.join(ICON_PATH, "grey_closed_eye.png"))
+
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), ROW_HEIGHT)
+
+    def paint(self, painter, option, index):
+        rect = option.rect
+        painter.save()
+
+        painter.setFont(self.number_font)
+        painter.setPen(QColor(index.data(COLOR_ROLE) or "#595959"))
+        painter.drawText(number_rect(rect), Qt.AlignCenter, str(index.row() + 1))
+
+        icon = self.open_eye if index.data(VISIBLE_ROLE) else self.closed_eye
+        icon.paint(painter, eye_rect(rect))
+
+        box = input_rect(rect)
+        painter.setPen(QPen(QColor("#ccc")))
+        painter.fillRect(box, QColor("white"))
+        painter.drawRect(box.adjusted(0, 0, -1, -1))
+
+        text = index.data(Qt.DisplayRole)
+        painter.setFont(self.font)
+        painter.setPen(QColor("#595959" if text else "#a0a0a0"))
+        painter.drawText(box.adjusted(6, 0, -6, 0), Qt.AlignVCenter | Qt.AlignLeft,
+                         text or "Enter equation...")
+        painter.restore()
+
+    def createEditor(self, parent, option, index):
+        editor = QLineEdit(parent)
+        editor.setPlaceholderText("Enter equation...")
+        editor.setFont(self.font)
+        editor.setStyleSheet(INPUT_STYLE)
+        return editor
+
+    def updateEditorGeometry(self, editor, option, index):
+        editor.setGeometry(input_rect(option.rect))
+
+    def setEditorData(self, editor, index):
+        editor.setText(index.data(Qt.EditRole))
+
+    def eventFilter(self, editor, event):
+        if event.type() == QEvent.KeyPress and event.key() in (Qt.Key_Return, Qt.Key_Enter):
+            self.enter_pressed = True
+        return super().eventFilter(editor, event)
+
+    def setModelData(self, editor, model, index):
+        model.setData(index, editor.text())
+        if self.enter_pressed:
+            self.enter_pressed = False
+            # After the editor has closed, so a warning dialog does not interrupt it
+            equation_id = index.data(ID_ROLE)
+            QTimer.singleShot(0, lambda: self.entered(equation_id))
+
+
+class EquationListView(QListView):
+    # Scrolling list of equations. Rows have one height, so Qt lays out and paints only
+    # those on screen. Clicking an eye calls toggled(equation_id); clicking elsewhere on a
+    # row edits it.
+
+    def __init__(self, model, entered, toggled, parent=None):
+        super().__init__(parent)
+        self.toggled = toggled
+        self.setModel(model)
+        self.setItemDelegate(EquationDelegate(entered, self))
+        self.setUniformItemSizes(True)
+        self.setSpacing(SPACING)
+        self.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.setSelectionMode(QAbstractItemView.NoSelection)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setStyleSheet("border: none; background-color: #f3f3f3;")
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Maximum)
+        for signal in (model.rowsInserted, model.rowsRemoved, model.modelReset):
+            signal.connect(self.rows_changed)
+
+    def sizeHint(self):
+        # Tall enough for every row, so the list grows with its rows until the panel is
+        # full, and then scrolls.
+        rows = self.model().rowCount()
+        height = rows * (ROW_HEIGHT + 2 * SPACING) + 2 * self.frameWidth()
+        return QSize(super().sizeHint().width(), height)
+
+    def rows_changed(self):
+        self.updateGeometry()
+
+    def mousePressEvent(self, event):
+        index = self.indexAt(event.pos())
+        if index.isValid() and event.button() == Qt.LeftButton:
+            if eye_rect(self.visualRect(index)).contains(event.pos()):
+                self.toggled(index.data(ID_ROLE))
+                return
+            self.setCurrentIndex(index)
+            self.edit(index)
+            return
+        super().mousePressEvent(event)
+
+    def edit_equation(self, equation_id):
+        # Scrolls to the equation and opens its input box.
+        index = self.model().index_of(equation_id)
+        self.scrollTo(index)
+        self.setCurrentIndex(index)
+        self.edit(index)
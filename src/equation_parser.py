@@ -0,0 +1,292 @@
+import sympy as sp
+
+import profiling
+
+
+class EquationSyntaxError(ValueError):
+    pass
+
+
+# Function names recognised in equations, matched longest first
+FUNCTIONS = {
+    "arcsin": sp.asin,
+    "arccos": sp.acos,
+    "arctan": sp.atan,
+    "sinh": sp.sinh,
+    "cosh": sp.cosh,
+    "tanh": sp.tanh,
+    "asin": sp.asin,
+    "acos": sp.acos,
+    "atan": sp.atan,
+    "sqrt": sp.sqrt,
+    "sin": sp.sin,
+    "cos": sp.cos,
+    "tan": sp.tan,
+    "sec": sp.sec,
+    "csc": sp.csc,
+    "cot": sp.cot,
+    "exp": sp.exp,
+    "abs": sp.Abs,
+    "log": sp.log,
+    "ln": sp.ln,
+}
+
+CONSTANTS = {
+    "pi": sp.pi,
+    "e": sp.E,
+}
+
+# Symbols that can be typed as words, for keyboards without θ
+SYMBOL_NAMES = {
+    "theta": "θ",
+}
+
+_WORDS = sorted(list(FUNCTIONS) + list(CONSTANTS) + list(SYMBOL_NAMES), key=len, reverse=True)
+
+NUMBER, NAME, FUNC, CONST, OP, LPAREN, RPAREN, LBRACKET, RBRACKET, END = range(10)
+
+# Binding powers for the Pratt parser
+_INFIX = {"+": 10, "-": 10, "*": 20, "/": 20, "^": 30}
+_PREFIX = 25
+
+# Tokens that begin an operand, so juxtaposition means multiplication
+_OPERAND_START = (NUMBER, NAME, FUNC, CONST, LPAREN)
+# Tokens that extend a bracketless argument; a new function or bracket ends it: 2sinxcosx
+_TERM_CONTINUE = (NUMBER, NAME, CONST)
+
+
+def tokenize(text):
+    # Single pass over the input producing (kind, value) pairs.
+    tokens = []
+    i = 0
+    length = len(text)
+
+    while i < length:
+        char = text[i]
+
+        if char.isspace():
+            i += 1
+
+        elif char.isdigit() or (char == "." and i + 1 < length and text[i + 1].isdigit()):
+            start = i
+            seen_dot = False
+            while i < length and (text[i].isdigit() or (text[i] == "." and not seen_dot)):
+                seen_dot = seen_dot or text[i] == "."
+                i += 1
+            tokens.append((NUMBER, text[start:i]))
+
+        elif char.isalpha():
+            start = i
+            while i < length and text[i].isalpha():
+                i += 1
+            _split_name(text[start:i], tokens)
+
+        elif char == "*" and text.startswith("**", i):
+            tokens.append((OP, "^"))
+            i += 2
+
+        elif char in "+-*/^":
+            tokens.append((OP, char))
+            i += 1
+
+        elif char == "(":
+            tokens.append((LPAREN, char))
+            i += 1
+
+        elif char == ")":
+            tokens.append((RPAREN, char))
+            i += 1
+
+        elif char == "[":
+            tokens.append((LBRACKET, char))
+            i += 1
+
+        elif char == "]":
+            tokens.append((RBRACKET, char))
+            i += 1
+
+        else:
+            raise EquationSyntaxError(f"Unexpected character {char!r}")
+
+    tokens.append((END, None))
+    return tokens
+
+
+def _split_name(word, tokens):
+    # Splits a run of letters into functions, constants and single-letter symbols: "xsinx" → x, sin, x.
+    i = 0
+    while i < len(word):
+        for name in _WORDS:
+            if word.startswith(name, i):
+                if name in SYMBOL_NAMES:
+                    tokens.append((NAME, SYMBOL_NAMES[name]))
+                else:
+                    tokens.append((FUNC if name in FUNCTIONS else CONST, name))
+                i += len(name)
+                break
+        else:
+            tokens.append((NAME, word[i]))
+            i += 1
+
+
+class Parser:
+    # Pratt parser for the calculator grammar, building sympy expressions directly.
+
+    def __init__(self, text):
+        self.tokens = tokenize(text)
+        self.pos = 0
+        self.symbols = {}
+
+    def parse(self):
+        expr = self.expression(0)
+        kind, value = self.peek()
+        if kind != END:
+            raise EquationSyntaxError(f"Unexpected {value!r}")
+        return expr
+
+    def peek(self):
+        return self.tokens[self.pos]
+
+    def advance(self):
+        token = self.tokens[self.pos]
+        self.pos += 1
+        return token
+
+    def expression(self, rbp):
+        left = self.prefix()
+
+        while True:
+            kind, value = self.peek()
+
+            if kind == OP:
+                lbp = _INFIX[value]
+                if lbp <= rbp:
+                    break
+                self.advance()
+                # Powers are right associative
+                right = self.expression(lbp - 1 if value == "^" else lbp)
+                left = _apply(value, left, right)
+
+            elif kind in _OPERAND_START:
+                # Implicit multiplication binds like '*'
+                if _INFIX["*"] <= rbp:
+                    break
+                left = left * self.expression(_INFIX["*"])
+
+            else:
+                break
+
+        return left
+
+    def prefix(self):
+        kind, value = self.advance()
+
+        if kind == NUMBER:
+            return sp.Float(value) if "." in value else sp.Integer(value)
+
+        if kind == NAME:
+            symbol = self.symbols.get(value)
+            if symbol is None:
+                symbol = self.symbols[value] = sp.Symbol(value)
+            return symbol
+
+        if kind == CONST:
+            if value == "e" and self.peek() == (OP, "^"):
+                self.advance()
+                return sp.exp(self.exponent())
+            return CONSTANTS[value]
+
+        if kind == FUNC:
+            return self.function(value)
+
+        if kind == LPAREN:
+            return self.group()
+
+        if kind == OP and value in "+-":
+            operand = self.expression(_PREFIX)
+            return -operand if value == "-" else operand
+
+        if kind == END:
+            raise EquationSyntaxError("Unexpected end of equation")
+
+        raise EquationSyntaxError(f"Unexpected {value!r}")
+
+    def group(self):
+        # Parses the inside of '(...)'; a missing ')' at the end of input is auto-closed.
+        expr = self.expression(0)
+        kind, value = self.peek()
+        if kind == RPAREN:
+            self.advance()
+        elif kind != END:
+            raise EquationSyntaxError(f"Expected ')' but found {value!r}")
+        return expr
+
+    def function(self, name):
+        base = None
+        power = None
+
+        # log[2]x → log base 2 of x
+        if name == "log" and self.peek()[0] == LBRACKET:
+            self.advance()
+            base = self.expression(0)
+            if self.advance()[0] != RBRACKET:
+                raise EquationSyntaxError("Expected ']' after logarithm base")
+
+        # sin^2x → sin(x)^2
+        if self.peek() == (OP, "^"):
+            self.advance()
+            power = self.prefix()
+
+        argument = self.argument()
+
+        if base is not None:
+            result = sp.log(argument, base)
+        else:
+            result = FUNCTIONS[name](argument)
+
+        return result ** power if power is not None else result
+
+    def argument(self):
+        # Bracketed arguments end at ')'; bracketless ones take one implicit product: sin2x → sin(2x).
+        if self.peek()[0] == LPAREN:
+            self.advance()
+            return self.group()
+        return self.implicit_term()
+
+    def exponent(self):
+        # e^3x → e^(3x), but e^(3)x stays e^3·x
+        if self.peek()[0] == LPAREN:
+            return self.prefix()
+        return self.implicit_term()
+
+    def implicit_term(self):
+        sign = 1
+        while self.peek()[0] == OP and self.peek()[1] in "+-":
+            if self.advance()[1] == "-":
+                sign = -sign
+
+        term = self.expression(_INFIX["^"] - 1)
+        while self.peek()[0] in _TERM_CONTINUE:
+            term = term * self.expression(_INFIX["^"] - 1)
+
+        return -term if sign < 0 else term
+
+
+def _apply(op, left, right):
+    if op == "+":
+        return left + right
+    if op == "-":
+        return left - right
+    if op == "*":
+        return left * right
+    if op == "/":
+        return left / right
+    return left ** right
+
+
+def parse(text):
+    # Parses the right-hand side of an equation into a sympy expression.
+    with profiling.span("tokenize", "calculations"):
+        parser = Parser(text)
+    with profiling.span("build_expression", "calculations"):
+        return parser.parse()
@@ -1,17 +1,80 @@
+from contextlib import contextmanager
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-import matplotlib.pyplot as plt
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+from matplotlib.collections import LineCollection
+from matplotlib.figure import Figure
 import numpy as np
-import sympy as sp
 import random
 
+import core
+import profiling
+from curves import CURVE_TYPES, RELATION_TYPES, CurveCache
+from implicit import IMPLICIT, ContourCache
+from sampling import TileCache
+from axis_numbers import AxisNumbers
+
+# Range scale applied per wheel notch
+WHEEL_ZOOM_FACTOR = 1.2
+# Narrowest view span, relative to the distance of its centre from the origin, and widest
+# span. Past these the spacing between floats breaks sampling, so zooming stops there.
+MIN_RELATIVE_SPAN = 1e-9
+MAX_SPAN = 1e12
+# Quiet period after a gesture before curves are resampled in the background
+REFINE_DELAY_MS = 120
+# Seconds of recent spans the performance overlay summarises
+HUD_WINDOW = 2.0
+
+
+def span_allowed(low, high):
+    # Whether an axis range is within the zoom limits.
+    return MIN_RELATIVE_SPAN * max(1.0, abs(low + high) / 2) <= high - low <= MAX_SPAN
+
+
+def random_color():
+    return "#{:06x}".format(random.randint(0, 0xFFFFFF))
+
+
+class SampleSignals(QObject):
+    # (generation, viewport, [(key, spec, x_values, y_values), ...])
+    finished = pyqtSignal(int, object, object)
+
+
+class SampleWorker(QRunnable):
+    # Resamples visible curves for a viewport off the GUI thread.
+
+    def __init__(self, jobs, viewport, generation, signals):
+        super().__init__()
+        self.jobs = jobs
+        self.viewport = viewport
+        self.generation = generation
+        self.signals = signals
+
+    def run(self):
+        x_min, x_max, y_min, y_max, width, height = self.viewport
+        results = []
+        for key, spec, f, cache in self.jobs:
+            with profiling.span("background_sample", "graphing") as span:
+                x_values, y_values, evaluations = cache.sample(
+                    spec, f, float(x_min), float(x_max), float(y_min), float(y_max), width, height
+                )
+                span.set(evaluations=evaluations)
+            results.append((key, spec, x_values, y_values))
+
+        self.signals.finished.emit(self.generation, self.viewport, results)
+
 
 class GraphCanvas(FigureCanvas):
+    # Emitted once, after the first full draw has been painted
+    first_drawn = pyqtSignal()
+
     def __init__(self, parent, main_window):
        # Graphing canvas that dynamically fetches equations from the main window."""
         if main_window is None:
             raise ValueError("main_window reference is required")
 
-        fig, self.ax = plt.subplots(figsize=(10, 8), dpi=100)
+        # A standalone figure: pyplot is slow to import and keeps global figure state
+        fig = Figure(figsize=(10, 8), dpi=100)
+        self.ax = fig.add_subplot()
         fig.subplots_adjust(left=0.01, right=0.99, top=0.99, bottom=0.01)
         super().__init__(fig)
         self.setParent(parent)
@@ -26,187 +89,288 @@ class GraphCanvas(FigureCanvas):
 
         self.grid_enabled = True
         self.axis_numbers_enabled = True
+        self.intersections_enabled = False
 
         self.unit_mode = "radians"
 
-        self.plot_default_graph()
-
-    def plot_default_graph(self):
-        # Plots the grid and axes while keeping existing equations intact.
-        self.ax.clear()
-        self.ax.set_xlim(self.x_min, self.x_max)
-        self.ax.set_ylim(self.y_min, self.y_max)
-
-        self.ax.axhline(0, color='grey', linewidth=1)
-        self.ax.axvline(0, color='grey', linewidth=1)
+        # One persistent line per equation, keyed on the equation's id
+        self.curves = {}
+        # What each curve was last sampled for, so unchanged curves are not resampled
+        self.sampled_state = {}
+        self.tile_cache = TileCache()
+        # Implicit equations are contoured in 2-D tiles instead
+        self.contour_cache = ContourCache()
+        # and parametric and polar curves along their parameter
+        self.parametric_cache = CurveCache()
+        self.x_numbers = AxisNumbers(self.ax, fontsize=7, ha='center', va='top', color='grey')
+        self.y_numbers = AxisNumbers(self.ax, fontsize=7, ha='right', va='center', color='grey')
+        self.ax.add_artist(self.x_numbers)
+        self.ax.add_artist(self.y_numbers)
+
+        # Bitmap of the grid, axes and numbers; curves are blitted on top of it
+        self.background = None
+        self.drawn = False
+        self.mpl_connect("draw_event", self.on_draw)
 
         for spine in self.ax.spines.values():
             spine.set_visible(False)
 
         self.ax.set_frame_on(False)
         self.ax.patch.set_visible(False)
+        self.ax.xaxis.set_visible(False)
+        self.ax.yaxis.set_visible(False)
 
-        xticks = np.arange(self.x_min, self.x_max + self.x_step, self.x_step)
-        yticks = np.arange(self.y_min, self.y_max + self.y_step, self.y_step)
+        self.grid_lines = LineCollection([], colors="grey", linestyles="--", linewidths=0.8, alpha=0.6)
+        self.ax.add_collection(self.grid_lines, autolim=False)
 
-        # Prevent borders
-        if len(xticks) > 1:
-            xticks = xticks[1:]
-        if len(yticks) > 1:
-            yticks = yticks[:-1]
+        self.ax.axhline(0, color='grey', linewidth=1)
+        self.ax.axvline(0, color='grey', linewidth=1)
 
-        self.ax.set_xticks(xticks)
-        self.ax.set_yticks(yticks)
+        # Where visible curves cross: [(key_a, key_b, x, y)], and what they were found for
+        self.intersections = []
+        self.intersection_state = None
+        self.intersection_markers, = self.ax.plot([], [], 'o', color='#595959', markersize=5,
+                                                  animated=True, zorder=3)
+
+        # Performance overlay: frame time, sampling rate and tile cache hit rate, top left
+        self.hud_enabled = False
+        self.hud = self.ax.text(0.01, 0.99, "", transform=self.ax.transAxes, ha='left', va='top',
+                                fontsize=8, family='monospace', color='#595959', animated=True, zorder=4,
+                                bbox=dict(facecolor='white', edgecolor='#dddddd', alpha=0.85))
+
+        # Pending redraw level ("curves" or "full"), rendered at most once per event-loop pass
+        self.pending_redraw = None
+        self.redraw_scheduled = False
+        self.batch_depth = 0
+
+        # Mouse navigation: drag to pan, wheel to zoom about the cursor
+        self.pan_start = None
+        self.interacting = False
+        self.sample_generation = 0
+        self.sample_signals = SampleSignals()
+        self.sample_signals.finished.connect(self.on_samples_ready)
+
+        self.refine_timer = QTimer(self)
+        self.refine_timer.setSingleShot(True)
+        self.refine_timer.setInterval(REFINE_DELAY_MS)
+        self.refine_timer.timeout.connect(self.end_interaction)
+
+        self.mpl_connect("button_press_event", self.on_press)
+        self.mpl_connect("motion_notify_event", self.on_motion)
+        self.mpl_connect("button_release_event", self.on_release)
+        self.mpl_connect("scroll_event", self.on_scroll)
+
+        self.build_static_layer()
 
+    def plot_default_graph(self):
+        # Marks the static layer (grid, axes, numbers) dirty; it is rebuilt on the next redraw.
+        self.schedule_redraw(full=True)
 
-        self.ax.tick_params(axis='both', direction='in', length=0)
+    def build_static_layer(self):
+        self.background = None
+        self.ax.set_xlim(self.x_min, self.x_max)
+        self.ax.set_ylim(self.y_min, self.y_max)
+
+        with profiling.span("static_layer", "graphing"):
+            segments, x_numbers, y_numbers = core.static_layer(self.viewport(), self.x_step, self.y_step)
 
+        # The grid is one collection rather than per-tick artists
+        self.grid_lines.set_visible(self.grid_enabled)
         if self.grid_enabled:
-            self.ax.grid(True, linestyle="--", color="grey", alpha=0.6)
+            self.grid_lines.set_segments(segments)
 
-        self.ax.set_xticklabels([])
-        self.ax.set_yticklabels([])
+        self.x_numbers.set_visible(self.axis_numbers_enabled)
+        self.y_numbers.set_visible(self.axis_numbers_enabled)
 
         if self.axis_numbers_enabled:
-            x_offset = (self.y_max - self.y_min) * 0.02
-            y_offset = (self.x_max - self.x_min) * 0.02
-
-            for x in np.arange(self.x_min, self.x_max + self.x_step, self.x_step):
-                if x != 0:
-                    self.ax.annotate(
-                        str(int(x)) if x.is_integer() else f"{x:.2f}",
-                        (x, 0 - x_offset),
-                        fontsize=7,
-                        ha='center',
-                        va='top',
-                        color='grey'
-                    )
+            self.x_numbers.set_labels(*x_numbers)
+            self.y_numbers.set_labels(*y_numbers)
 
-            for y in np.arange(self.y_min, self.y_max + self.y_step, self.y_step):
-                if y != 0:
-                    self.ax.annotate(
-                        str(int(y)) if y.is_integer() else f"{y:.2f}",
-                        (0 - y_offset, y),
-                        fontsize=7,
-                        ha='right',
-                        va='center',
-                        color='grey'
+    def plot_equation(self, equation_type, coefficients, indep_var, color=None, key=None, visible=True):
+        # Creates or updates the persistent line for key. Does not draw the canvas.
+        if color is None:
+            color = random_color()
+        if key is None:
+            key = object()
+
+        line = self.curves.get(key)
+        if line is None:
+            # Animated lines are left out of full draws and blitted over the background
+            with profiling.span("create_artist", "graphing"):
+                line, = self.ax.plot([], [], color=color, animated=True)
+            self.curves[key] = line
+
+        line.set_color(color)
+        line.set_visible(visible)
+
+        if visible:
+            spec = (equation_type, coefficients, indep_var, self.unit_mode)
+            state = (spec, self.viewport())
+            previous = self.sampled_state.get(key)
+
+            # During a pan or zoom gesture existing samples are just transformed with the axes
+            if self.interacting and previous is not None and previous[0] == spec:
+                return color
+
+            # Hidden curves and unchanged curves keep their existing samples
+            if previous != state:
+                if previous is not None and previous[0] != spec:
+                    self.curve_cache(previous[0]).invalidate(previous[0])
+
+                with profiling.span("compile", "graphing"):
+                    f, equation_label = self.equation_function(equation_type, coefficients, indep_var)
+
+                # Overlapping x-tiles from earlier viewports are reused; only missing ones are sampled
+                with profiling.span("sample", "graphing") as span:
+                    x_values, y_values, evaluations = self.curve_cache(spec).sample(
+                        spec, f,
+                        float(self.x_min), float(self.x_max),
+                        float(self.y_min), float(self.y_max),
+                        self.ax.bbox.width, self.ax.bbox.height
                     )
+                    span.set(evaluations=evaluations)
 
-        self.redraw_equations()
-        self.draw()
-
-    def plot_equation(self, equation_type, coefficients, indep_var, color=None):
-        if color is None:
-            color = "#{:06x}".format(random.randint(0, 0xFFFFFF))
-
-        x_values = np.linspace(float(self.x_min), float(self.x_max), 400)
-
-        if equation_type == "linear":
-            m, b = coefficients
-            y_values = m * x_values + b
-            equation_label = f"{indep_var} = {m}x + {b}"
-
-        elif equation_type == "quadratic":
-            a, b, c = coefficients
-            y_values = a * (x_values ** 2) + b * x_values + c
-            equation_label = f"{indep_var} = {a}x² + {b}x + {c}"
-
-        elif equation_type == "cubic":
-            a, b, c, d = coefficients
-            y_values = a * (x_values ** 3) + b * (x_values ** 2) + c * x_values + d
-            equation_label = f"{indep_var} = {a}x³ + {b}x² + {c}x + {d}"
-
-        elif equation_type == "quartic":
-            a, b, c, d, e = coefficients
-            y_values = a * (x_values ** 4) + b * (x_values ** 3) + c * (x_values ** 2) + d * x_values + e
-            equation_label = f"{indep_var} = {a}x⁴ + {b}x³ + {c}x² + {d}x + {e}"
-
-        elif equation_type == "reciprocal":
-            numerator, exponent = coefficients
-            x_values = x_values[x_values != 0]
-            y_values = numerator / (x_values ** exponent)
-            equation_label = f"{indep_var} = {numerator}/{indep_var}^{exponent}"
-
-        elif equation_type == "exponential":
-            (base,) = coefficients
-            if base == "e":
-                y_values = np.exp(x_values)
-                equation_label = f"{indep_var} = e^{indep_var}"
-            else:
-                y_values = np.power(float(base), x_values)
-                equation_label = f"{indep_var} = {base}^{indep_var}"
-
-        elif equation_type == "logarithmic":
-            (base,) = coefficients
-            x_values = np.linspace(0.01, self.x_max, 400)  # Avoid log(0)
-            if base == "e":
-                y_values = np.log(x_values)
-                equation_label = f"{indep_var} = ln({indep_var})"
-            else:
-                y_values = np.log(x_values) / np.log(float(base))
-                equation_label = f"{indep_var} = log[{base}]({indep_var})"
-
-        elif equation_type == "trigonometric":
-            (func,) = coefficients
-            x_vals = np.deg2rad(x_values) if self.unit_mode == "degrees" else x_values
-            if func == "sin":
-                y_values = np.sin(x_vals)
-                equation_label = f"{indep_var} = sin({indep_var})"
-            elif func == "cos":
-                y_values = np.cos(x_vals)
-                equation_label = f"{indep_var} = cos({indep_var})"
-            elif func == "tan":
-                y_values = np.tan(x_vals)
-                y_values[np.abs(y_values) > 20] = np.nan
-                equation_label = f"{indep_var} = tan({indep_var})"
-
-        elif equation_type == "inverse_trig":
-            (func,) = coefficients
-            if func == "arcsin":
-                x_values = x_values[(x_values >= -1) & (x_values <= 1)]
-                y_values = np.arcsin(x_values)
-                equation_label = f"{indep_var} = arcsin({indep_var})"
-            elif func == "arccos":
-                x_values = x_values[(x_values >= -1) & (x_values <= 1)]
-                y_values = np.arccos(x_values)
-                equation_label = f"{indep_var} = arccos({indep_var})"
-            elif func == "arctan":
-                y_values = np.arctan(x_values)
-                equation_label = f"{indep_var} = arctan({indep_var})"
-        elif equation_type == "symbolic":
-            expr = coefficients
-            x_sym = sp.Symbol(indep_var)
-
-            try:
-                is_trig = any(expr.has(getattr(sp, f)) for f in ["sin", "cos", "tan"])
-
-                # Apply degrees mode if necessary
-                if is_trig and self.unit_mode == "degrees":
-                    x_values_eval = np.deg2rad(x_values)
-                else:
-                    x_values_eval = x_values
-
-                f = sp.lambdify(x_sym, expr, modules=["numpy", "sympy"])
-                y_values = f(x_values_eval)
-                y_values = np.where(np.isfinite(y_values), y_values, np.nan)
-
-            except Exception:
-                y_values = np.full_like(x_values, np.nan)
-
-            equation_label = sp.latex(expr)
-        else:
-            raise ValueError("Unsupported equation type")
+                with profiling.span("set_data", "graphing"):
+                    line.set_data(x_values, y_values)
+                    line.set_label(equation_label)
+                self.sampled_state[key] = state
 
-        self.ax.plot(x_values, y_values, color=color, label=equation_label)
-        self.draw()
         return color
 
+    def remove_equation(self, key):
+        line = self.curves.pop(key, None)
+        if line is not None:
+            line.remove()
+        # Tiles are kept so a redo is instant; they age out of the LRU otherwise
+        self.sampled_state.pop(key, None)
+
+    def on_draw(self, event):
+        # A full draw renders only the static layer: cache it, then paint the curves.
+        self.background = self.copy_from_bbox(self.figure.bbox)
+        self.draw_curves()
+
+        if not self.drawn:
+            self.drawn = True
+            self.first_drawn.emit()
+
+    def draw_curves(self):
+        for line in self.curves.values():
+            self.ax.draw_artist(line)
+        if self.intersections_enabled:
+            self.ax.draw_artist(self.intersection_markers)
+        if self.hud_enabled:
+            self.update_hud()
+            self.ax.draw_artist(self.hud)
+
+    def update_hud(self):
+        # The overlay reports the previous frame, since this one is still being drawn.
+        frame_times, evaluations, sample_time = [], 0, 0
+        for name, _, _, duration, _, args in profiling.spans(HUD_WINDOW):
+            if name == "frame":
+                frame_times.append(duration / 1e6)
+            elif args and "evaluations" in args:
+                evaluations += args["evaluations"]
+                sample_time += duration / 1e9
+
+        with self.tile_cache.lock:
+            hit_rate = self.tile_cache.tiles.stats()["hit_rate"]
+
+        last = frame_times[-1] if frame_times else 0.0
+        average = sum(frame_times) / len(frame_times) if frame_times else 0.0
+        rate = evaluations / sample_time if sample_time else 0.0
+        self.hud.set_text(f"frame    {last:7.1f} ms\n"
+                          f"average  {average:7.1f} ms\n"
+                          f"eval/s   {rate:10,.0f}\n"
+                          f"tile hits {hit_rate:6.0%}")
+
+    def blit_curves(self):
+        # Repaints the curves over the cached background without redrawing the grid.
+        if self.background is None:
+            self.draw()
+            return
+
+        self.restore_region(self.background)
+        self.draw_curves()
+        self.blit(self.figure.bbox)
+
+    def refresh_equations(self):
+        self.schedule_redraw()
+
+    def schedule_redraw(self, full=False):
+        # Coalesces redraw requests; a full redraw supersedes a curves-only one.
+        if full or self.pending_redraw is None:
+            self.pending_redraw = "full" if full else (self.pending_redraw or "curves")
+
+        if self.batch_depth == 0 and not self.redraw_scheduled:
+            self.redraw_scheduled = True
+            QTimer.singleShot(0, self.flush_redraw)
+
+    @contextmanager
+    def batch(self):
+        # Groups range, step and curve changes into a single redraw.
+        self.batch_depth += 1
+        try:
+            yield
+        finally:
+            self.batch_depth -= 1
+            if self.batch_depth == 0 and self.pending_redraw is not None:
+                self.schedule_redraw(full=self.pending_redraw == "full")
+
+    def flush_redraw(self):
+        # Performs the pending redraw immediately.
+        self.redraw_scheduled = False
+        level = self.pending_redraw
+        if level is None or self.batch_depth:
+            return
+        self.pending_redraw = None
+
+        with profiling.span("frame", "graphing", level=level):
+            if level == "full":
+                self.build_static_layer()
+                self.redraw_equations()
+                self.update_intersections()
+                with profiling.span("draw", "graphing"):
+                    self.draw()
+            else:
+                self.redraw_equations()
+                self.update_intersections()
+                with profiling.span("blit", "graphing"):
+                    self.blit_curves()
+
+    def curve_cache(self, spec):
+        # Where samples for the equation spec are kept: contour tiles for implicit equations
+        # and whole curves for parametric and polar ones.
+        if spec[0] == IMPLICIT:
+            return self.contour_cache
+        if spec[0] in CURVE_TYPES:
+            return self.parametric_cache
+        return self.tile_cache
+
+    def viewport(self):
+        return (self.x_min, self.x_max, self.y_min, self.y_max,
+                self.ax.bbox.width, self.ax.bbox.height)
+
+    def equation_function(self, equation_type, coefficients, indep_var):
+        # Returns a vectorized function of x and a label for the equation.
+        return core.equation_function(equation_type, coefficients, indep_var, self.unit_mode)
+
     def toggle_grid(self):
         # Toggles grid visibility while keeping equations intact.
         self.grid_enabled = not self.grid_enabled
         self.plot_default_graph()
 
+    def toggle_intersections(self):
+        # Shows or hides the markers where visible curves cross.
+        self.intersections_enabled = not self.intersections_enabled
+        self.schedule_redraw()
+
+    def toggle_performance_overlay(self):
+        # Shows or hides the overlay. Spans are collected only while it is shown, unless
+        # profiling was asked for at startup.
+        self.hud_enabled = not self.hud_enabled
+        profiling.enable(self.hud_enabled or profiling.requested)
+        self.schedule_redraw()
+
     def toggle_axis_numbers(self):
         # Toggles axis numbers visibility while keeping equations intact.
         self.axis_numbers_enabled = not self.axis_numbers_enabled
@@ -225,8 +389,138 @@ class GraphCanvas(FigureCanvas):
         self.plot_default_graph()
 
     def redraw_equations(self):
-        # Replots only the visible equations from MainWindow.
-        for equation_data in self.main_window.equations:
-            equation_widget, equation_type, coefficients, color, visible, indep_var = equation_data
+        # Brings the persistent lines in line with the equations in MainWindow.
+        keys = set()
+        for equation_data in self.main_window.equations.plotted():
+            equation_id, equation_type, coefficients, color, visible, indep_var = equation_data
+            keys.add(equation_id)
+            self.plot_equation(equation_type, coefficients, indep_var, color, key=equation_id, visible=visible)
+
+        for key in list(self.curves):
+            if key not in keys:
+                self.remove_equation(key)
+
+    def update_intersections(self):
+        # Finds where the visible curves cross, reusing each line's current samples. Markers
+        # are in data coordinates, so during a gesture they just move with the view and are
+        # recomputed once the curves have been resampled.
+        if not self.intersections_enabled or self.interacting:
+            return
+
+        # Imported on first use: it loads scipy, which startup does not need
+        from intersections import find_intersections
+
+        functions, samples = {}, {}
+        for equation_id, equation_type, coefficients, color, visible, indep_var in self.main_window.equations.plotted():
+            line = self.curves.get(equation_id)
+            # Implicit, parametric and polar equations are not functions of x, so crossings
+            # with them are not marked
+            if visible and line is not None and equation_type not in RELATION_TYPES:
+                functions[equation_id], _ = self.equation_function(equation_type, coefficients, indep_var)
+                x_values, y_values = line.get_xdata(), line.get_ydata()
+                if len(x_values):
+                    samples[equation_id] = (np.asarray(x_values, dtype=float), np.asarray(y_values, dtype=float))
+
+        state = ([(key, self.sampled_state.get(key)) for key in functions], self.x_min, self.x_max)
+        if state == self.intersection_state:
+            return
+        self.intersection_state = state
+
+        with profiling.span("intersections", "graphing"):
+            self.intersections = find_intersections(functions, float(self.x_min), float(self.x_max), samples)
+        self.intersection_markers.set_data([point[2] for point in self.intersections],
+                                           [point[3] for point in self.intersections])
+
+    def on_press(self, event):
+        if event.button != 1 or event.inaxes is not self.ax:
+            return
+
+        self.pan_start = (event.x, event.y, self.x_min, self.x_max, self.y_min, self.y_max)
+        self.interacting = True
+        self.refine_timer.stop()
+
+    def on_motion(self, event):
+        if self.pan_start is None:
+            return
+
+        start_x, start_y, x_min, x_max, y_min, y_max = self.pan_start
+        dx = -(event.x - start_x) * (x_max - x_min) / self.ax.bbox.width
+        dy = -(event.y - start_y) * (y_max - y_min) / self.ax.bbox.height
+
+        self.set_view(x_min + dx, x_max + dx, y_min + dy, y_max + dy)
+
+    def on_release(self, event):
+        if self.pan_start is None:
+            return
+
+        self.pan_start = None
+        self.end_interaction()
+
+    def on_scroll(self, event):
+        # Zooms about the cursor so the point under it stays fixed.
+        if event.inaxes is not self.ax:
+            return
+
+        factor = 1 / WHEEL_ZOOM_FACTOR if event.button == "up" else WHEEL_ZOOM_FACTOR
+        self.interacting = True
+        if self.zoom_view(factor, event.xdata, event.ydata):
+            self.refine_timer.start()
+        else:
+            self.interacting = False
+
+    def zoom_view(self, factor, x=None, y=None):
+        # Scales the view's ranges by factor about (x, y), the centre of the view by default.
+        # Returns False, leaving the view as it is, if that would pass the zoom limits.
+        if x is None:
+            x = (self.x_min + self.x_max) / 2
+        if y is None:
+            y = (self.y_min + self.y_max) / 2
+
+        x_min, x_max = x - (x - self.x_min) * factor, x + (self.x_max - x) * factor
+        y_min, y_max = y - (y - self.y_min) * factor, y + (self.y_max - y) * factor
+        if not (span_allowed(x_min, x_max) and span_allowed(y_min, y_max)):
+            return False
+
+        self.set_view(x_min, x_max, y_min, y_max, rescale_steps=True)
+        return True
+
+    def set_view(self, x_min, x_max, y_min, y_max, rescale_steps=False):
+        self.x_min, self.x_max = x_min, x_max
+        self.y_min, self.y_max = y_min, y_max
+
+        if rescale_steps:
+            self.x_step = self.main_window.get_nice_step(x_max - x_min)
+            self.y_step = self.main_window.get_nice_step(y_max - y_min)
+
+        self.plot_default_graph()
+        self.main_window.update_zoom_label()
+
+    def end_interaction(self):
+        # Resamples the curves for the final viewport on a worker thread.
+        self.interacting = False
+        self.sample_generation += 1
+
+        jobs = []
+        for equation_id, equation_type, coefficients, color, visible, indep_var in self.main_window.equations.plotted():
             if visible:
-                self.plot_equation(equation_type, coefficients, indep_var, color)
+                spec = (equation_type, coefficients, indep_var, self.unit_mode)
+                f, _ = self.equation_function(equation_type, coefficients, indep_var)
+                jobs.append((equation_id, spec, f, self.curve_cache(spec)))
+
+        if jobs:
+            worker = SampleWorker(jobs, self.viewport(), self.sample_generation, self.sample_signals)
+            QThreadPool.globalInstance().start(worker)
+
+    def on_samples_ready(self, generation, viewport, results):
+        # Swaps refined samples in, unless a newer gesture or edit has superseded them.
+        if generation != self.sample_generation or self.interacting:
+            return
+
+        for key, spec, x_values, y_values in results:
+            line = self.curves.get(key)
+            state = self.sampled_state.get(key)
+            if line is not None and state is not None and state[0] == spec:
+                line.set_data(x_values, y_values)
+                self.sampled_state[key] = (spec, viewport)
+
+        self.schedule_redraw()
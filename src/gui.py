@@ -1,30 +1,71 @@
+import importlib
 import os
-import re
+import threading
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QFrame,
                              QHBoxLayout, QVBoxLayout, QLabel, QSizePolicy, QToolButton,
-                             QLineEdit, QPushButton, QMessageBox, QStackedWidget)
-from PyQt5.QtGui import QFont, QIcon
-from PyQt5.QtCore import Qt, QSize
-
-from graphing import GraphCanvas
-from calculations import parse_equation
-from settings import SettingsPanel
-from maths import MathsPanel
+                             QPushButton, QMessageBox, QStackedWidget)
+from PyQt5.QtGui import QIcon
+from PyQt5.QtCore import Qt, QSize, pyqtSignal
+
+import core
+import startup
+from equation_list import EquationListView, EquationModel
+from graphing import GraphCanvas, random_color
 import numpy as np
-from pick_equation import Pick_Equation_Panel
-from manual import ManualPanel
 
 
 # Define constants for paths
 FONT_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "assets", "fonts", "Righteous-Regular.ttf"))
 ICON_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "assets", "icons"))
 
+# Left-section pages after the equation panel, as (module, class), built when first used
+SETTINGS_INDEX, MATHS_INDEX, PICK_EQUATION_INDEX, MANUAL_INDEX = 1, 2, 3, 4
+LAZY_PANELS = {
+    SETTINGS_INDEX: ("settings", "SettingsPanel"),
+    MATHS_INDEX: ("maths", "MathsPanel"),
+    PICK_EQUATION_INDEX: ("pick_equation", "Pick_Equation_Panel"),
+    MANUAL_INDEX: ("manual", "ManualPanel"),
+}
+# Imported on a background thread once the graph is on screen, so the first parse or
+# panel switch does not wait for sympy, scipy and the panels' modules
+WARM_MODULES = ("calculations", "operations", "intersections", "rendering", "result_store",
+                "maths", "settings", "pick_equation", "manual")
+
+
+class PanelStack(QStackedWidget):
+    # Stacked widget whose pages can be created on first use. A lazy page is an empty
+    # placeholder until it is shown or fetched with page(), when factory() replaces it.
+
+    def __init__(self):
+        super().__init__()
+        self.factories = {}
+
+    def add_lazy_page(self, factory):
+        index = self.addWidget(QWidget())
+        self.factories[index] = factory
+        return index
+
+    def page(self, index):
+        factory = self.factories.pop(index, None)
+        if factory is not None:
+            placeholder = self.widget(index)
+            self.insertWidget(index, factory())
+            self.removeWidget(placeholder)
+            placeholder.deleteLater()
+        return self.widget(index)
+
+    def setCurrentIndex(self, index):
+        self.page(index)
+        super().setCurrentIndex(index)
+
 class MainWindow(QMainWindow):
+    # Emitted from the warm-up thread once WARM_MODULES are imported; delivered on the GUI thread
+    warmed_up = pyqtSignal()
 
     def __init__(self):
         super().__init__()
-        self.equation_boxes = []
-        self.equations = []
+        # Equations by stable id; the graph, undo and the maths panels refer to them by id
+        self.equations = EquationModel()
         self.undo_stack = []
         self.initUI()
 
@@ -59,34 +100,27 @@ class MainWindow(QMainWindow):
         self.add_button.setIconSize(QSize(18, 18))
         self.add_button.setFixedSize(40, 40)
         self.add_button.setStyleSheet("border-radius: 20px; background-color: #f3f3f3;")
-        self.add_button.clicked.connect(self.add_equation_box)
+        self.add_button.clicked.connect(lambda: self.add_equation_box())
+
+        # Equation rows are drawn by the view rather than built as widgets, so there is no
+        # limit on how many there are
+        self.equation_list = EquationListView(self.equations, self.process_equation, self.toggle_visibility)
 
         self.left_layout.addWidget(title_label, 0)
         self.left_layout.addWidget(toolbar, 0)
+        self.left_layout.addWidget(self.equation_list, 0)
         self.left_layout.addWidget(self.add_button, 0, Qt.AlignCenter)
         self.left_layout.addStretch(1)
-        self.add_equation_box()
-
-        # --- SETTINGS PANEL ---
-        self.settings_panel = SettingsPanel(self)
-
-        # --- MATHS PANEL ---
-        self.maths_panel = MathsPanel(self)
-
-        # --- PICK EQUATION PANEL ---
-        self.pick_equation_panel = Pick_Equation_Panel(self)
-
-        # --- PICK MANUAL PANEL ---
-        self.manual_panel = ManualPanel(self)
+        self.equations.append([self.equations.create()])
 
         # --- LEFT SECTION (STACKED WIDGET) ---
-        self.left_section = QStackedWidget()  # Allows switching between panels
+        # Settings, Maths, Pick Equation and Manual panels are built the first time they are used
+        self.left_section = PanelStack()  # Allows switching between panels
         self.left_section.addWidget(self.equation_panel)  # Index 0 → Equation Panel
-        self.left_section.addWidget(self.settings_panel)  # Index 1 → Settings Panel
-        self.left_section.addWidget(self.maths_panel)  # Index 2 → Maths Panel
-        self.left_section.addWidget(self.pick_equation_panel)  # Index 3 → Choose Equation Panel
-        self.left_section.addWidget(self.manual_panel)  # Index 4 → Manual Panel
-        self.manual_index = self.left_section.count() - 1
+        for index, (module_name, class_name) in sorted(LAZY_PANELS.items()):
+            self.left_section.add_lazy_page(
+                lambda module_name=module_name, class_name=class_name: self.create_panel(module_name, class_name))
+        self.manual_index = MANUAL_INDEX
 
         # --- GRAPH SECTION ---
         self.graph_section = QWidget()
@@ -98,6 +132,8 @@ class MainWindow(QMainWindow):
         self.graph_container_layout.setContentsMargins(0, 0, 0, 0)
 
         self.graph_canvas = GraphCanvas(self, main_window=self)
+        self.graph_canvas.first_drawn.connect(self.on_first_paint)
+        self.warmed_up.connect(self.on_warmed_up)
         self.graph_canvas.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         self.graph_container_layout.addWidget(self.graph_canvas, 1)
 
@@ -154,9 +190,6 @@ class MainWindow(QMainWindow):
 
         self.zoom_panel.raise_()
 
-        self.zoom_level = 0  # 0 = 100%
-        self.max_zoom = 5
-
         # Connect zoom buttons to functions
         self.zoom_in_button.clicked.connect(self.zoom_in)
         self.zoom_out_button.clicked.connect(self.zoom_out)
@@ -203,81 +236,97 @@ class MainWindow(QMainWindow):
         return btn
 
     def add_equation_box(self):
-        # Creates a new equation input box and updates the UI.
-
-        if len(self.equation_boxes) >= 10:
-            QMessageBox.warning(self, "Limit Reached", "You have reached the maximum allowed equations.")
+        # Adds an empty equation row and opens it for typing.
+        equation = self.equations.create()
+        self.equations.append([equation])
+        self.equation_list.edit_equation(equation.id)
+
+    def import_equations(self, texts):
+        # Adds and plots many equations at once, such as a problem set loaded from a file.
+        # The rows are inserted and the graph refreshed once, not per equation. Returns the
+        # texts that could not be parsed, which are added as rows to be corrected.
+        rows, invalid = [], []
+        for text in texts:
+            equation = self.equations.create(core.normalise(text))
+            parsed_equation = core.parse(equation.text)
+            if parsed_equation is None:
+                invalid.append(text)
+            else:
+                equation.equation_type, equation.coefficients, _, equation.indep_var = parsed_equation
+                equation.color = random_color()
+            rows.append(equation)
+
+        # An untouched empty row at the end is replaced by the imported ones
+        last = self.equations.rows[-1] if len(self.equations) else None
+        if last is not None and not last.text and last.equation_type is None:
+            self.equations.pop()
+        self.equations.append(rows)
+        self.update_graph()
+        return invalid
+
+    def process_equation(self, equation_id):
+        # Processes the entered equation, updates tracking, and redraws the graph.
+        equation = self.equations.get(equation_id)
+        if equation is None:
             return
+        equation_text = core.normalise(equation.text)
+        self.equations.update(equation_id, text=equation_text)
 
-        index = len(self.equation_boxes) + 1  # Equation Number
-
-        equation_widget = QWidget()
-        equation_layout = QHBoxLayout(equation_widget)
-        equation_layout.setContentsMargins(0, 0, 0, 0)
-        equation_layout.setSpacing(5)
-
-        # Number label
-        number_label = QLabel(str(index))
-        number_label.setFixedWidth(20)
-        number_label.setAlignment(Qt.AlignCenter)
-        number_label.setStyleSheet("color: #595959; font-weight: bold; font-family: Helvetica;")
-
-        # Eye button
-        eye_button = QToolButton()
-        eye_button.setIcon(QIcon(os.path.join(ICON_PATH, "grey_open_eye.png")))
-        eye_button.setIconSize(QSize(20, 20))
-        eye_button.setStyleSheet("border: none;")
-
-        eye_button.clicked.connect(lambda: self.toggle_visibility(equation_widget, eye_button))
-
-        # Equation input box
-        equation_input = QLineEdit()
-        equation_input.setPlaceholderText("Enter equation...")
-        equation_input.setFont(QFont("Times New Roman", 14))
-        equation_input.setStyleSheet("color: #595959; background-color: white; border: 1px solid #ccc; padding: 5px;")
-
-        equation_input.returnPressed.connect(lambda: self.process_equation(equation_input, equation_widget))
+        parsed_equation = core.parse(equation_text)
+        if parsed_equation is None:
+            QMessageBox.warning(self, "Invalid Equation Entered. See below or check formatting",
+                                "This graph supports: linear, quadratic, cubic or quartic only")
+            return
 
-        # Store equation input field for reference
-        equation_widget.equation_input = equation_input
+        equation_type, coefficients, dep_var, indep_var = parsed_equation
 
-        # Add widgets to layout
-        equation_layout.addWidget(number_label)
-        equation_layout.addWidget(eye_button)
-        equation_layout.addWidget(equation_input)
+        if equation.equation_type is not None:
+            self.equations.update(equation_id, equation_type=equation_type, coefficients=coefficients,
+                                  indep_var=indep_var)
+            self.update_graph()
+            return
 
-        self.left_layout.insertWidget(self.left_layout.count() - 2, equation_widget)
-        self.equation_boxes.append(equation_widget)
+        color = self.graph_canvas.plot_equation(equation_type, coefficients, indep_var, key=equation_id)
+        self.equations.update(equation_id, equation_type=equation_type, coefficients=coefficients,
+                              color=color, visible=True, indep_var=indep_var)
+        self.graph_canvas.refresh_equations()
 
-    def process_equation(self, equation_input, equation_widget):
-        # Processes the input equation, updates tracking, and redraws the graph.
-        equation_text = equation_input.text().strip()
+    @property
+    def settings_panel(self):
+        return self.left_section.page(SETTINGS_INDEX)
 
-        match = re.match(r"^([a-zA-Z])=", equation_text)
+    @property
+    def maths_panel(self):
+        return self.left_section.page(MATHS_INDEX)
 
-        if not match:
-            equation_text = "y=" + equation_text
+    @property
+    def pick_equation_panel(self):
+        return self.left_section.page(PICK_EQUATION_INDEX)
 
-        equation_input.setText(equation_text)
+    @property
+    def manual_panel(self):
+        return self.left_section.page(MANUAL_INDEX)
 
-        parsed_equation = parse_equation(equation_text)
-        if parsed_equation is None:
-            QMessageBox.warning(self, "Invalid Equation Entered. See below or check formatting",
-                                "This graph supports: linear, quadratic, cubic or quartic only")
-            return
+    def create_panel(self, module_name, class_name):
+        panel = getattr(importlib.import_module(module_name), class_name)(self)
+        startup.mark(f"{class_name} built")
+        return panel
 
-        equation_type, coefficients, dep_var, indep_var = parsed_equation
+    def on_first_paint(self):
+        # The window is usable now; load what the first operations need in the background.
+        startup.mark("first paint")
+        threading.Thread(target=self.warm_up, daemon=True).start()
 
-        for i, (widget, _, _, color, visible, _) in enumerate(self.equations):
-            if widget == equation_widget:
-                self.equations[i] = (equation_widget, equation_type, coefficients, color, visible, indep_var)
-                self.update_equation_label_color(equation_widget, color)
-                self.update_graph()
-                return
+    def warm_up(self):
+        for module_name in WARM_MODULES:
+            importlib.import_module(module_name)
+        self.warmed_up.emit()
 
-        color = self.graph_canvas.plot_equation(equation_type, coefficients, indep_var)
-        self.equations.append((equation_widget, equation_type, coefficients, color, True, indep_var))
-        self.update_equation_label_color(equation_widget, color)
+    def on_warmed_up(self):
+        # Builds sympy's parser state so the first equation entered parses quickly. This runs
+        # on the GUI thread, as the parse cache is not thread-safe.
+        core.parse("x")
+        startup.mark("background warm-up done")
 
     def on_settings_clicked(self):
         if self.left_section.currentIndex() == 0:
@@ -292,139 +341,49 @@ class MainWindow(QMainWindow):
             self.left_section.setCurrentIndex(0)
 
     def on_undo_clicked(self):
-        # Undo last added equation (Remove from UI and store for redo).
-        if self.equation_boxes:
-            equation_widget = self.equation_boxes.pop()
-
-            for eq in self.equations:
-                if eq[0] == equation_widget:
-                    self.undo_stack.append(eq)
-                    self.equations.remove(eq)
-                    break
-
-            self.left_layout.removeWidget(equation_widget)
-            equation_widget.setParent(None)
-
+        # Undo last added equation (Remove from the list and store for redo).
+        equation = self.equations.pop()
+        if equation is not None:
+            if equation.equation_type is not None:
+                self.undo_stack.append(equation)
             self.update_graph()
 
-            if len(self.equation_boxes) < 10:
-                self.add_button.setDisabled(False)
-
     def on_redo_clicked(self):
-        # Redo (Restore last undone equation, ensuring it is visible with correct icon).
+        # Redo (Restore last undone equation, ensuring it is visible).
         if self.undo_stack:
-            equation_widget, m, b, color, visible, indep_var = self.undo_stack.pop()
-            self.equation_boxes.append(equation_widget)
-            self.left_layout.insertWidget(self.left_layout.count() - 2, equation_widget)
-
-            self.equations.append((equation_widget, m, b, color, True, indep_var))
-
-            self.graph_canvas.plot_equation(m, b, indep_var, color)
-
-            eye_button = equation_widget.findChild(QToolButton)
-            if eye_button:
-                eye_button.setIcon(QIcon(os.path.join(ICON_PATH, "grey_open_eye.png")))
-
-            self.update_equation_label_color(equation_widget, color)
-
+            equation = self.undo_stack.pop()
+            equation.visible = True
+            self.equations.append([equation])
             self.update_graph()
 
-    def delete_last_equation(self):
-        # Removes the last added equation and stores it for undo.
-        if self.equation_boxes:
-            equation_widget = self.equation_boxes.pop()
-            self.undo_stack.append(equation_widget)
-            self.left_layout.removeWidget(equation_widget)
-            equation_widget.setParent(None)
-
-    def update_equation_numbers(self):
-        # Reassigns numbers to all active equation boxes.
-        for index, eq_widget in enumerate(self.equation_boxes, start=1):
-            number_label = eq_widget.findChild(QLabel)  # Get the number label
-            if number_label:
-                number_label.setText(str(index))  # Update the number
-
-    def update_equation_label_color(self, equation_widget, color):
-        # Updates the color of the number label next to an equation.
-        number_label = equation_widget.findChild(QLabel)
-        if number_label:
-            number_label.setStyleSheet(f"color: {color}; font-weight: bold; font-family: Helvetica;")
-
     def update_graph(self):
-        # Redraws all equations currently visible in the list.
-        self.graph_canvas.ax.clear()
-        self.graph_canvas.plot_default_graph()  # Reset Grid
-
-        for _, equation_type, coefficients, color, visible, indep_var in self.equations:
-            if visible:
-                self.graph_canvas.plot_equation(equation_type, coefficients, indep_var, color)
+        # Updates the persistent equation lines in place and blits them over the cached grid.
+        self.graph_canvas.refresh_equations()
 
-        self.graph_canvas.draw()
-
-    def toggle_visibility(self, equation_widget, eye_button):
+    def toggle_visibility(self, equation_id):
         # Toggles the visibility of the equation on the graph.
-        for i, (widget, equation_type, coefficients, color, visible, indep_var) in enumerate(self.equations):
-            if widget == equation_widget:
-                new_visibility = not visible
-                self.equations[i] = (widget, equation_type, coefficients, color, new_visibility, indep_var)
-                icon_path = "grey_open_eye.png" if new_visibility else "grey_closed_eye.png"
-                eye_button.setIcon(QIcon(os.path.join(ICON_PATH, icon_path)))
-
-                self.update_graph()
-                return
+        equation = self.equations.get(equation_id)
+        if equation is not None and equation.equation_type is not None:
+            self.equations.update(equation_id, visible=not equation.visible)
+            self.update_graph()
 
     def get_all_equations(self):
         # Returns a list of all entered equations from the equation panel.
-        equations = []
-
-        for eq_widget in self.equation_boxes:
-            equation_input = eq_widget.findChild(QLineEdit)
-            if equation_input:
-                equations.append(equation_input.text())
-
-        return equations
+        return self.equations.texts()
 
     def zoom_in(self):
-        if self.zoom_level >= self.max_zoom:
-            return
-
-        self.zoom_level += 1
-        self.apply_zoom()
+        # Halves the current view about its centre, keeping any pan or wheel zoom.
+        self.graph_canvas.zoom_view(0.5)
 
     def zoom_out(self):
-        if self.zoom_level <= -self.max_zoom:
-            return
-
-        self.zoom_level -= 1
-        self.apply_zoom()
+        self.graph_canvas.zoom_view(2)
 
     def reset_zoom(self, event=None):
-        self.zoom_level = 0
-        self.apply_zoom()
-
-    def apply_zoom(self):
-        x_center = (self.default_x_min + self.default_x_max) / 2
-        y_center = (self.default_y_min + self.default_y_max) / 2
-
-        x_half_range = (self.default_x_max - self.default_x_min) / 2
-        y_half_range = (self.default_y_max - self.default_y_min) / 2
-
-        zoom_factor = 2 ** (-self.zoom_level)
-
-        new_x_range = x_half_range * zoom_factor
-        new_y_range = y_half_range * zoom_factor
-
-        self.graph_canvas.update_x_axis(x_center - new_x_range, x_center + new_x_range)
-        self.graph_canvas.update_y_axis(y_center - new_y_range, y_center + new_y_range)
-
-        visible_x_range = self.graph_canvas.x_max - self.graph_canvas.x_min
-        visible_y_range = self.graph_canvas.y_max - self.graph_canvas.y_min
-
-        self.graph_canvas.x_step = self.get_nice_step(visible_x_range)
-        self.graph_canvas.y_step = self.get_nice_step(visible_y_range)
-
-        self.graph_canvas.plot_default_graph()
+        # Returns to the default view, as set in the settings panel.
+        self.graph_canvas.set_view(self.default_x_min, self.default_x_max,
+                                   self.default_y_min, self.default_y_max, rescale_steps=True)
 
+    def update_zoom_label(self):
         default_x_range = self.default_x_max - self.default_x_min
         visible_x_range = self.graph_canvas.x_max - self.graph_canvas.x_min
         zoom_ratio = default_x_range / visible_x_range
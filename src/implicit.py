@@ -0,0 +1,216 @@
+import math
+import threading
+
+import numpy as np
+
+from cache import LRUCache
+
+# Equation type of relations F(x, y) = 0, whose coefficients are the sympy expression F
+IMPLICIT = "implicit"
+
+# Viewport span covered by TILES_PER_VIEW to 2 * TILES_PER_VIEW tiles per axis, as in sampling
+TILES_PER_VIEW = 4
+# Cells per tile side on the coarse grid, which is evaluated everywhere
+COARSE_CELLS = 8
+# Cells near the curve are split until they are about this many pixels across
+LEAF_PIXELS = 2
+MAX_LEVELS = 7
+CONTOUR_CACHE_BYTES = 32 * 1024 * 1024
+
+# Corner offsets of a cell, counter-clockwise from bottom-left; edge k joins corners k and k + 1
+_CORNER_I = np.array([0, 1, 1, 0])
+_CORNER_J = np.array([0, 0, 1, 1])
+_EDGES = ((0, 1), (1, 2), (2, 3), (3, 0))
+# Offsets of a cell's four children, in units of half the cell
+_CHILD_I = np.array([0, 1, 0, 1])
+_CHILD_J = np.array([0, 0, 1, 1])
+
+
+def refinement_levels(tile_pixels):
+    # Times a coarse cell is halved so leaves are about LEAF_PIXELS across.
+    cell_pixels = tile_pixels / COARSE_CELLS
+    if cell_pixels <= LEAF_PIXELS:
+        return 0
+    return min(MAX_LEVELS, round(math.log2(cell_pixels / LEAF_PIXELS)))
+
+
+def contour(f, x_min, x_max, y_min, y_max, levels):
+    # Segments of F(x, y) = 0 in the rectangle as (x_values, y_values, evaluations), each
+    # segment followed by NaN so the arrays plot as one broken line. F is evaluated on a
+    # COARSE_CELLS grid, and only cells the curve may pass through are split, levels
+    # times, so the work grows with the curve's length rather than the rectangle's area.
+    # Leaf cells are then contoured with marching squares.
+    n = COARSE_CELLS << levels
+    dx = (x_max - x_min) / n
+    dy = (y_max - y_min) / n
+
+    # Points are integer lattice positions at leaf resolution, so shared corners are evaluated once
+    def evaluate(i, j):
+        keys = i * (n + 1) + j
+        unique, inverse = np.unique(keys, return_inverse=True)
+        unique_i, unique_j = np.divmod(unique, n + 1)
+        with np.errstate(all="ignore"):
+            values = f(x_min + unique_i * dx, y_min + unique_j * dy)
+        values = np.broadcast_to(np.asarray(values, dtype=float), unique.shape)
+        return values[inverse.reshape(keys.shape)], unique.size
+
+    step = 1 << levels
+    cells_i, cells_j = np.meshgrid(np.arange(0, n, step), np.arange(0, n, step), indexing="ij")
+    cells_i, cells_j = cells_i.ravel(), cells_j.ravel()
+    evaluations = 0
+
+    while step > 1 and cells_i.size:
+        half = step // 2
+        # Corners and centre of each cell
+        points_i = np.column_stack([cells_i[:, None] + step * _CORNER_I, cells_i + half])
+        points_j = np.column_stack([cells_j[:, None] + step * _CORNER_J, cells_j + half])
+        values, count = evaluate(points_i, points_j)
+        evaluations += count
+
+        active = _may_cross(values)
+        cells_i = (cells_i[active, None] + half * _CHILD_I).ravel()
+        cells_j = (cells_j[active, None] + half * _CHILD_J).ravel()
+        step = half
+
+    if not cells_i.size:
+        return np.empty(0), np.empty(0), evaluations
+
+    values, count = evaluate(cells_i[:, None] + _CORNER_I, cells_j[:, None] + _CORNER_J)
+    evaluations += count
+    x_values, y_values, count = _marching_squares(f, cells_i, cells_j, values, x_min, y_min, dx, dy)
+    return x_values, y_values, evaluations + count
+
+
+def _may_cross(values):
+    # Cells whose samples change sign, or come closer to zero than they vary across the cell,
+    # so a curve may pass through even if the samples miss it. Cells with only some samples
+    # finite lie across a domain edge or a pole, where the finite ones say too little, so
+    # they are split too.
+    finite = np.isfinite(values)
+    with np.errstate(invalid="ignore"):
+        positive = (values > 0) & finite
+        negative = (values <= 0) & finite
+        low = np.where(finite, values, np.inf).min(axis=1)
+        high = np.where(finite, values, -np.inf).max(axis=1)
+        nearest = np.where(finite, np.abs(values), np.inf).min(axis=1)
+    crosses = positive.any(axis=1) & negative.any(axis=1)
+    partial = finite.any(axis=1) & ~finite.all(axis=1)
+    return crosses | partial | (nearest < high - low)
+
+
+def _marching_squares(f, cells_i, cells_j, values, x_min, y_min, dx, dy):
+    # Line segments through leaf cells from the signs of their corner values.
+    complete = np.isfinite(values).all(axis=1)
+    cells_i, cells_j, values = cells_i[complete], cells_j[complete], values[complete]
+    positive = values > 0
+
+    corners_x = x_min + (cells_i[:, None] + _CORNER_I) * dx
+    corners_y = y_min + (cells_j[:, None] + _CORNER_J) * dy
+
+    # Where the curve crosses each edge, by linear interpolation; NaN where it does not
+    crossing_x = np.full((len(values), 4), np.nan)
+    crossing_y = np.full((len(values), 4), np.nan)
+    for edge, (a, b) in enumerate(_EDGES):
+        crosses = positive[:, a] != positive[:, b]
+        t = values[crosses, a] / (values[crosses, a] - values[crosses, b])
+        crossing_x[crosses, edge] = corners_x[crosses, a] + t * (corners_x[crosses, b] - corners_x[crosses, a])
+        crossing_y[crosses, edge] = corners_y[crosses, a] + t * (corners_y[crosses, b] - corners_y[crosses, a])
+
+    crossed = ~np.isnan(crossing_x)
+    count = crossed.sum(axis=1)
+
+    # Two crossings make one segment
+    single = np.flatnonzero(count == 2)
+    first = crossed[single].argmax(axis=1)
+    second = 3 - crossed[single, ::-1].argmax(axis=1)
+    starts = [(single, first)]
+    ends = [(single, second)]
+
+    # Four crossings are a saddle; the centre's sign decides which corners are cut off
+    saddle = np.flatnonzero(count == 4)
+    joined = (values[saddle].mean(axis=1) > 0) == positive[saddle, 0]
+    for pair_if_joined, pair_if_split in (((0, 1), (3, 0)), ((2, 3), (1, 2))):
+        starts.append((saddle, np.where(joined, pair_if_joined[0], pair_if_split[0])))
+        ends.append((saddle, np.where(joined, pair_if_joined[1], pair_if_split[1])))
+
+    segment_rows = np.concatenate([r for r, _ in starts])
+    start_edges = np.concatenate([e for _, e in starts])
+    end_edges = np.concatenate([e for _, e in ends])
+    x0, y0 = crossing_x[segment_rows, start_edges], crossing_y[segment_rows, start_edges]
+    x1, y1 = crossing_x[segment_rows, end_edges], crossing_y[segment_rows, end_edges]
+
+    # A sign change across a pole (1/(x - y) = 1) is not a curve: F is large between the
+    # crossings instead of close to zero
+    with np.errstate(all="ignore"):
+        middle = np.broadcast_to(np.asarray(f((x0 + x1) / 2, (y0 + y1) / 2), dtype=float), x0.shape)
+    scale = np.abs(values[segment_rows]).max(axis=1)
+    keep = np.abs(middle) <= scale
+    x0, y0, x1, y1 = x0[keep], y0[keep], x1[keep], y1[keep]
+
+    gaps = np.full(x0.shape, np.nan)
+    x_values = np.column_stack([x0, x1, gaps]).ravel()
+    y_values = np.column_stack([y0, y1, gaps]).ravel()
+    return x_values, y_values, len(segment_rows)
+
+
+def _tile_nbytes(tile):
+    x_values, y_values = tile
+    return x_values.nbytes + y_values.nbytes
+
+
+class ContourCache:
+    # Contours per relation stored in tiles of power-of-two width and height, the 2-D
+    # counterpart of sampling.TileCache: a pan or zoom within a factor of two only
+    # contours the tiles that are new.
+
+    def __init__(self, max_bytes=CONTOUR_CACHE_BYTES):
+        self.tiles = LRUCache(maxsize=1 << 16, maxbytes=max_bytes, sizeof=_tile_nbytes)
+        self.evaluations = 0
+        # Guards the LRU; tiles may be contoured from a background thread
+        self.lock = threading.Lock()
+
+    def sample(self, spec, f, x_min, x_max, y_min, y_max, pixel_width, pixel_height):
+        # spec identifies the relation and unit mode; returns (x_values, y_values, evaluations).
+        x_level = math.floor(math.log2((x_max - x_min) / TILES_PER_VIEW))
+        y_level = math.floor(math.log2((y_max - y_min) / TILES_PER_VIEW))
+        tile_width, tile_height = 2.0 ** x_level, 2.0 ** y_level
+
+        tile_pixels = max(pixel_width * tile_width / (x_max - x_min),
+                          pixel_height * tile_height / (y_max - y_min))
+        levels = refinement_levels(tile_pixels)
+
+        xs, ys = [], []
+        evaluations = 0
+        for index_x in range(math.floor(x_min / tile_width), math.ceil(x_max / tile_width)):
+            for index_y in range(math.floor(y_min / tile_height), math.ceil(y_max / tile_height)):
+                key = (spec, x_level, y_level, levels, index_x, index_y)
+                with self.lock:
+                    tile = self.tiles.get(key)
+                if tile is None:
+                    x_values, y_values, count = contour(
+                        f, index_x * tile_width, (index_x + 1) * tile_width,
+                        index_y * tile_height, (index_y + 1) * tile_height, levels
+                    )
+                    tile = (x_values, y_values)
+                    with self.lock:
+                        self.tiles.put(key, tile)
+                    evaluations += count
+
+                xs.append(tile[0])
+                ys.append(tile[1])
+
+        with self.lock:
+            self.evaluations += evaluations
+        return np.concatenate(xs), np.concatenate(ys), evaluations
+
+    def invalidate(self, spec):
+        # Drops every tile of a relation, e.g. after it was edited or its unit mode changed.
+        with self.lock:
+            for key in self.tiles.keys():
+                if key[0] == spec:
+                    self.tiles.pop(key)
+
+    def clear(self):
+        with self.lock:
+            self.tiles.clear()
+            self.evaluations = 0
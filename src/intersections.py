@@ -0,0 +1,141 @@
+import numpy as np
+
+from roots import ROOT_SAMPLES, ROOT_TOLERANCE
+from sampling import evaluate
+
+# A bracket is refined until it, or the last step within it, is this narrow relative to |x|
+X_TOLERANCE = 1e-13
+MAX_ITERATIONS = 60
+
+
+def find_intersections(functions, x_min, x_max, samples=None):
+    # Points where pairs of curves cross within [x_min, x_max], as (key_a, key_b, x, y)
+    # sorted by x. functions maps each curve's key to a vectorized function; samples may
+    # map keys to (x_values, y_values) already sampled for the viewport, which are reused
+    # instead of evaluating that curve again.
+    keys = list(functions)
+    if len(keys) < 2:
+        return []
+
+    samples = samples or {}
+    grid = _common_grid([samples[key][0] for key in keys if key in samples], x_min, x_max)
+
+    # One row per curve on the shared grid
+    y_grid = np.empty((len(keys), grid.size))
+    for row, key in enumerate(keys):
+        if key in samples:
+            x_values, y_values = samples[key]
+            y_grid[row] = _resample(x_values, y_values, grid)
+        else:
+            y_grid[row] = evaluate(functions[key], grid)
+
+    # f - g for every pair at once, and the sign changes along each pair's row
+    first, second = np.triu_indices(len(keys), k=1)
+    differences = y_grid[first] - y_grid[second]
+    with np.errstate(invalid="ignore"):
+        pair_rows, columns = np.nonzero(differences[:, :-1] * differences[:, 1:] < 0)
+
+    # Grid points where a pair meets exactly; runs of them mean the curves coincide there
+    zero = np.pad(differences == 0, ((0, 0), (1, 1)))
+    exact_rows, exact_columns = np.nonzero(zero[:, 1:-1] & ~zero[:, :-2] & ~zero[:, 2:])
+
+    # Every bracket of every pair is refined together, evaluating each curve once per step
+    first_curve, second_curve = first[pair_rows], second[pair_rows]
+
+    def difference(x_values, first_curve, second_curve):
+        result = np.zeros(x_values.size)
+        for row, key in enumerate(keys):
+            result[first_curve == row] += evaluate(functions[key], x_values[first_curve == row])
+            result[second_curve == row] -= evaluate(functions[key], x_values[second_curve == row])
+        return result
+
+    scale = np.maximum(np.nanmax(np.abs(y_grid), axis=1, initial=0.0), 1.0)
+    tolerance = ROOT_TOLERANCE * np.maximum(scale[first_curve], scale[second_curve])
+    x_values, found = refine(
+        lambda x, keep: difference(x, first_curve[keep], second_curve[keep]),
+        grid[columns], grid[columns + 1], tolerance
+    )
+
+    pairs = np.concatenate([pair_rows[found], exact_rows])
+    x_values = np.concatenate([x_values, grid[exact_columns]])
+    y_values = np.empty(x_values.size)
+    for row, key in enumerate(keys):
+        on_curve = first[pairs] == row
+        y_values[on_curve] = evaluate(functions[key], x_values[on_curve])
+
+    points = [
+        (keys[first[pair]], keys[second[pair]], float(x), float(y))
+        for pair, x, y in zip(pairs, x_values, y_values)
+    ]
+    points.sort(key=lambda point: point[2])
+    return points
+
+
+def refine(f, left, right, tolerance):
+    # Refines every sign-changing bracket [left, right] at once with the Illinois variant of
+    # false position. f(x, keep) evaluates the brackets selected by the boolean mask keep at
+    # x, so converged brackets drop out. Returns the accepted roots and the indices of their
+    # brackets; brackets ending on a pole (|f| above tolerance) or an undefined value are dropped.
+    left, right = left.astype(float), right.astype(float)
+    everything = np.ones(left.size, dtype=bool)
+    f_left, f_right = f(left, everything), f(right, everything)
+    side = np.zeros(left.size, dtype=int)
+    x = (left + right) / 2
+    f_x = np.full(left.size, np.nan)
+    active = everything.copy()
+
+    for _ in range(MAX_ITERATIONS):
+        if not active.any():
+            break
+
+        l, r, fl, fr = left[active], right[active], f_left[active], f_right[active]
+        with np.errstate(all="ignore"):
+            step = r - fr * (r - l) / (fr - fl)
+        # Fall back to bisection if false position steps outside its bracket
+        step = np.where((step > l) & (step < r), step, (l + r) / 2)
+        f_step = f(step, active)
+
+        moves_left = np.sign(f_step) == np.sign(fl)
+        s = side[active]
+        converged = np.abs(step - x[active]) <= X_TOLERANCE * (1 + np.abs(step))
+        x[active], f_x[active] = step, f_step
+        left[active] = np.where(moves_left, step, l)
+        right[active] = np.where(moves_left, r, step)
+        # Illinois: halve the value kept at an end that has stayed put twice in a row
+        f_right[active] = np.where(moves_left, np.where(s == 1, fr / 2, fr), f_step)
+        f_left[active] = np.where(moves_left, f_step, np.where(s == -1, fl / 2, fl))
+        side[active] = np.where(moves_left, 1, -1)
+
+        done = converged | (right[active] - left[active] <= X_TOLERANCE * (1 + np.abs(step)))
+        done |= (f_step == 0) | np.isnan(f_step)
+        active[np.flatnonzero(active)[done]] = False
+
+    with np.errstate(invalid="ignore"):
+        found = np.flatnonzero(np.abs(f_x) <= tolerance)
+    return x[found], found
+
+
+def _common_grid(sampled_x, x_min, x_max):
+    # The union of the curves' own sample positions within the viewport, so every
+    # curve's refined points are kept, or a uniform grid when nothing is sampled yet.
+    grids = [np.linspace(x_min, x_max, ROOT_SAMPLES // 4)]
+    for x_values in sampled_x:
+        grids.append(x_values[(x_values >= x_min) & (x_values <= x_max)])
+    return np.unique(np.concatenate(grids))
+
+
+def _resample(x_values, y_values, grid):
+    # Linear interpolation of existing samples onto the grid; NaN gaps (poles, domain
+    # edges) stay NaN so no crossing is reported across them.
+    finite = np.isfinite(y_values)
+    if finite.sum() < 2:
+        return np.full(grid.shape, np.nan)
+
+    result = np.interp(grid, x_values[finite], y_values[finite], left=np.nan, right=np.nan)
+
+    # Grid points next to a non-finite sample lie in a gap
+    index = np.clip(np.searchsorted(x_values, grid), 1, x_values.size - 1)
+    exact = x_values[index] == grid
+    gap = np.where(exact, ~finite[index], ~finite[index - 1] | ~finite[index])
+    result[gap] = np.nan
+    return result
@@ -1,9 +1,21 @@
+import startup
 import sys
-from PyQt5.QtWidgets import QApplication
-from gui import MainWindow
 
-if __name__ == "__main__":
+if __name__ == "__main__" and "--serve" in sys.argv:
+    # Worker processes re-import this module too, so the server is only imported here
+    sys.argv.remove("--serve")
+    from server import main
+    main()
+
+elif __name__ == "__main__":
+    # Imported here rather than at the top: worker processes re-import this module and
+    # should not load Qt, matplotlib and the GUI just to run a maths operation
+    from PyQt5.QtWidgets import QApplication
+    from gui import MainWindow
+    startup.mark("modules imported")
+
     app = QApplication(sys.argv)
     window = MainWindow()
+    startup.mark("window built")
     window.show()
-    sys.exit(app.exec_())
\ No newline at end of file
+    sys.exit(app.exec_())
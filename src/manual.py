@@ -41,11 +41,45 @@ class ManualPanel(QWidget):
             ("Logarithmic Equations", "Format: y = logx (base 10), y = lnx (natural log), y = log[base]x\nExamples: y = logx, y = lnx, y = log[2]x"),
             ("Trigonometric Equations", "Format: y = sinx, cosx, or tanx\nExamples: y = sinx, y = cosx, y = tanx"),
             ("Inverse Trigonometric Equations" , "Format: y = arcsinx, arccosx, arctanx\nExamples: y = arcsinx, y = arctanx"),
+            ("Implicit Equations",
+             "Format: any equation in x and y that is not y = f(x)\nExamples: x^2 + y^2 = 25, sin(xy) = 0.5, x = y^2\n"
+             "Solving, area and the other maths operations need an equation of the form y = f(x)."),
+            ("Parametric and Polar Equations",
+             "Format: x = f(t), y = g(t) or r = f(θ), optionally followed by a range for the parameter\n"
+             "Examples: x = cos(3t), y = sin(2t); r = 1 + cos(θ); r = θ, 0 < θ < 6pi\n"
+             "Type theta if your keyboard has no θ. The parameter runs from 0 to 2pi unless a range is given, "
+             "and is in radians even in degree mode."),
+            ("Adding Equations",
+             "Press + for a new equation box and Enter to draw it. There is no limit on the number of equations; "
+             "the list scrolls once it fills the panel.\n"
+             "'Import Equations' in Settings adds every equation in a text file, one per line. "
+             "Blank lines and lines starting with # are skipped."),
+            ("Navigating the Graph",
+             "Click and drag on the graph to pan. Scroll the mouse wheel to zoom in or out around the cursor.\n"
+             "Click the zoom percentage to return to the default view."),
+            ("Solving Equations",
+             "'Solve Equation' gives exact x-intercepts where it can. If no exact answer is found, or working one out takes too long, "
+             "the x-intercepts across the visible part of the graph are found numerically and shown as decimals.\n"
+             "Polynomials of any degree are solved numerically straight away, which also speeds up finding their maximum, minimum and stationary points.\n"
+             "The Solving button in Settings switches between Automatic, Fast Numeric (always numeric) and Exact (exact answers for polynomials too).\n"
+             "Results are saved between sessions, so repeating an operation on the same equation is instant. "
+             "Use 'Clear Saved Results' in Settings to remove them."),
+            ("Advanced Operations – Intersections",
+             "'Find Intersections' marks every point where two visible graphs cross and lists their coordinates.\n"
+             "The markers follow the graph as you pan and zoom, and are found again for the new view. "
+             "Use 'Show/Hide Intersections' in Settings to turn them off."),
             ("Advanced Operations – Area Under Graphs",
              "After selecting 'Find Area Under Graphs', you may tick one or more equations to include.\n"
              "You can optionally enter lower and upper x-limits for each. If these are left blank, the area will be calculated between the graph’s x-intercepts where possible.\n"
              "If the graph cannot be integrated or lacks valid bounds, it will be skipped.\n"
-             "Results are shown as simplified fractions (if possible), along with a decimal approximation.")
+             "Results are shown as simplified fractions (if possible), along with a decimal approximation.\n"
+             "Graphs with no exact integral, such as e^(x^2) or x^x, are integrated numerically; these results show an error estimate.\n"
+             "Tick 'True area' to count regions below the x-axis as positive area instead of letting them cancel."),
+            ("Performance",
+             "'Show/Hide Performance' in Settings shows how long the graph took to draw, how fast curves are sampled "
+             "and how often previously sampled parts of the curves are reused.\n"
+             "While it is shown, the time spent parsing, compiling, sampling and drawing is recorded. "
+             "'Export Performance Trace' saves these timings for viewing in chrome://tracing or Perfetto.")
         ]
 
         for title, content in manual_sections:
@@ -1,15 +1,20 @@
-import re
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QLabel, QFrame, QHBoxLayout,
                              QRadioButton, QButtonGroup, QSizePolicy,
-                             QDialog, QPushButton)
-from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QPixmap
-import matplotlib.pyplot as plt
-import tempfile
+                             QDialog, QPushButton, QProgressDialog, QMessageBox)
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtGui import QImage, QPixmap
 import os
+import profiling
 from calculations import parse_equation
-from operations import solve_equation, find_maximum, find_minimum, convert_to_sympy
-import sympy as sp
+from curves import RELATION_TYPES
+from operations import (RELATION_MESSAGE, convert_to_sympy, solve_equation, stationary_points,
+                        evaluate_result, equation_area, area_report, stationary_summary)
+from rendering import render_latex
+from result_store import ResultStore
+from tasks import Task, TaskError, TaskTimeout, TaskCancelled
+
+# Seconds an operation may run before it is stopped
+DEFAULT_TIME_BUDGET = 10
 
 class MathsPanel(QWidget):
 
@@ -17,6 +22,12 @@ class MathsPanel(QWidget):
         super().__init__()
         self.main_window = main_window
         self.selected_operation = None
+        self.time_budget = DEFAULT_TIME_BUDGET
+        # "auto" solves exactly with a numeric fallback; "numeric" always uses the root engine;
+        # "symbolic" also gives polynomials exact answers
+        self.solve_mode = "auto"
+        # Results persist across launches, so repeated operations skip the worker entirely
+        self.result_store = ResultStore()
         self.initUI()
 
     def initUI(self):
@@ -85,8 +96,16 @@ class MathsPanel(QWidget):
             lambda checked, op="Find Stationary Points": self.go_to_equation_selection(op))
         self.operations_group.addButton(stationary_button)
 
+        intersections_button = QRadioButton("Find Intersections")
+        intersections_button.setStyleSheet("font-size: 16px; color: #595959;")
+        intersections_button.setFocusPolicy(Qt.NoFocus)
+        intersections_button.clicked.connect(
+            lambda checked, op="Find Intersections": self.perform_intersection_operation(op))
+        self.operations_group.addButton(intersections_button)
+
         container_layout.addWidget(area_button, 0, Qt.AlignCenter)
         container_layout.addWidget(stationary_button, 0, Qt.AlignCenter)
+        container_layout.addWidget(intersections_button, 0, Qt.AlignCenter)
 
         container_layout.addStretch(1)
 
@@ -127,81 +146,52 @@ class MathsPanel(QWidget):
     def perform_operation(self, equation_str):
         parsed_equation = parse_equation(equation_str)
 
-        if parsed_equation:
+        if parsed_equation and parsed_equation[0] in RELATION_TYPES:
+            self.show_plain_text_result_dialog(RELATION_MESSAGE)
+
+        elif parsed_equation:
             equation_type, coefficients, _, indep_var = parsed_equation
-            independent_symbol = sp.Symbol(indep_var)
 
-            if equation_type == "symbolic":
-                sympy_equation = coefficients
-            else:
-                sympy_equation = convert_to_sympy(coefficients, equation_type, indep_var)
+            expr = convert_to_sympy(coefficients, equation_type, indep_var)
 
             if self.selected_operation == "Solve Equation":
-                result = solve_equation(equation_type, coefficients, indep_var)
-                self.show_plain_text_result_dialog(result)
+                x_range = self.visible_x_range()
+                numeric_args = (equation_type, coefficients, indep_var, x_range, "numeric")
+                numeric_options = (equation_type, x_range, "numeric")
 
-            elif self.selected_operation == "Find Stationary Points":
-                # First and second derivatives
-                first_diff = sp.diff(sympy_equation, independent_symbol)
-                second_diff = sp.diff(first_diff, independent_symbol)
+                if self.solve_mode == "numeric":
+                    self.run_cached(solve_equation, numeric_args, expr, numeric_options,
+                                    self.show_plain_text_result_dialog)
+                else:
+                    # The time budget is part of the key: a longer one may find the exact answer
+                    auto_options = (equation_type, x_range, self.solve_mode, self.time_budget)
 
-                # Solve dy/dx = 0
-                critical_points = sp.solve(first_diff, independent_symbol)
+                    def numeric_fallback():
+                        # In auto mode, if sp.solve runs out of time, solve numerically across the
+                        # visible graph instead, and remember that answer for this equation too.
+                        # Exact mode reports the timeout and stores nothing.
+                        def show(text):
+                            self.result_store.put(solve_equation.__name__, expr, auto_options, text, text)
+                            self.show_plain_text_result_dialog(text)
 
-                result_lines = [
-                    f"First derivative: {sp.latex(first_diff)}",
-                    f"Second derivative: {sp.latex(second_diff)}"
-                ]
+                        self.run_cached(solve_equation, numeric_args, expr, numeric_options, show)
 
-                if not critical_points:
-                    result_lines.append("No stationary points found.")
-                else:
-                    for point in critical_points:
-                        try:
-                            point_val = float(point)
-                            y_val = sympy_equation.subs(independent_symbol, point_val)
-                            curvature = second_diff.subs(independent_symbol, point_val)
-                            if curvature > 0:
-                                nature = "Minimum"
-                            elif curvature < 0:
-                                nature = "Maximum"
-                            else:
-                                nature = "Point of Inflection"
-
-                            result_lines.append(
-                                f"At x = {point_val:.2f}, y = {y_val.evalf():.2f} → {nature}"
-                            )
-                        except Exception as e:
-                            result_lines.append(f"Could not evaluate point {point}: {e}")
-
-                result = "\n".join(result_lines)
-                self.show_plain_text_result_dialog(result)
+                    self.run_cached(solve_equation,
+                                    (equation_type, coefficients, indep_var, x_range, self.solve_mode),
+                                    expr, auto_options, self.show_plain_text_result_dialog,
+                                    on_timeout=numeric_fallback if self.solve_mode == "auto" else None)
+
+            elif self.selected_operation == "Find Stationary Points":
+                self.run_cached(stationary_points, (equation_type, coefficients, indep_var, self.solve_mode),
+                                expr, (equation_type, self.solve_mode), self.show_plain_text_result_dialog)
 
             else:
                 # Other symbolic operations
-                if self.selected_operation == "Differentiate":
-                    result = sp.diff(sympy_equation, independent_symbol)
-                elif self.selected_operation == "Integrate":
-                    result = sp.integrate(sympy_equation, independent_symbol)
-                    result = sp.nsimplify(result, rational=True)
-                elif self.selected_operation == "Find Maximum":
-                    result = find_maximum(equation_type, coefficients)
-                elif self.selected_operation == "Find Minimum":
-                    result = find_minimum(equation_type, coefficients)
-                else:
-                    result = "Operation not implemented yet"
-
-                if isinstance(result, sp.Basic):
-                    if isinstance(result, sp.Piecewise):
-                        result = result.args[0][0]
-                    result = sp.nsimplify(result, rational=True)
-                    formatted_result = sp.latex(result, mode='plain').replace("log", "ln")
-                elif isinstance(result, tuple):
-                    formatted_result = f"({result[0]}, {result[1]})"
-                else:
-                    formatted_result = str(result)
-
-                self.show_result_dialog(formatted_result)
+                self.run_cached(evaluate_result,
+                                (self.selected_operation, equation_type, coefficients, indep_var,
+                                 self.solve_mode),
+                                expr, (self.selected_operation, equation_type, self.solve_mode),
+                                self.show_result_dialog)
 
             # Reset operation button states
             self.operations_group.setExclusive(False)
@@ -211,24 +201,124 @@ class MathsPanel(QWidget):
 
         self.main_window.left_section.setCurrentIndex(2)
 
+    def visible_x_range(self):
+        canvas = self.main_window.graph_canvas
+        return (float(canvas.x_min), float(canvas.x_max))
+
+    def run_operation(self, func, args, on_result, on_timeout=None):
+        # Runs func(*args) in a worker process behind a cancellable progress dialog,
+        # then passes the result to on_result once the work finishes. on_timeout, if
+        # given, replaces the warning shown when the time budget runs out.
+        def finished(results):
+            (result,) = results
+            if isinstance(result, TaskTimeout):
+                if on_timeout is not None:
+                    on_timeout()
+                    return
+                QMessageBox.warning(self, self.selected_operation,
+                                    f"This operation took longer than {self.time_budget:g} seconds and was stopped.")
+            elif isinstance(result, TaskError):
+                QMessageBox.warning(self, self.selected_operation, f"This operation failed.\n{result}")
+            else:
+                on_result(result)
+
+        return self.run_operations([(func, args)], finished)
+
+    def run_cached(self, func, args, expr, options, on_result, on_timeout=None):
+        # run_operation backed by the persistent result store: a stored result for func on
+        # expr with these options is shown at once, and a fresh one is stored. func returns
+        # either the text to show or a (result, text) pair.
+        with profiling.span("result_store_lookup", "maths", operation=func.__name__):
+            stored = self.result_store.get(func.__name__, expr, options)
+        if stored is not None:
+            on_result(stored[1])
+            return None
+
+        def store(result):
+            value, text = result if isinstance(result, tuple) else (result, result)
+            self.result_store.put(func.__name__, expr, options, value, text)
+            on_result(text)
+
+        return self.run_operation(func, args, store, on_timeout)
+
+    def run_operations(self, calls, on_results):
+        # Runs each (func, args) call in its own worker process, up to one per CPU at a time,
+        # behind one cancellable progress dialog. on_results receives each call's result, or
+        # the TaskError it ended with, in order. Nothing is reported if the user cancels.
+        tasks = [Task(func, args, timeout=self.time_budget) for func, args in calls]
+        limit = os.cpu_count() or 2
+        # The workers run in other processes; the span covers dispatch to the last result
+        started_at = profiling.now()
+
+        progress = QProgressDialog(f"{self.selected_operation}...", "Cancel", 0, 0, self)
+        progress.setWindowTitle(self.selected_operation)
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setMinimumDuration(300)
+
+        timer = QTimer(progress)
+        timer.setInterval(50)
+
+        def check():
+            if progress.wasCanceled():
+                for task in tasks:
+                    task.cancel()
+
+            running = [task for task in tasks if task.started() and not task.poll()]
+            for task in tasks:
+                if len(running) >= limit:
+                    break
+                if not task.started() and task.outcome is None:
+                    running.append(task.start())
+
+            done = sum(task.outcome is not None for task in tasks)
+            if done < len(tasks):
+                elapsed = max(task.elapsed() for task in tasks)
+                if len(tasks) > 1:
+                    progress.setLabelText(f"{self.selected_operation}... {done}/{len(tasks)} done, {elapsed:.0f}s")
+                else:
+                    progress.setLabelText(f"{self.selected_operation}... {elapsed:.0f}s")
+                return
+
+            timer.stop()
+            progress.reset()
+            profiling.record("operation", "maths", started_at, profiling.now(),
+                             {"operation": self.selected_operation, "calls": [func.__name__ for func, _ in calls]})
+
+            results = []
+            for task in tasks:
+                try:
+                    results.append(task.result())
+                except TaskCancelled:
+                    return
+                except TaskError as e:
+                    results.append(e)
+
+            on_results(results)
+
+        timer.timeout.connect(check)
+        timer.start()
+        check()
+        return tasks
+
     def show_result_dialog(self, latex_expression):
-        # Displays the result in a properly formatted popup using QLabel with MathML support.
-        temp_dir = tempfile.gettempdir()
-        img_path = os.path.join(temp_dir, "result.png")
+        # Displays the result as rendered LaTeX, drawn in memory and cached per expression.
+        try:
+            with profiling.span("render_latex", "maths"):
+                image = render_latex(latex_expression, fontsize=20, dpi=300, color="white")
+        except ValueError:
+            # mathtext does not cover every LaTeX construct sympy can produce
+            self.show_plain_text_result_dialog(latex_expression)
+            return
 
-        #  Create a Matplotlib figure to render LaTeX
-        fig, ax = plt.subplots(figsize=(3, 1))
-        ax.text(0.5, 0.5, f"${latex_expression}$", fontsize=20, ha='center', va='center', color='white')
-        ax.axis("off")
-        plt.savefig(img_path, dpi=300, bbox_inches='tight', transparent=True)
-        plt.close(fig)
+        height, width, _ = image.shape
+        pixmap = QPixmap.fromImage(QImage(image.data, width, height, 4 * width, QImage.Format_RGBA8888))
 
         dialog = QDialog(self)
         dialog.setWindowTitle(self.selected_operation)
         layout = QVBoxLayout()
 
         result_label = QLabel()
-        result_label.setPixmap(QPixmap(img_path))
+        result_label.setPixmap(pixmap)
         layout.addWidget(result_label)
 
         close_button = QPushButton("Close")
@@ -267,81 +357,23 @@ class MathsPanel(QWidget):
         self.main_window.pick_equation_panel.load_equations(multi_select=True)  # Pass flag for checkboxes
         self.main_window.left_section.setCurrentIndex(3)
 
-    def perform_area_operation(self, equation_info_list):
-        total_area = sp.S(0)
-        results = []
-
-        for eq, lower_text, upper_text in equation_info_list:
-            parsed = parse_equation(eq)
-            if not parsed:
-                results.append(f"Could not parse: {eq}")
-                continue
-
-            equation_type, coefficients, _, indep_var = parsed
-
-            if equation_type != "symbolic":
-                expr = convert_to_sympy(coefficients, equation_type, indep_var)
-            else:
-                expr = coefficients
-
-            x = sp.Symbol(indep_var)
-
-            # Convert limits or fallback to intercepts
-            try:
-                lower = sp.sympify(lower_text) if lower_text else None
-                upper = sp.sympify(upper_text) if upper_text else None
-            except ValueError:
-                results.append(f"Invalid bounds for `{eq}`. Skipped.")
-                continue
-
-            if lower is None or upper is None:
-                try:
-                    solution = solve_equation(equation_type, coefficients, indep_var)
-                    match = re.search(r"When y=0: (.*?)\n", solution + "\n")
-                    if not match:
-                        raise ValueError("Could not extract x-intercepts")
-                    values_str = match.group(1)
-                    x_vals = [float(val.strip()) for val in re.findall(r"[-+]?\d*\.?\d+", values_str)]
-                    if len(x_vals) < 2:
-                        raise ValueError("Not enough intercepts")
-                    x_vals.sort()
-                    lower = lower if lower is not None else x_vals[0]
-                    upper = upper if upper is not None else x_vals[-1]
-                except:
-                    results.append(f"Failed to infer bounds for `{eq}`. Skipped.")
-                    continue
-
-
-            if lower >= upper:
-                results.append(f"Lower bound must be less than upper bound for `{eq}`. Skipped.")
-                continue
-
-            try:
-                integral = sp.integrate(expr, (x, lower, upper))
-                area = abs(integral)
-
-                if isinstance(area, sp.Rational):
-                    formatted_area = f"{area} (≈ {float(area):.2f})"
-                else:
-                    formatted_area = f"{area.evalf():.2f}"
-
-                results.append(f"Area under `{eq}` from {lower} to {upper}: {formatted_area} units²")
-
-                if isinstance(area, sp.Rational):
-                    total_area += area
-                else:
-                    total_area += area.evalf()
-
-            except Exception as e:
-                results.append(f"Error integrating `{eq}`: {str(e)}")
-
-        if isinstance(total_area, sp.Rational):
-            formatted_total = f"{total_area} (≈ {float(total_area):.2f})"
-        else:
-            formatted_total = f"{total_area.evalf():.2f}"
-
-        results.append(f"\nTotal area: {formatted_total} units²")
-        self.show_plain_text_result_dialog("\n".join(results))
+    def perform_area_operation(self, equation_info_list, area_mode="net"):
+        # Equations are parsed here, where the parse cache lives; each one is then
+        # integrated in its own worker process so they run in parallel.
+        x_range = self.visible_x_range()
+        calls = [
+            (equation_area, (eq, parse_equation(eq), lower_text, upper_text, x_range, self.solve_mode, area_mode))
+            for eq, lower_text, upper_text in equation_info_list
+        ]
+
+        def finished(results):
+            records = [
+                (f"Error integrating `{eq}`: {result}", None, 0.0) if isinstance(result, TaskError) else result
+                for (eq, _, _), result in zip(equation_info_list, results)
+            ]
+            self.show_plain_text_result_dialog(area_report(records))
+
+        self.run_operations(calls, finished)
         self.main_window.left_section.setCurrentIndex(2)
 
     def perform_stationary_operation(self, equation_str):
@@ -349,38 +381,27 @@ class MathsPanel(QWidget):
         if not parsed:
             self.show_plain_text_result_dialog("Invalid equation.")
             return
+        if parsed[0] in RELATION_TYPES:
+            self.show_plain_text_result_dialog(RELATION_MESSAGE)
+            return
 
         equation_type, coefficients, _, indep_var = parsed
-        x = sp.Symbol(indep_var)
-
-        if equation_type != "symbolic":
-            expr = convert_to_sympy(coefficients, equation_type, indep_var)
-        else:
-            expr = coefficients
-
-        first_deriv = sp.diff(expr, x)
-        second_deriv = sp.diff(first_deriv, x)
-        critical_points = sp.solve(first_deriv, x)
-
-        results = [f"Second Derivative: {sp.latex(second_deriv)}", ""]
-
-        if not critical_points:
-            results.append("No stationary points found.")
-        else:
-            for point in critical_points:
-                if not point.is_real:
-                    continue
-                y_val = expr.subs(x, point)
-                second_val = second_deriv.subs(x, point)
-
-                if second_val > 0:
-                    nature = "Minimum"
-                elif second_val < 0:
-                    nature = "Maximum"
-                else:
-                    nature = "Point of Inflection"
-
-                results.append(f"Stationary Point at ({point}, {y_val}): {nature}")
+        self.run_cached(stationary_summary, (equation_type, coefficients, indep_var, self.solve_mode),
+                        convert_to_sympy(coefficients, equation_type, indep_var),
+                        (equation_type, self.solve_mode), self.show_plain_text_result_dialog)
+        self.main_window.left_section.setCurrentIndex(2)
 
-        self.show_plain_text_result_dialog("\n".join(results))
-        self.main_window.left_section.setCurrentIndex(2)
\ No newline at end of file
+    def perform_intersection_operation(self, operation):
+        # Marks where the visible graphs cross on the canvas and lists the points.
+        self.selected_operation = operation
+        canvas = self.main_window.graph_canvas
+        if not canvas.intersections_enabled:
+            self.main_window.settings_panel.toggle_intersections()
+        canvas.update_intersections()
+
+        equations = self.main_window.equations
+        lines = [
+            f"`{equations.get(a).text}` and `{equations.get(b).text}`: ({x:.6g}, {y:.6g})"
+            for a, b, x, y in canvas.intersections
+        ]
+        self.show_plain_text_result_dialog("\n".join(lines) or "No intersections in the visible range.")
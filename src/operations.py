@@ -1,7 +1,30 @@
+import numpy as np
 import sympy as sp
 
+import polynomial
+from calculations import compile_expression
+from curves import RELATION_TYPES
+import quadrature
+from roots import find_roots
+import tasks
+
+# Interval searched by the numeric root engine when no viewport is given
+DEFAULT_ROOT_RANGE = (-10, 10)
+# "auto" solves symbolically and falls back to numeric root finding; "numeric" is the fast mode.
+# Polynomials are always solved numerically unless "symbolic" (exact) output is requested.
+SOLVE_MODES = ("auto", "symbolic", "numeric")
+# "net" reports |∫f| over the bounds; "true" integrates |f| so areas below the axis do not cancel
+AREA_MODES = ("net", "true")
+# Seconds sp.integrate may take in "auto" mode before numeric quadrature takes over
+SYMBOLIC_INTEGRATION_BUDGET = 2
+RELATION_MESSAGE = ("This operation needs an equation of the form y = f(x), not an implicit, "
+                    "parametric or polar equation.")
+
 
 def convert_to_sympy(coefficients, equation_type, indep_var):
+    if equation_type in RELATION_TYPES:
+        raise ValueError(RELATION_MESSAGE)
+
     if equation_type == "symbolic":
         return coefficients  # Already a sympy expression
 
@@ -19,6 +42,8 @@ def convert_to_sympy(coefficients, equation_type, indep_var):
     elif equation_type == "quartic":
         a, b, c, d, e = coefficients
         equation = a * independent_symbol ** 4 + b * independent_symbol ** 3 + c * independent_symbol ** 2 + d * independent_symbol + e
+    elif equation_type == "polynomial":
+        equation = polynomial.to_expression(coefficients, indep_var)
     elif equation_type == "reciprocal":
         numerator, exponent = coefficients
         equation = numerator / independent_symbol ** exponent
@@ -40,31 +65,73 @@ def convert_to_sympy(coefficients, equation_type, indep_var):
     return equation
 
 
-def solve_equation(equation_type, coefficients, indep_var):
+def x_intercepts(equation_type, coefficients, indep_var, x_range=DEFAULT_ROOT_RANGE, mode="auto"):
+    # Real x-intercepts as (roots, exact, method): a sorted float array, the matching exact
+    # sympy values (None when found numerically) and the method used: "symbolic", "polynomial"
+    # (every real root, from the companion matrix) or "numeric" (the roots within x_range).
+    # "auto" falls back to the numeric engine over x_range when sp.solve fails or cannot
+    # give its solutions as numbers; "numeric" skips sp.solve altogether.
+    if mode not in SOLVE_MODES:
+        raise ValueError(f"Unknown solve mode {mode!r}")
+
+    if polynomial.is_polynomial(equation_type) and mode != "symbolic":
+        return polynomial.real_roots(coefficients), None, "polynomial"
+
+    x = sp.Symbol(indep_var)
+    equation = convert_to_sympy(coefficients, equation_type, indep_var)
+
+    if mode != "numeric":
+        exact = _real_solutions(equation, x)
+        if exact is not None:
+            exact.sort(key=lambda item: item[0])
+            roots = np.array([value for value, _ in exact], dtype=float)
+            return roots, [solution for _, solution in exact], "symbolic"
+        if mode == "symbolic":
+            raise ValueError("Could not solve symbolically")
+
+    f = compile_expression(equation, indep_var)
+    return find_roots(f, *x_range), None, "numeric"
+
+
+def _real_solutions(equation, x):
+    # [(float value, sympy solution)] for the real solutions of equation = 0, or None
+    # when sp.solve gives up or returns something that is not a number.
+    try:
+        solutions = sp.solve(equation, x)
+    except (NotImplementedError, TypeError, ValueError):
+        return None
+
+    real = []
+    for solution in solutions:
+        if solution.free_symbols:
+            return None
+        try:
+            value = complex(solution.evalf())
+        except (TypeError, ValueError):
+            return None
+        if abs(value.imag) < 1e-12:
+            real.append((value.real, solution))
+
+    return real
+
+
+def solve_equation(equation_type, coefficients, indep_var, x_range=DEFAULT_ROOT_RANGE, mode="auto"):
 
     if not isinstance(indep_var, str):
         raise TypeError(f"Expected 'indep_var' to be a string, got {type(indep_var)}")
 
-    if equation_type == "symbolic":
-        x = sp.Symbol(indep_var)
-        expr = coefficients
-        x_intercepts = sp.solve(expr, x)
-        x_str = ', '.join([str(val) for val in x_intercepts]) if x_intercepts else "No Real Solution"
-        y_at_zero = expr.subs(x, 0)
-        y_str = "Undefined (Division by Zero)" if y_at_zero == sp.zoo else str(y_at_zero)
-        return f"When y=0: {x_str}\nWhen x=0: {y_str}"
-
     x = sp.Symbol(indep_var)
     equation = convert_to_sympy(coefficients, equation_type, indep_var)
 
     # Solve for x when y = 0 (x-intercepts)
-    x_intercepts = sp.solve(equation, x)
+    roots, exact, method = x_intercepts(equation_type, coefficients, indep_var, x_range, mode)
 
-    if not x_intercepts:
-        x_intercept_str = "No Real Solution"
+    if method == "symbolic":
+        x_intercept_str = ', '.join([str(val) for val in exact]) if exact else "No Real Solution"
     else:
-        # Format solutions as strings
-        x_intercept_str = ', '.join([str(val) for val in x_intercepts])
+        x_intercept_str = ', '.join([f"{val:.6g}" for val in roots]) if roots.size else "No Real Solution"
+        if method == "numeric":
+            x_intercept_str += f" (numeric, {x_range[0]:g} ≤ {indep_var} ≤ {x_range[1]:g})"
 
     # Solve for y when x = 0 (y-intercept)
     y_intercept = equation.subs(x, 0)
@@ -93,62 +160,347 @@ def integrate(equation_type, coefficients, indep_var):
     return sp.integrate(equation, independent_symbol)
 
 
-def find_maximum(equation_type, coefficients):
-    x = sp.Symbol('x')
-
+def find_maximum(equation_type, coefficients, indep_var="x", mode="auto"):
     if equation_type == "linear":
         return sp.Symbol("No Maximum (Linear Functions Do Not Have One)")
 
-    expr = build_expr(equation_type, coefficients, x)
+    maxima = _extrema(equation_type, coefficients, indep_var, mode, "Maximum")
+    return maxima if maxima else sp.Symbol("No Maximum")
 
-    first_deriv = sp.diff(expr, x)
-    critical_points = sp.solve(first_deriv, x)
 
-    second_deriv = sp.diff(first_deriv, x)
+def find_minimum(equation_type, coefficients, indep_var="x", mode="auto"):
+    if equation_type == "linear":
+        return sp.Symbol("No Minimum (Linear Functions Do Not Have One)")
 
-    maxima = []
-    for point in critical_points:
-        if not point.is_real:
-            continue
-        if second_deriv.subs(x, point).evalf() < 0:
-            y_val = expr.subs(x, point)
-            maxima.append((float(point.evalf()), float(y_val.evalf())))
+    minima = _extrema(equation_type, coefficients, indep_var, mode, "Minimum")
+    return minima if minima else sp.Symbol("No Minimum")
 
-    return maxima if maxima else sp.Symbol("No Maximum")
 
-def find_minimum(equation_type, coefficients):
-    x = sp.Symbol('x')
+def extrema(equation_type, coefficients, indep_var="x", mode="auto"):
+    # ([(x, y)] maxima, [(x, y)] minima) of the equation.
+    return (_extrema(equation_type, coefficients, indep_var, mode, "Maximum"),
+            _extrema(equation_type, coefficients, indep_var, mode, "Minimum"))
 
-    if equation_type == "linear":
-        return sp.Symbol("No Minimum (Linear Functions Do Not Have One)")
 
-    expr = build_expr(equation_type, coefficients, x)
+def _extrema(equation_type, coefficients, indep_var, mode, nature):
+    # [(x, y)] of the stationary points of the given nature, "Maximum" or "Minimum".
+    if polynomial.is_polynomial(equation_type) and mode != "symbolic":
+        return [(x, y) for x, y, kind in polynomial.stationary_points(coefficients) if kind == nature]
+
+    x = sp.Symbol(indep_var)
+    if polynomial.is_polynomial(equation_type):
+        expr = build_expr(equation_type, coefficients, x)
+    else:
+        expr = convert_to_sympy(coefficients, equation_type, indep_var)
 
     first_deriv = sp.diff(expr, x)
     critical_points = sp.solve(first_deriv, x)
 
     second_deriv = sp.diff(first_deriv, x)
 
-    minima = []
+    extrema = []
     for point in critical_points:
         if not point.is_real:
             continue
-        if second_deriv.subs(x, point).evalf() > 0:
+        curvature = second_deriv.subs(x, point).evalf()
+        if (curvature < 0) if nature == "Maximum" else (curvature > 0):
             y_val = expr.subs(x, point)
-            minima.append((float(point.evalf()), float(y_val.evalf())))
+            extrema.append((float(point.evalf()), float(y_val.evalf())))
 
-    return minima if minima else sp.Symbol("No Minimum")
+    return extrema
 
 
 def build_expr(equation_type, coefficients, x):
-    if equation_type == "quadratic":
-        a, b, c = coefficients
-        return a*x**2 + b*x + c
-    elif equation_type == "cubic":
-        a, b, c, d = coefficients
-        return a*x**3 + b*x**2 + c*x + d
-    elif equation_type == "quartic":
-        a, b, c, d, e = coefficients
-        return a*x**4 + b*x**3 + c*x**2 + d*x + e
+    if polynomial.is_polynomial(equation_type):
+        return sum(c * x ** power for power, c in enumerate(reversed(coefficients)))
+    else:
+        return sp.Symbol("Unsupported")
+
+def stationary_points(equation_type, coefficients, indep_var, mode="auto"):
+    # Plain-text report of the derivatives and nature of each stationary point.
+    independent_symbol = sp.Symbol(indep_var)
+    sympy_equation = convert_to_sympy(coefficients, equation_type, indep_var)
+
+    # First and second derivatives
+    first_diff = sp.diff(sympy_equation, independent_symbol)
+    second_diff = sp.diff(first_diff, independent_symbol)
+
+    result_lines = [
+        f"First derivative: {sp.latex(first_diff)}",
+        f"Second derivative: {sp.latex(second_diff)}"
+    ]
+
+    if polynomial.is_polynomial(equation_type) and mode != "symbolic":
+        points = polynomial.stationary_points(coefficients)
+        if not points:
+            result_lines.append("No stationary points found.")
+        for point_val, y_val, nature in points:
+            result_lines.append(f"At x = {point_val:.2f}, y = {y_val:.2f} → {nature}")
+        return "\n".join(result_lines)
+
+    # Solve dy/dx = 0
+    critical_points = sp.solve(first_diff, independent_symbol)
+
+    if not critical_points:
+        result_lines.append("No stationary points found.")
+    else:
+        for point in critical_points:
+            try:
+                point_val = float(point)
+                y_val = sympy_equation.subs(independent_symbol, point_val)
+                curvature = second_diff.subs(independent_symbol, point_val)
+                if curvature > 0:
+                    nature = "Minimum"
+                elif curvature < 0:
+                    nature = "Maximum"
+                else:
+                    nature = "Point of Inflection"
+
+                result_lines.append(
+                    f"At x = {point_val:.2f}, y = {y_val.evalf():.2f} → {nature}"
+                )
+            except Exception as e:
+                result_lines.append(f"Could not evaluate point {point}: {e}")
+
+    return "\n".join(result_lines)
+
+
+def evaluate_operation(operation, equation_type, coefficients, indep_var, mode="auto"):
+    # Runs Differentiate, Integrate, Find Maximum or Find Minimum and formats the result for display.
+    return evaluate_result(operation, equation_type, coefficients, indep_var, mode)[1]
+
+
+def evaluate_result(operation, equation_type, coefficients, indep_var, mode="auto"):
+    # (result, formatted result) of Differentiate, Integrate, Find Maximum or Find Minimum,
+    # keeping the sympy result so it can be cached alongside its LaTeX.
+    independent_symbol = sp.Symbol(indep_var)
+    sympy_equation = convert_to_sympy(coefficients, equation_type, indep_var)
+
+    if operation == "Differentiate":
+        result = sp.diff(sympy_equation, independent_symbol)
+    elif operation == "Integrate":
+        result = sp.integrate(sympy_equation, independent_symbol)
+        result = sp.nsimplify(result, rational=True)
+    elif operation == "Find Maximum":
+        result = find_maximum(equation_type, coefficients, indep_var, mode)
+    elif operation == "Find Minimum":
+        result = find_minimum(equation_type, coefficients, indep_var, mode)
+    else:
+        result = "Operation not implemented yet"
+
+    if isinstance(result, sp.Basic):
+        if isinstance(result, sp.Piecewise):
+            result = result.args[0][0]
+        result = sp.nsimplify(result, rational=True)
+        formatted_result = sp.latex(result, mode='plain').replace("log", "ln")
+    elif isinstance(result, tuple):
+        formatted_result = f"({result[0]}, {result[1]})"
+    else:
+        formatted_result = str(result)
+
+    return result, formatted_result
+
+
+def area_under_graphs(parsed_equations, x_range=DEFAULT_ROOT_RANGE, mode="auto", area_mode="net"):
+    # parsed_equations holds (equation text, parse_equation result, lower text, upper text).
+    # The maths panel runs equation_area for each equation in parallel instead.
+    return area_report([
+        equation_area(eq, parsed, lower_text, upper_text, x_range, mode, area_mode)
+        for eq, parsed, lower_text, upper_text in parsed_equations
+    ])
+
+
+def equation_area(eq, parsed, lower_text, upper_text, x_range=DEFAULT_ROOT_RANGE, mode="auto",
+                  area_mode="net", budget=SYMBOLIC_INTEGRATION_BUDGET):
+    # Area for one equation as (line of text, area, error estimate), where area is an exact
+    # sympy number, a float, or None if the equation was skipped. Missing bounds fall back to
+    # the outermost x-intercepts within x_range. "net" area_mode reports |∫f|; "true"
+    # integrates |f|, so regions below the x-axis add to the area instead of cancelling.
+    # In "auto" mode sp.integrate gets budget seconds before numeric quadrature is used.
+    if area_mode not in AREA_MODES:
+        raise ValueError(f"Unknown area mode {area_mode!r}")
+
+    if not parsed:
+        return f"Could not parse: {eq}", None, 0.0
+
+    equation_type, coefficients, _, indep_var = parsed
+    if equation_type in RELATION_TYPES:
+        return f"`{eq}` is not a function of x. Skipped.", None, 0.0
+
+    if equation_type != "symbolic":
+        expr = convert_to_sympy(coefficients, equation_type, indep_var)
     else:
-        return sp.Symbol("Unsupported")
\ No newline at end of file
+        expr = coefficients
+
+    # Convert limits or fallback to intercepts
+    try:
+        lower = sp.sympify(lower_text) if lower_text else None
+        upper = sp.sympify(upper_text) if upper_text else None
+    except ValueError:
+        return f"Invalid bounds for `{eq}`. Skipped.", None, 0.0
+
+    if lower is None or upper is None:
+        try:
+            roots, exact, _ = x_intercepts(equation_type, coefficients, indep_var, x_range, mode)
+        except ValueError:
+            roots, exact = np.empty(0), None
+        if roots.size < 2:
+            return f"Failed to infer bounds for `{eq}`. Skipped.", None, 0.0
+        if exact is not None:
+            bounds = exact
+        elif mode != "numeric":
+            bounds = [_exact_root(expr, indep_var, value) for value in roots]
+        else:
+            bounds = [float(value) for value in roots]
+        lower = lower if lower is not None else bounds[0]
+        upper = upper if upper is not None else bounds[-1]
+
+    if lower >= upper:
+        return f"Lower bound must be less than upper bound for `{eq}`. Skipped.", None, 0.0
+
+    # Sign changes inside the bounds split the true area and guide the quadrature
+    crossings, _, _ = x_intercepts(equation_type, coefficients, indep_var, (float(lower), float(upper)), "numeric")
+    crossings = crossings[(crossings > float(lower)) & (crossings < float(upper))]
+
+    if mode != "numeric":
+        args = (equation_type, coefficients, indep_var, expr, lower, upper, crossings, area_mode)
+        try:
+            if mode == "symbolic":
+                area = _symbolic_area(*args)
+            elif tasks.can_interrupt():
+                with tasks.time_limit(budget):
+                    area = _symbolic_area(*args)
+            else:
+                area = tasks.run(_symbolic_area, args, budget)
+        except Exception as e:
+            if mode == "symbolic":
+                return f"Error integrating `{eq}`: {str(e)}", None, 0.0
+        else:
+            if isinstance(area, sp.Rational):
+                formatted_area = f"{area} (≈ {float(area):.2f})"
+            else:
+                area = area.evalf()
+                formatted_area = f"{area:.2f}"
+            return f"Area under `{eq}` from {lower} to {upper}: {formatted_area} units²", area, 0.0
+
+    if polynomial.is_polynomial(equation_type):
+        f = polynomial.evaluator(coefficients)
+    else:
+        f = compile_expression(expr, indep_var)
+
+    if area_mode == "true":
+        area, error = quadrature.integrate_abs(f, lower, upper, crossings)
+    else:
+        value, error = quadrature.integrate(f, lower, upper, crossings)
+        area = abs(value)
+
+    if not np.isfinite(area):
+        return f"Error integrating `{eq}`: the integral does not converge", None, 0.0
+
+    return (f"Area under `{eq}` from {lower} to {upper}: {area:.2f} units² (numeric, ± {error:.1g})",
+            area, error)
+
+
+def _exact_root(expr, indep_var, value):
+    # The rational number a numerically found root stands for, if it is exactly a root.
+    candidate = sp.nsimplify(float(value), rational=True, tolerance=1e-10)
+    if expr.subs(sp.Symbol(indep_var), candidate) == 0:
+        return candidate
+    return float(value)
+
+
+def _symbolic_area(equation_type, coefficients, indep_var, expr, lower, upper, crossings, area_mode):
+    # Exact area, raising ValueError when sympy cannot give it as a finite real number.
+    x = sp.Symbol(indep_var)
+
+    if area_mode == "true":
+        _, exact, _ = x_intercepts(equation_type, coefficients, indep_var, mode="symbolic")
+        inside = sorted(root for root in exact if lower < root < upper)
+        # sp.solve gives one period of a periodic function's roots; the pieces must match every crossing
+        if len(inside) != crossings.size:
+            raise ValueError("Could not find every sign change exactly")
+        edges = [lower] + inside + [upper]
+        area = sum(abs(sp.integrate(expr, (x, left, right))) for left, right in zip(edges[:-1], edges[1:]))
+    else:
+        area = abs(sp.integrate(expr, (x, lower, upper)))
+
+    try:
+        value = complex(area.evalf())
+    except (TypeError, ValueError):
+        raise ValueError("No closed form")
+    if not np.isfinite(value) or abs(value.imag) > 1e-12:
+        raise ValueError("The integral is not a finite real number")
+
+    return area
+
+
+def area_report(records):
+    # Joins equation_area results and adds the total, with its error estimate when any area is numeric.
+    total_area = sp.S(0)
+    total_error = 0.0
+    results = []
+
+    for line, area, error in records:
+        results.append(line)
+        if area is None:
+            continue
+        if isinstance(area, sp.Rational):
+            total_area += area
+        else:
+            total_area += sp.Float(area)
+        total_error += error
+
+    if isinstance(total_area, sp.Rational):
+        formatted_total = f"{total_area} (≈ {float(total_area):.2f})"
+    else:
+        formatted_total = f"{total_area.evalf():.2f}"
+
+    if total_error:
+        formatted_total += f" (± {total_error:.1g})"
+
+    results.append(f"\nTotal area: {formatted_total} units²")
+    return "\n".join(results)
+
+
+def stationary_summary(equation_type, coefficients, indep_var, mode="auto"):
+    x = sp.Symbol(indep_var)
+
+    if equation_type != "symbolic":
+        expr = convert_to_sympy(coefficients, equation_type, indep_var)
+    else:
+        expr = coefficients
+
+    first_deriv = sp.diff(expr, x)
+    second_deriv = sp.diff(first_deriv, x)
+
+    results = [f"Second Derivative: {sp.latex(second_deriv)}", ""]
+
+    if polynomial.is_polynomial(equation_type) and mode != "symbolic":
+        points = polynomial.stationary_points(coefficients)
+        if not points:
+            results.append("No stationary points found.")
+        for point, y_val, nature in points:
+            results.append(f"Stationary Point at ({point:.6g}, {y_val:.6g}): {nature}")
+        return "\n".join(results)
+
+    critical_points = sp.solve(first_deriv, x)
+
+    if not critical_points:
+        results.append("No stationary points found.")
+    else:
+        for point in critical_points:
+            if not point.is_real:
+                continue
+            y_val = expr.subs(x, point)
+            second_val = second_deriv.subs(x, point)
+
+            if second_val > 0:
+                nature = "Minimum"
+            elif second_val < 0:
+                nature = "Maximum"
+            else:
+                nature = "Point of Inflection"
+
+            results.append(f"Stationary Point at ({point}, {y_val}): {nature}")
+
+    return "\n".join(results)
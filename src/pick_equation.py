@@ -118,6 +118,10 @@ class Pick_Equation_Panel(QWidget):
                     self.selected_equations.append((checkbox, lower_input, upper_input))
                     self.equation_layout.addWidget(row)
 
+                self.true_area_checkbox = QCheckBox("True area (count regions below the x-axis as positive)")
+                self.true_area_checkbox.setStyleSheet("font-size: 14px; color: #595959;")
+                self.equation_layout.addWidget(self.true_area_checkbox)
+
                 confirm = QPushButton("Calculate Area")
                 confirm.setStyleSheet("padding: 8px 15px; font-size: 14px; background-color: #d9d9d9; color: #595959;")
                 confirm.clicked.connect(self.execute_area_operation)
@@ -144,7 +148,8 @@ class Pick_Equation_Panel(QWidget):
         if not selected:
             QMessageBox.warning(self, "No Equations", "Please select at least one equation.")
             return
-        self.main_window.maths_panel.perform_area_operation(selected)
+        area_mode = "true" if self.true_area_checkbox.isChecked() else "net"
+        self.main_window.maths_panel.perform_area_operation(selected, area_mode)
 
     def execute_stationary_operation(self):
         selected = [
@@ -0,0 +1,124 @@
+import numpy as np
+import sympy as sp
+
+# Equation types whose coefficients are polynomial coefficients, highest power first
+POLYNOMIAL_TYPES = {1: "linear", 2: "quadratic", 3: "cubic", 4: "quartic"}
+GENERAL_TYPE = "polynomial"
+
+# Roots whose imaginary part is below this, relative to their size, are treated as real
+IMAGINARY_TOLERANCE = 1e-7
+# Newton steps used to polish each simple real root from the companion matrix
+POLISH_STEPS = 3
+# Eigenvalues closer than this, relative to their size, are taken as one repeated root
+CLUSTER_TOLERANCE = 1e-4
+
+
+def polynomial_type(degree):
+    return POLYNOMIAL_TYPES.get(degree, GENERAL_TYPE)
+
+
+def is_polynomial(equation_type):
+    return equation_type == GENERAL_TYPE or equation_type in POLYNOMIAL_TYPES.values()
+
+
+def from_expression(expr, symbol):
+    # (equation type, coefficients) for a polynomial in symbol, or None for any other expression.
+    if not expr.is_polynomial(symbol):
+        return None
+
+    poly = sp.Poly(expr, symbol)
+    if poly.degree() < 1:
+        return None
+
+    return polynomial_type(poly.degree()), tuple(poly.all_coeffs())
+
+
+def to_expression(coefficients, indep_var):
+    return sp.Poly(coefficients, sp.Symbol(indep_var)).as_expr()
+
+
+def as_array(coefficients):
+    return np.array([float(c) for c in coefficients])
+
+
+def horner(coefficients, x_values):
+    # Evaluates the polynomial with one multiply-add per coefficient.
+    result = np.zeros_like(np.asarray(x_values, dtype=float))
+    for c in coefficients:
+        result = result * x_values + c
+    return result
+
+
+def evaluator(coefficients):
+    # Vectorized function of x for the polynomial, for plotting and sampling.
+    coefficients = as_array(coefficients)
+    return lambda x_values: horner(coefficients, x_values)
+
+
+def derivative(coefficients):
+    degree = len(coefficients) - 1
+    return coefficients[:-1] * np.arange(degree, 0, -1)
+
+
+def real_roots(coefficients):
+    # Sorted real roots from the companion-matrix eigenvalues (numpy.roots), polished by Newton's method.
+    coefficients = np.trim_zeros(as_array(coefficients), "f")
+    if coefficients.size < 2:
+        return np.empty(0)
+
+    roots, multiplicity = _clusters(np.roots(coefficients))
+    real = np.abs(roots.imag) <= IMAGINARY_TOLERANCE * (1 + np.abs(roots))
+    x_values, simple = roots.real[real], multiplicity[real] == 1
+
+    # Newton's method only converges quickly on simple roots
+    slope = derivative(coefficients)
+    for _ in range(POLISH_STEPS):
+        value = horner(coefficients, x_values[simple])
+        gradient = horner(slope, x_values[simple])
+        with np.errstate(all="ignore"):
+            step = np.where(gradient != 0, value / gradient, 0.0)
+        x_values[simple] -= step
+
+    return np.sort(x_values) + 0.0
+
+
+def _clusters(roots):
+    # Groups eigenvalues scattered around a repeated root, which numpy.roots returns
+    # up to about eps^(1/m) apart for multiplicity m. Returns each group's mean and size.
+    near = np.abs(roots[:, None] - roots[None, :]) <= CLUSTER_TOLERANCE * (1 + np.abs(roots))[:, None]
+    if near.sum() == roots.size:
+        return roots, np.ones(roots.size, dtype=int)
+
+    centres, sizes = [], []
+    unassigned = np.ones(roots.size, dtype=bool)
+    for i in range(roots.size):
+        if unassigned[i]:
+            members = near[i] & unassigned
+            unassigned &= ~members
+            centres.append(roots[members].mean())
+            sizes.append(members.sum())
+
+    return np.array(centres), np.array(sizes)
+
+
+def stationary_points(coefficients):
+    # [(x, y, nature)] for each real root of the derivative, classified by the first
+    # non-zero higher derivative: even order gives a maximum or minimum, odd an inflection.
+    coefficients = as_array(coefficients)
+    slope = derivative(coefficients)
+    points = []
+
+    for x in real_roots(slope):
+        nature = "Point of Inflection"
+        higher = slope
+        for order in range(2, coefficients.size):
+            higher = derivative(higher)
+            value = horner(higher, x)
+            if abs(value) > IMAGINARY_TOLERANCE * max(1.0, np.abs(higher).max()):
+                if order % 2 == 0:
+                    nature = "Minimum" if value > 0 else "Maximum"
+                break
+
+        points.append((float(x), float(horner(coefficients, x)), nature))
+
+    return points
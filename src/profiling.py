@@ -0,0 +1,127 @@
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+# Run with --profile, or with this environment variable set, to collect spans from startup
+PROFILE_FLAG = "--profile"
+PROFILE_VARIABLE = "GRAPHING_CALCULATOR_PROFILE"
+# Most recent spans kept; older ones are dropped as new ones arrive
+RING_SIZE = 8192
+
+requested = PROFILE_FLAG in sys.argv or bool(os.environ.get(PROFILE_VARIABLE))
+enabled = requested
+
+# (name, category, start ns, duration ns, thread id, args); deque appends are thread-safe
+_spans = deque(maxlen=RING_SIZE)
+_origin = time.perf_counter_ns()
+
+
+class _Span:
+    __slots__ = ("name", "category", "args", "start")
+
+    def __init__(self, name, category, args):
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def set(self, **args):
+        # Attaches values, such as a count, known only once the work is done.
+        self.args = {**(self.args or {}), **args}
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        record(self.name, self.category, self.start, time.perf_counter_ns(), self.args)
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def set(self, **args):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+_NO_SPAN = _NoSpan()
+
+
+def span(name, category="app", **args):
+    # Context manager timing its block. While profiling is disabled it is a shared object
+    # that does nothing, so instrumented code costs one call and a flag check.
+    if not enabled:
+        return _NO_SPAN
+    return _Span(name, category, args or None)
+
+
+def record(name, category, start_ns, end_ns, args=None):
+    # Adds a span measured elsewhere, e.g. work that finishes in a later event-loop pass.
+    if enabled:
+        _spans.append((name, category, start_ns, end_ns - start_ns, threading.get_ident(), args))
+
+
+def now():
+    return time.perf_counter_ns()
+
+
+def enable(flag=True):
+    global enabled
+    enabled = flag
+
+
+def clear():
+    _spans.clear()
+
+
+def spans(window=None):
+    # Recorded spans, oldest first; only those that ended in the last window seconds if given.
+    collected = list(_spans)
+    if window is None:
+        return collected
+    cutoff = time.perf_counter_ns() - int(window * 1e9)
+    return [s for s in collected if s[2] + s[3] >= cutoff]
+
+
+def summary(window=None):
+    # {name: (count, total seconds)} over the spans, slowest total first.
+    totals = {}
+    for name, _, _, duration, _, _ in spans(window):
+        count, total = totals.get(name, (0, 0))
+        totals[name] = (count + 1, total + duration)
+    return {name: (count, total / 1e9)
+            for name, (count, total) in sorted(totals.items(), key=lambda item: -item[1][1])}
+
+
+def chrome_trace():
+    # The spans as a Chrome trace (chrome://tracing, Perfetto); times are in microseconds.
+    pid = os.getpid()
+    names = {thread.ident: thread.name for thread in threading.enumerate()}
+    events = []
+    # A snapshot, as background sampling threads may be recording spans meanwhile
+    for name, category, start, duration, tid, args in spans():
+        event = {"name": name, "cat": category, "ph": "X", "pid": pid, "tid": tid,
+                 "ts": (start - _origin) / 1000, "dur": duration / 1000}
+        if args:
+            event["args"] = args
+        events.append(event)
+    for tid in {event["tid"] for event in events}:
+        events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid,
+                       "args": {"name": names.get(tid, f"thread {tid}")}})
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def export_chrome_trace(path):
+    # Writes the spans as a Chrome trace and returns how many were written.
+    trace = chrome_trace()
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(trace, file)
+    return sum(event["ph"] == "X" for event in trace["traceEvents"])
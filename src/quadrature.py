@@ -0,0 +1,52 @@
+import warnings
+
+import numpy as np
+from scipy.integrate import IntegrationWarning, quad
+
+from sampling import evaluate
+
+# Subintervals QUADPACK may bisect into before giving up
+QUAD_LIMIT = 200
+
+
+class _Undefined(Exception):
+    pass
+
+
+def integrate(f, lower, upper, breakpoints=()):
+    # (value, error estimate) of the integral of a vectorized f over [lower, upper], by
+    # adaptive Gauss–Kronrod quadrature (QUADPACK via scipy.integrate.quad). Breakpoints
+    # inside the interval, such as roots or kinks, are passed on so they are not straddled.
+    lower, upper = float(lower), float(upper)
+    inner = [float(point) for point in breakpoints if lower < point < upper]
+
+    def scalar(x):
+        y = float(evaluate(f, np.array([x]))[0])
+        # QUADPACK cannot handle NaN (it may even crash), so stop at the first undefined value
+        if not np.isfinite(y):
+            raise _Undefined
+        return y
+
+    with warnings.catch_warnings():
+        # Hard integrands still return QUADPACK's best estimate and its error bound
+        warnings.simplefilter("ignore", IntegrationWarning)
+        try:
+            value, error = quad(scalar, lower, upper, points=inner or None, limit=QUAD_LIMIT)
+        except _Undefined:
+            return np.nan, np.nan
+
+    return value, error
+
+
+def integrate_abs(f, lower, upper, roots):
+    # (area, error estimate) between f and the x-axis: |f| integrated piece by piece
+    # between the sign changes in roots, so regions below the axis count as positive.
+    edges = [float(lower)] + sorted(float(r) for r in roots if lower < r < upper) + [float(upper)]
+    area = error = 0.0
+    for left, right in zip(edges[:-1], edges[1:]):
+        value, piece_error = integrate(f, left, right)
+        area += abs(value)
+        error += piece_error
+
+    return area, error
+
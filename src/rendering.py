@@ -0,0 +1,46 @@
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.transforms import IdentityTransform
+
+from cache import LRUCache
+
+# Transparent margin around rendered text, in pixels
+PADDING = 4
+
+# Rendered images keyed on (latex, fontsize, dpi, color), bounded by their pixel memory
+_render_cache = LRUCache(maxsize=256, maxbytes=64 * 1024 * 1024, sizeof=lambda image: image.nbytes)
+
+
+def render_latex(latex, fontsize=20, dpi=300, color="white"):
+    # Renders latex with matplotlib's mathtext to an RGBA array of shape (height, width, 4),
+    # cropped to the text. Uses a standalone Agg figure in memory, so there is no pyplot
+    # state and no file I/O; the array is shared between callers and read-only.
+    key = (latex, fontsize, dpi, color)
+    image = _render_cache.get(key)
+    if image is None:
+        image = _render(f"${latex}$", fontsize, dpi, color)
+        image.flags.writeable = False
+        _render_cache.put(key, image)
+    return image
+
+
+def _render(text, fontsize, dpi, color):
+    figure = Figure(dpi=dpi)
+    figure.patch.set_alpha(0)
+    canvas = FigureCanvasAgg(figure)
+
+    # Positioned in pixels: measure at the origin, then shift the ink into the padded box
+    artist = figure.text(0, 0, text, fontsize=fontsize, color=color, transform=IdentityTransform())
+    extent = artist.get_window_extent(canvas.get_renderer())
+    width = int(np.ceil(extent.width)) + 2 * PADDING
+    height = int(np.ceil(extent.height)) + 2 * PADDING
+
+    figure.set_size_inches(width / dpi, height / dpi)
+    artist.set_position((PADDING - extent.x0, PADDING - extent.y0))
+    canvas.draw()
+    return np.array(canvas.buffer_rgba())
+
+
+def cache_stats():
+    return _render_cache.stats()
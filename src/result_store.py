@@ -0,0 +1,132 @@
+import hashlib
+import os
+import pickle
+import sqlite3
+import time
+
+import platformdirs
+import sympy as sp
+
+APP_NAME = "GraphingCalculator"
+# Bump when an operation's output changes, so stale results are not served
+RESULT_VERSION = 1
+# Total size of stored results before the least recently used are evicted
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+
+
+def default_path():
+    return os.path.join(platformdirs.user_cache_dir(APP_NAME), "results.sqlite")
+
+
+class ResultStore:
+    # Persistent cache of operation results in SQLite, keyed by the operation, the canonical
+    # form (sp.srepr) of the expression, any options and the library versions. Each entry
+    # holds the pickled result and the text shown for it. A store that cannot be opened
+    # (read-only home, locked file) behaves as an always-empty cache.
+
+    def __init__(self, path=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path or default_path()
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self.connection = sqlite3.connect(self.path, timeout=1)
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, operation TEXT, result BLOB, text TEXT, "
+                "size INTEGER, accessed REAL)"
+            )
+            self.connection.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)")
+            self.connection.commit()
+        except (OSError, sqlite3.Error):
+            self.connection = None
+
+    @staticmethod
+    def key(operation, expr, options=()):
+        canonical = "\x1f".join([
+            operation, sp.srepr(expr), repr(tuple(options)),
+            f"{RESULT_VERSION}/{sp.__version__}"
+        ])
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    def get(self, operation, expr, options=()):
+        # (result, text) stored for the operation, or None.
+        key = self.key(operation, expr, options)
+        cursor = self._execute("SELECT result, text FROM results WHERE key = ?", (key,))
+        row = cursor.fetchone() if cursor is not None else None
+        if row is None:
+            self.misses += 1
+            return None
+
+        try:
+            result = pickle.loads(row[0])
+        except Exception:
+            # Written by an incompatible build; drop it and recompute
+            self.misses += 1
+            self._execute("DELETE FROM results WHERE key = ?", (key,), commit=True)
+            return None
+
+        self.hits += 1
+        self._execute("UPDATE results SET accessed = ? WHERE key = ?", (time.time(), key), commit=True)
+        return result, row[1]
+
+    def put(self, operation, expr, options, result, text):
+        try:
+            blob = pickle.dumps(result)
+        except Exception:
+            return
+
+        size = len(blob) + len(text.encode())
+        self._execute(
+            "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)",
+            (self.key(operation, expr, options), operation, blob, text, size, time.time())
+        )
+        self.evict()
+
+    def evict(self):
+        # Drops the least recently used entries until the total size is within max_bytes.
+        self._execute(
+            "DELETE FROM results WHERE key IN ("
+            "SELECT key FROM (SELECT key, SUM(size) OVER (ORDER BY accessed DESC, key) AS total "
+            "FROM results) WHERE total > ?)",
+            (self.max_bytes,), commit=True
+        )
+
+    def clear(self):
+        self._execute("DELETE FROM results", commit=True)
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        cursor = self._execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results")
+        size, used = cursor.fetchone() if cursor is not None else (0, 0)
+        lookups = self.hits + self.misses
+        return {
+            "size": size,
+            "bytes": used,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def _execute(self, statement, parameters=(), commit=False):
+        # Runs a statement, treating database errors as a cache miss.
+        if self.connection is None:
+            return None
+        try:
+            cursor = self.connection.execute(statement, parameters)
+            if commit:
+                self.connection.commit()
+            return cursor
+        except sqlite3.Error:
+            return None
@@ -0,0 +1,79 @@
+import numpy as np
+from scipy.optimize import brentq, minimize_scalar
+
+from sampling import evaluate
+
+# Samples used to bracket roots across an interval
+ROOT_SAMPLES = 4000
+# Accepted |f(root)|, relative to the largest |f| seen on the interval
+ROOT_TOLERANCE = 1e-9
+# Roots closer than this fraction of the interval are merged
+MERGE_TOLERANCE = 1e-9
+# Only minima of |f| below this fraction of the largest |f| are checked for touching roots
+TOUCH_THRESHOLD = 1e-2
+
+
+def find_roots(f, x_min, x_max, samples=ROOT_SAMPLES):
+    # Real roots of a vectorized f on [x_min, x_max] as a sorted float array.
+    # Sign changes between neighbouring samples are refined with Brent's method;
+    # roots that touch zero without crossing are refined as minima of |f|.
+    x_values = np.linspace(x_min, x_max, samples)
+    y_values = evaluate(f, x_values)
+
+    finite = np.isfinite(y_values)
+    if not finite.any():
+        return np.empty(0)
+
+    scale = max(np.nanmax(np.abs(y_values)), 1.0)
+    tolerance = ROOT_TOLERANCE * scale
+    scalar = _scalar(f)
+
+    roots = list(x_values[finite & (y_values == 0)])
+
+    # Sign changes between finite neighbours
+    left_y, right_y = y_values[:-1], y_values[1:]
+    with np.errstate(invalid="ignore"):
+        crossing = np.nonzero(left_y * right_y < 0)[0]
+
+    for i in crossing:
+        try:
+            root = brentq(scalar, x_values[i], x_values[i + 1], xtol=1e-14, rtol=4 * np.finfo(float).eps)
+        except (ValueError, RuntimeError):
+            continue
+        # A sign change across a pole (tan x, 1/x) converges to the pole, not to a root
+        if abs(scalar(root)) <= tolerance:
+            roots.append(root)
+
+    # Local minima of |f| that come close to zero: double roots such as x² at 0
+    magnitude = np.abs(y_values)
+    with np.errstate(invalid="ignore"):
+        touching = np.nonzero(
+            (magnitude[1:-1] <= magnitude[:-2]) & (magnitude[1:-1] <= magnitude[2:])
+            & (left_y[:-1] * right_y[1:] > 0) & (magnitude[1:-1] < TOUCH_THRESHOLD * scale)
+        )[0] + 1
+
+    for i in touching:
+        result = minimize_scalar(lambda x: abs(scalar(x)), bounds=(x_values[i - 1], x_values[i + 1]),
+                                 method="bounded", options={"xatol": 1e-12})
+        if result.success and abs(scalar(result.x)) <= tolerance:
+            roots.append(result.x)
+
+    roots = np.sort(np.asarray(roots, dtype=float))
+    merge_tolerance = (x_max - x_min) * MERGE_TOLERANCE
+    # Snap rounding noise around the origin, including -0.0, to an exact zero
+    roots[np.abs(roots) <= merge_tolerance] = 0.0
+    return _merge(roots, merge_tolerance)
+
+
+def _scalar(f):
+    # Scalar wrapper around a vectorized function, returning NaN where it is undefined.
+    def scalar(x):
+        return float(evaluate(f, np.array([x]))[0])
+    return scalar
+
+
+def _merge(roots, tolerance):
+    if roots.size < 2:
+        return roots
+    keep = np.concatenate([[True], np.diff(roots) > tolerance])
+    return roots[keep]
@@ -0,0 +1,208 @@
+import math
+import threading
+
+import numpy as np
+
+from cache import LRUCache
+
+# Largest allowed deviation, in pixels, between the curve and its straight-line segments
+PIXEL_TOLERANCE = 0.5
+# Intervals narrower than this many pixels are never subdivided
+MIN_PIXEL_WIDTH = 0.25
+# Evaluations allowed per pixel of canvas width
+BUDGET_PER_PIXEL = 4
+
+# A viewport spans between TILES_PER_VIEW and twice that many x-tiles
+TILES_PER_VIEW = 4
+# Default memory budget for cached tile samples
+TILE_CACHE_BYTES = 32 * 1024 * 1024
+
+_GOLDEN = (np.sqrt(5) - 1) / 2
+
+
+def evaluate(f, x_values):
+    # Evaluates f on an array, mapping complex, infinite and failed results to NaN.
+    with np.errstate(all="ignore"):
+        try:
+            y_values = np.asarray(f(x_values))
+        except (TypeError, ValueError, ZeroDivisionError, OverflowError):
+            return np.full_like(x_values, np.nan)
+
+        if np.iscomplexobj(y_values):
+            real = np.real(y_values)
+            y_values = np.where(np.abs(np.imag(y_values)) < 1e-12, real, np.nan)
+
+        try:
+            y_values = np.broadcast_to(y_values, x_values.shape).astype(float)
+        except (TypeError, ValueError):
+            return np.full_like(x_values, np.nan)
+
+    return np.where(np.isfinite(y_values), y_values, np.nan)
+
+
+def point_budget(pixel_width):
+    return max(64, int(pixel_width * BUDGET_PER_PIXEL))
+
+
+def adaptive_sample(f, x_min, x_max, y_min, y_max, pixel_width, pixel_height, budget=None):
+    # Samples f over [x_min, x_max], subdividing intervals until each segment is within
+    # PIXEL_TOLERANCE of the curve. Returns (x_values, y_values, evaluations).
+    pixel_width = max(float(pixel_width), 1.0)
+    pixel_height = max(float(pixel_height), 1.0)
+    if budget is None:
+        budget = point_budget(pixel_width)
+
+    x_scale = pixel_width / (x_max - x_min)
+    y_scale = pixel_height / (y_max - y_min)
+    min_width = MIN_PIXEL_WIDTH / x_scale
+
+    initial = int(min(budget // 2, max(16, pixel_width // 20))) + 1
+    x_values = np.linspace(x_min, x_max, initial)
+
+    # Jitter interior points so periodic curves cannot alias with a uniform grid
+    spacing = (x_max - x_min) / (initial - 1)
+    jitter = ((np.arange(1, initial - 1) * _GOLDEN) % 1.0 - 0.5) * 0.5 * spacing
+    x_values[1:-1] += jitter
+    y_values = evaluate(f, x_values)
+    evaluations = initial
+
+    # Intervals (by left index) whose midpoint still needs checking
+    active = np.arange(initial - 1)
+
+    while active.size and evaluations < budget:
+        left_x = x_values[active]
+        right_x = x_values[active + 1]
+
+        wide = (right_x - left_x) > min_width
+        active = active[wide]
+        if not active.size:
+            break
+
+        # Spread the remaining budget evenly rather than favouring the left edge
+        remaining = budget - evaluations
+        if active.size > remaining:
+            active = active[np.linspace(0, active.size - 1, remaining).astype(int)]
+
+        left_x = x_values[active]
+        right_x = x_values[active + 1]
+        left_y = y_values[active]
+        right_y = y_values[active + 1]
+
+        mid_x = (left_x + right_x) / 2
+        mid_y = evaluate(f, mid_x)
+        evaluations += mid_x.size
+
+        with np.errstate(invalid="ignore"):
+            error = np.abs(mid_y - (left_y + right_y) / 2) * y_scale
+
+        left_finite = np.isfinite(left_y)
+        right_finite = np.isfinite(right_y)
+        mid_finite = np.isfinite(mid_y)
+
+        # Subdivide bent segments and segments crossing the edge of the domain
+        refine = (error > PIXEL_TOLERANCE) | (left_finite != right_finite) | (mid_finite != left_finite)
+        refine &= ~(~left_finite & ~right_finite & ~mid_finite)
+
+        # Segments entirely above or below the viewport cannot be seen
+        with np.errstate(invalid="ignore"):
+            refine &= ~((left_y > y_max) & (right_y > y_max) & (mid_y > y_max))
+            refine &= ~((left_y < y_min) & (right_y < y_min) & (mid_y < y_min))
+
+        # Every evaluated midpoint is kept; only the refined intervals are split further
+        insert_at = active + 1
+        x_values = np.insert(x_values, insert_at, mid_x)
+        y_values = np.insert(y_values, insert_at, mid_y)
+
+        # Each refined interval becomes two children in the next pass
+        new_left = (insert_at + np.arange(insert_at.size) - 1)[refine]
+        active = np.sort(np.concatenate([new_left, new_left + 1]))
+
+    x_values, y_values = _break_poles(x_values, y_values, y_min, y_max, min_width * 2)
+    return x_values, y_values, evaluations
+
+
+def _break_poles(x_values, y_values, y_min, y_max, max_width):
+    # Inserts NaN between neighbours that jump across the whole viewport within a
+    # fraction of a pixel, so asymptotes like 1/x are not joined by a vertical line.
+    with np.errstate(invalid="ignore"):
+        above = y_values > y_max
+        below = y_values < y_min
+
+    jump = ((above[:-1] & below[1:]) | (below[:-1] & above[1:])) & (np.diff(x_values) <= max_width)
+    if not jump.any():
+        return x_values, y_values
+
+    at = np.nonzero(jump)[0] + 1
+    mid_x = (x_values[at - 1] + x_values[at]) / 2
+    return np.insert(x_values, at, mid_x), np.insert(y_values, at, np.nan)
+
+
+def _tile_nbytes(tile):
+    x_values, y_values = tile
+    return x_values.nbytes + y_values.nbytes
+
+
+class TileCache:
+    # Samples per equation stored in x-tiles of power-of-two width, so a new viewport
+    # reuses overlapping tiles and only evaluates the missing ones.
+
+    def __init__(self, max_bytes=TILE_CACHE_BYTES):
+        self.tiles = LRUCache(maxsize=1 << 20, maxbytes=max_bytes, sizeof=_tile_nbytes)
+        self.evaluations = 0
+        # Guards the LRU; tiles may be sampled from a background thread
+        self.lock = threading.Lock()
+
+    def sample(self, spec, f, x_min, x_max, y_min, y_max, pixel_width, pixel_height):
+        # spec identifies the equation and unit mode; returns (x_values, y_values, evaluations).
+        level = math.floor(math.log2((x_max - x_min) / TILES_PER_VIEW))
+        tile_width = 2.0 ** level
+
+        # Tiles are refined for a y-window of power-of-two height around the viewport, so
+        # vertical pans within the window and zooms within a factor of two reuse them.
+        y_block = 2.0 ** math.ceil(math.log2(y_max - y_min))
+        y_low = math.floor(y_min / y_block) * y_block - y_block
+        y_high = y_low + 4 * y_block
+
+        # Sample at the finest pixel density any viewport at this level can show
+        tile_pixel_width = max(pixel_width, 1.0) / TILES_PER_VIEW
+        tile_pixel_height = max(pixel_height, 1.0) * 2 * (y_high - y_low) / y_block
+        resolution = (level, y_block, y_low, round(pixel_width), round(pixel_height))
+
+        xs, ys = [], []
+        evaluations = 0
+        for index in range(math.floor(x_min / tile_width), math.ceil(x_max / tile_width)):
+            key = (spec, resolution, index)
+            with self.lock:
+                tile = self.tiles.get(key)
+            if tile is None:
+                x_values, y_values, count = adaptive_sample(
+                    f, index * tile_width, (index + 1) * tile_width, y_low, y_high,
+                    tile_pixel_width, tile_pixel_height
+                )
+                tile = (x_values, y_values)
+                with self.lock:
+                    self.tiles.put(key, tile)
+                evaluations += count
+
+            x_values, y_values = tile
+            # Neighbouring tiles share their boundary point
+            if xs:
+                x_values, y_values = x_values[1:], y_values[1:]
+            xs.append(x_values)
+            ys.append(y_values)
+
+        with self.lock:
+            self.evaluations += evaluations
+        return np.concatenate(xs), np.concatenate(ys), evaluations
+
+    def invalidate(self, spec):
+        # Drops every tile of an equation, e.g. after it was edited or its unit mode changed.
+        with self.lock:
+            for key in self.tiles.keys():
+                if key[0] == spec:
+                    self.tiles.pop(key)
+
+    def clear(self):
+        with self.lock:
+            self.tiles.clear()
+            self.evaluations = 0
@@ -0,0 +1,409 @@
+import argparse
+import asyncio
+import json
+import os
+import time
+
+import sympy as sp
+import tornado.web
+
+import core
+from cache import LRUCache
+from curves import RELATION_TYPES
+from result_store import ResultStore
+from tasks import Task, TaskError, TaskTimeout, preload, run
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8750
+# Seconds a request may run before its worker is stopped; requests may ask for less
+DEFAULT_TIMEOUT = 10
+# Requests waiting for a free worker before new ones are turned away with 503
+DEFAULT_MAX_QUEUED = 64
+# Largest plot, in pixels per side, a request may ask for
+MAX_PLOT_SIZE = 4096
+PLOT_CACHE_BYTES = 64 * 1024 * 1024
+# Equation texts whose parse results are kept, so repeated requests skip the parse worker
+PARSE_CACHE_SIZE = 4096
+# How often a finished task's pipe is re-checked when its result is not yet complete
+POLL_INTERVAL = 0.005
+
+PLOT_FORMATS = {"png": "image/png", "svg": "image/svg+xml", "points": "application/json"}
+OPERATIONS = ("solve", "diff", "integrate", "area", "stationary")
+
+
+class RequestError(Exception):
+    pass
+
+
+class Overloaded(Exception):
+    pass
+
+
+class WorkerPool:
+    # Runs Tasks for the event loop: at most `workers` worker processes at once and at most
+    # max_queued requests waiting for one. Each request gets its own process, so one that
+    # overruns its timeout is stopped without affecting the others.
+
+    def __init__(self, workers, max_queued=DEFAULT_MAX_QUEUED):
+        self.workers = workers
+        self.max_queued = max_queued
+        self.semaphore = asyncio.Semaphore(workers)
+        self.running = 0
+        self.waiting = 0
+        self.timeouts = 0
+
+    async def run(self, func, args, timeout):
+        if self.waiting >= self.max_queued:
+            raise Overloaded
+        self.waiting += 1
+        try:
+            await self.semaphore.acquire()
+        finally:
+            self.waiting -= 1
+
+        self.running += 1
+        try:
+            task = Task(func, args, timeout).start()
+            await self._finished(task)
+            try:
+                return task.result()
+            except TaskTimeout:
+                self.timeouts += 1
+                raise
+        finally:
+            self.running -= 1
+            self.semaphore.release()
+
+    async def _finished(self, task):
+        # Waits for the task's pipe to become readable (a result, or EOF if the worker died)
+        # or for its time budget to run out, without blocking the event loop.
+        loop = asyncio.get_running_loop()
+        ready = loop.create_future()
+        fd = task.conn.fileno()
+        loop.add_reader(fd, lambda: ready.done() or ready.set_result(None))
+        try:
+            await asyncio.wait_for(ready, task.timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            loop.remove_reader(fd)
+
+        while not task.poll():
+            await asyncio.sleep(POLL_INTERVAL)
+
+
+class Service:
+    # Shared state behind the handlers: the worker pool, requests in flight (so identical
+    # ones share one computation), a memory cache of plots and the persistent result store.
+
+    def __init__(self, workers=None, timeout=DEFAULT_TIMEOUT, max_queued=DEFAULT_MAX_QUEUED, store=None):
+        self.pool = WorkerPool(workers or os.cpu_count() or 2, max_queued)
+        self.timeout = timeout
+        self.store = store if store is not None else ResultStore()
+        self.plots = LRUCache(maxsize=1024, maxbytes=PLOT_CACHE_BYTES, sizeof=len)
+        self.parsed = LRUCache(maxsize=PARSE_CACHE_SIZE)
+        self.in_flight = {}
+        self.coalesced = 0
+
+    async def coalesce(self, key, compute):
+        # Awaits compute(), sharing one run among identical requests that arrive while it is
+        # in flight. A client that disconnects does not cancel it for the others.
+        future = self.in_flight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(compute())
+            self.in_flight[key] = future
+            future.add_done_callback(lambda _: self.in_flight.pop(key, None))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(future)
+
+    async def parse(self, text, deadline):
+        # (parsed, expr) for the equation. Parsing runs in a worker, like the computation it
+        # is for, so an equation that is slow to parse is stopped at the request's deadline.
+        outcome = self.parsed.get(text)
+        if outcome is None:
+            outcome = await self.coalesce(
+                ("parse", text), lambda: self.pool.run(parse_worker, (text,), remaining(deadline))
+            )
+            self.parsed.put(text, outcome)
+        error, parsed, expr = outcome
+        if error is not None:
+            raise RequestError(error)
+        return parsed, expr
+
+    async def plot(self, request):
+        text = equation_text(request)
+        output_format = request.get("format", "png")
+        if output_format not in PLOT_FORMATS:
+            raise RequestError(f"format must be one of {', '.join(PLOT_FORMATS)}")
+        viewport = parse_viewport(request.get("viewport", core.DEFAULT_VIEWPORT))
+        unit_mode = "degrees" if request.get("degrees") else "radians"
+        deadline = time.monotonic() + self.request_timeout(request)
+
+        key = ("plot", text, viewport, output_format, unit_mode)
+        body = self.plots.get(key)
+        if body is None:
+            parsed, _ = await self.parse(text, deadline)
+
+            async def compute():
+                if output_format == "points":
+                    x_values, y_values = await self.pool.run(
+                        core.sample, (parsed, viewport, unit_mode), remaining(deadline)
+                    )
+                    return json.dumps({
+                        "x": [core.json_number(x) for x in x_values],
+                        "y": [core.json_number(y) for y in y_values],
+                    }).encode()
+                return await self.pool.run(
+                    core.render_graph, ([parsed], viewport, output_format, None, unit_mode), remaining(deadline)
+                )
+
+            body = await self.coalesce(key, compute)
+            self.plots.put(key, body)
+
+        return PLOT_FORMATS[output_format], body
+
+    async def operation(self, request):
+        text = equation_text(request)
+        operation = request.get("operation")
+        if operation not in OPERATIONS:
+            raise RequestError(f"operation must be one of {', '.join(OPERATIONS)}")
+        mode = request.get("mode", "auto")
+        if mode not in ("auto", "symbolic", "numeric"):
+            raise RequestError("mode must be auto, symbolic or numeric")
+        x_range = parse_range(request.get("x_range", (-10, 10)))
+        timeout = self.request_timeout(request)
+
+        # The function and its arguments after the parsed equation
+        if operation == "solve":
+            (func, args), options = (core.roots, (x_range, mode)), (mode, x_range)
+        elif operation == "diff":
+            (func, args), options = (core.differentiate, ()), ()
+        elif operation == "integrate":
+            (func, args), options = (core.integrate, ()), ()
+        elif operation == "stationary":
+            (func, args), options = (core.extrema, (mode,)), (mode,)
+        else:
+            lower, upper = request.get("lower"), request.get("upper")
+            for limit in (lower, upper):
+                if limit is not None and not isinstance(limit, (int, float)):
+                    raise RequestError("lower and upper must be numbers")
+            area_mode = request.get("area_mode", "net")
+            if area_mode not in ("net", "true"):
+                raise RequestError("area_mode must be net or true")
+            func, args = core.area, (lower, upper, x_range, mode, area_mode)
+            options = (lower, upper, x_range, mode, area_mode)
+
+        deadline = time.monotonic() + timeout
+        parsed, expr = await self.parse(text, deadline)
+        if parsed[0] in RELATION_TYPES:
+            raise RequestError("operations need an equation of the form y = f(x)")
+
+        # Results are shared with other runs of the service through the persistent store
+        name = f"http:{operation}"
+        options = (parsed[0],) + options
+        stored = self.store.get(name, expr, options)
+        if stored is not None:
+            return stored[0]
+
+        async def compute():
+            result = format_operation(operation, await self.pool.run(func, (parsed, *args), remaining(deadline)))
+            self.store.put(name, expr, options, result, json.dumps(result))
+            return result
+
+        return await self.coalesce(("operation", text, operation, options), compute)
+
+    def request_timeout(self, request):
+        timeout = request.get("timeout", self.timeout)
+        if not isinstance(timeout, (int, float)) or timeout <= 0:
+            raise RequestError("timeout must be a positive number of seconds")
+        return min(float(timeout), self.timeout)
+
+    def stats(self):
+        return {
+            "workers": self.pool.workers,
+            "running": self.pool.running,
+            "waiting": self.pool.waiting,
+            "timeouts": self.pool.timeouts,
+            "in_flight": len(self.in_flight),
+            "coalesced": self.coalesced,
+            "plot_cache": self.plots.stats(),
+            "result_store": self.store.stats(),
+        }
+
+
+def equation_text(request):
+    text = request.get("equation")
+    if not isinstance(text, str) or not text.strip():
+        raise RequestError("equation is required")
+    return core.normalise(text)
+
+
+def parse_worker(text):
+    # Runs in a worker process. Returns (error, parsed, expr), where error is the message
+    # for a request whose equation cannot be parsed; expr is None for relations, which have
+    # no single expression to key results on.
+    try:
+        parsed = core.parse(text)
+    except RecursionError:
+        return f"{text!r} is nested too deeply", None, None
+    except Exception as e:
+        return f"could not parse {text!r}: {e}", None, None
+    if parsed is None:
+        return f"could not parse {text!r}", None, None
+    expr = None if parsed[0] in RELATION_TYPES else core_expression(parsed)
+    return None, parsed, expr
+
+
+def remaining(deadline):
+    # Seconds left of a request's budget; a step started after it has run out is stopped at once.
+    return max(deadline - time.monotonic(), 0)
+
+
+def parse_viewport(viewport):
+    try:
+        x_min, x_max, y_min, y_max, width, height = (float(value) for value in viewport)
+    except (TypeError, ValueError):
+        raise RequestError("viewport must be [x_min, x_max, y_min, y_max, width, height]")
+    if not (x_min < x_max and y_min < y_max):
+        raise RequestError("viewport ranges must be increasing")
+    if not (1 <= width <= MAX_PLOT_SIZE and 1 <= height <= MAX_PLOT_SIZE):
+        raise RequestError(f"viewport size must be between 1 and {MAX_PLOT_SIZE} pixels")
+    return x_min, x_max, y_min, y_max, int(width), int(height)
+
+
+def parse_range(x_range):
+    try:
+        lower, upper = (float(value) for value in x_range)
+    except (TypeError, ValueError):
+        raise RequestError("x_range must be [min, max]")
+    if not lower < upper:
+        raise RequestError("x_range must be increasing")
+    return lower, upper
+
+
+def core_expression(parsed):
+    # The sympy expression the result store keys on.
+    from operations import convert_to_sympy
+    equation_type, coefficients, _, indep_var = parsed
+    return convert_to_sympy(coefficients, equation_type, indep_var)
+
+
+def format_operation(operation, result):
+    # JSON-ready form of a worker's result.
+    if operation == "solve":
+        return {"roots": [core.json_number(x) for x in result]}
+    if operation in ("diff", "integrate"):
+        return {"result": str(result), "latex": sp.latex(result)}
+    if operation == "stationary":
+        maxima, minima = result
+        return {
+            "maxima": [[core.json_number(x), core.json_number(y)] for x, y in maxima],
+            "minima": [[core.json_number(x), core.json_number(y)] for x, y in minima],
+        }
+
+    area, error = result
+    formatted = {"area": None if area is None else core.json_number(area), "error": core.json_number(error)}
+    if area is not None and not isinstance(area, float):
+        formatted["exact"] = str(area)
+    return formatted
+
+
+class JSONHandler(tornado.web.RequestHandler):
+
+    def initialize(self, service):
+        self.service = service
+
+    def request_json(self):
+        try:
+            request = json.loads(self.request.body or b"{}")
+        except ValueError:
+            raise RequestError("body must be JSON")
+        if not isinstance(request, dict):
+            raise RequestError("body must be a JSON object")
+        return request
+
+    def fail(self, status, message):
+        self.set_status(status)
+        self.finish({"error": message})
+
+    async def respond(self, handle):
+        try:
+            await handle()
+        except RequestError as e:
+            self.fail(400, str(e))
+        except Overloaded:
+            self.fail(503, "too many requests are waiting; try again shortly")
+        except TaskTimeout as e:
+            self.fail(504, str(e))
+        except TaskError as e:
+            self.fail(500, str(e))
+
+
+class PlotHandler(JSONHandler):
+
+    async def post(self):
+        async def handle():
+            content_type, body = await self.service.plot(self.request_json())
+            self.set_header("Content-Type", content_type)
+            self.finish(body)
+
+        await self.respond(handle)
+
+
+class OperationHandler(JSONHandler):
+
+    async def post(self):
+        async def handle():
+            self.finish(await self.service.operation(self.request_json()))
+
+        await self.respond(handle)
+
+
+class StatsHandler(JSONHandler):
+
+    def get(self):
+        self.finish(self.service.stats())
+
+
+def make_app(service):
+    return tornado.web.Application([
+        (r"/plot", PlotHandler, {"service": service}),
+        (r"/operation", OperationHandler, {"service": service}),
+        (r"/stats", StatsHandler, {"service": service}),
+    ])
+
+
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="main.py --serve",
+        description="Serve plots and maths operations over HTTP. POST JSON to /plot or /operation; "
+                    "GET /stats for pool and cache counters."
+    )
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"address to listen on (default: {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"port to listen on (default: {DEFAULT_PORT})")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes running at once (default: one per CPU)")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT,
+                        help=f"longest a request may run, in seconds (default: {DEFAULT_TIMEOUT})")
+    parser.add_argument("--max-queued", type=int, default=DEFAULT_MAX_QUEUED,
+                        help=f"requests that may wait for a worker (default: {DEFAULT_MAX_QUEUED})")
+    return parser.parse_args(argv)
+
+
+async def serve(args):
+    # Imported once by the fork server, rather than by each request's worker, and the fork
+    # server started before the first request rather than during it
+    preload("server", *core.RENDER_MODULES)
+    run(parse_worker, ("x",))
+    service = Service(args.workers, args.timeout, args.max_queued)
+    make_app(service).listen(args.port, args.host)
+    print(f"Serving on http://{args.host}:{args.port} with {service.pool.workers} workers", flush=True)
+    await asyncio.Event().wait()
+
+
+def main(argv=None):
+    try:
+        asyncio.run(serve(parse_arguments(argv)))
+    except KeyboardInterrupt:
+        pass
@@ -1,12 +1,20 @@
 import os
 from PyQt5.QtWidgets import (QWidget, QFrame,
                              QHBoxLayout, QVBoxLayout, QLabel, QSizePolicy, QToolButton,
-                             QLineEdit, QMessageBox, QPushButton)
+                             QLineEdit, QMessageBox, QPushButton, QFileDialog)
 from PyQt5.QtGui import QFont, QIcon, QDoubleValidator
 from PyQt5.QtCore import Qt, QSize
+from maths import DEFAULT_TIME_BUDGET
+import profiling
 
 ICON_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "assets", "icons"))
 
+SOLVE_MODE_LABELS = {
+    "auto": "Solving: Automatic",
+    "numeric": "Solving: Fast Numeric",
+    "symbolic": "Solving: Exact",
+}
+
 
 class SettingsPanel(QWidget):
 
@@ -51,6 +59,14 @@ class SettingsPanel(QWidget):
         axis_numbers_widget = self.axis_numbers()
         container_layout.addWidget(axis_numbers_widget, 0, Qt.AlignCenter)
 
+        # Intersection Markers Toggle
+        intersections_widget = self.intersections()
+        container_layout.addWidget(intersections_widget, 0, Qt.AlignCenter)
+
+        # Performance Overlay Toggle
+        performance_widget = self.performance_overlay()
+        container_layout.addWidget(performance_widget, 0, Qt.AlignCenter)
+
         # Update X-Axis
         x_axis_widget = self.update_x_axis()
         container_layout.addWidget(x_axis_widget, 0, Qt.AlignCenter)
@@ -67,6 +83,10 @@ class SettingsPanel(QWidget):
         y_step_widget = self.update_y_axis_step()
         container_layout.addWidget(y_step_widget, 0, Qt.AlignCenter)
 
+        # Time Limit for Maths Operations
+        time_limit_widget = self.update_time_limit()
+        container_layout.addWidget(time_limit_widget, 0, Qt.AlignCenter)
+
         # Degrees/Radians Toggle Button
         self.unit_mode = "radians"
 
@@ -76,6 +96,34 @@ class SettingsPanel(QWidget):
         self.unit_button.clicked.connect(self.toggle_unit_mode)
         container_layout.addWidget(self.unit_button, 0, Qt.AlignCenter)
 
+        # Solving Mode Button (Automatic → Fast Numeric → Exact)
+        self.solve_button = QPushButton(SOLVE_MODE_LABELS["auto"])
+        self.solve_button.setStyleSheet(
+            "padding: 10px; font-size: 16px; background-color: #f3f3f3; border: 2px solid #595959; color: #595959;")
+        self.solve_button.clicked.connect(self.toggle_solve_mode)
+        container_layout.addWidget(self.solve_button, 0, Qt.AlignCenter)
+
+        # Clear Stored Results
+        clear_results_button = QPushButton("Clear Saved Results")
+        clear_results_button.setStyleSheet(
+            "padding: 10px; font-size: 16px; background-color: #f3f3f3; border: 2px solid #595959; color: #595959;")
+        clear_results_button.clicked.connect(self.clear_saved_results)
+        container_layout.addWidget(clear_results_button, 0, Qt.AlignCenter)
+
+        # Import Equations From a File
+        import_button = QPushButton("Import Equations")
+        import_button.setStyleSheet(
+            "padding: 10px; font-size: 16px; background-color: #f3f3f3; border: 2px solid #595959; color: #595959;")
+        import_button.clicked.connect(self.import_equations)
+        container_layout.addWidget(import_button, 0, Qt.AlignCenter)
+
+        # Export Timing Spans
+        export_trace_button = QPushButton("Export Performance Trace")
+        export_trace_button.setStyleSheet(
+            "padding: 10px; font-size: 16px; background-color: #f3f3f3; border: 2px solid #595959; color: #595959;")
+        export_trace_button.clicked.connect(self.export_performance_trace)
+        container_layout.addWidget(export_trace_button, 0, Qt.AlignCenter)
+
         # Open User Manual
         manual_button = QPushButton("Open User Manual")
         manual_button.setStyleSheet(
@@ -179,6 +227,72 @@ class SettingsPanel(QWidget):
         else:
             self.axis_eye_button.setIcon(QIcon(os.path.join(ICON_PATH, "grey_closed_eye.png")))
 
+    def intersections(self):
+
+        intersections_widget = QWidget()
+        intersections_layout = QHBoxLayout(intersections_widget)
+        intersections_layout.setContentsMargins(0, 0, 0, 0)
+        intersections_layout.setSpacing(5)
+
+        # Eye button (store reference for toggling); markers start hidden
+        self.intersections_eye_button = QToolButton()
+        self.intersections_eye_button.setIcon(QIcon(os.path.join(ICON_PATH, "grey_closed_eye.png")))
+        self.intersections_eye_button.setIconSize(QSize(20, 20))
+        self.intersections_eye_button.setStyleSheet("border: none;")
+        self.intersections_eye_button.clicked.connect(self.toggle_intersections)
+
+        # Text
+        intersections_text = QLabel("Show/Hide Intersections", self)
+        intersections_text.setFont(QFont("Calibri", 14))
+        intersections_text.setStyleSheet("color: #595959;")
+
+        intersections_layout.addWidget(self.intersections_eye_button)
+        intersections_layout.addWidget(intersections_text)
+
+        return intersections_widget
+
+    def toggle_intersections(self):
+        # Toggles the intersection markers and updates icon.
+        self.main_window.graph_canvas.toggle_intersections()
+
+        if self.main_window.graph_canvas.intersections_enabled:
+            self.intersections_eye_button.setIcon(QIcon(os.path.join(ICON_PATH, "grey_open_eye.png")))
+        else:
+            self.intersections_eye_button.setIcon(QIcon(os.path.join(ICON_PATH, "grey_closed_eye.png")))
+
+    def performance_overlay(self):
+
+        performance_widget = QWidget()
+        performance_layout = QHBoxLayout(performance_widget)
+        performance_layout.setContentsMargins(0, 0, 0, 0)
+        performance_layout.setSpacing(5)
+
+        # Eye button (store reference for toggling); the overlay starts hidden
+        self.performance_eye_button = QToolButton()
+        self.performance_eye_button.setIcon(QIcon(os.path.join(ICON_PATH, "grey_closed_eye.png")))
+        self.performance_eye_button.setIconSize(QSize(20, 20))
+        self.performance_eye_button.setStyleSheet("border: none;")
+        self.performance_eye_button.clicked.connect(self.toggle_performance_overlay)
+
+        # Text
+        performance_text = QLabel("Show/Hide Performance", self)
+        performance_text.setFont(QFont("Calibri", 14))
+        performance_text.setStyleSheet("color: #595959;")
+
+        performance_layout.addWidget(self.performance_eye_button)
+        performance_layout.addWidget(performance_text)
+
+        return performance_widget
+
+    def toggle_performance_overlay(self):
+        # Toggles the frame time and sampling overlay on the graph.
+        self.main_window.graph_canvas.toggle_performance_overlay()
+
+        if self.main_window.graph_canvas.hud_enabled:
+            self.performance_eye_button.setIcon(QIcon(os.path.join(ICON_PATH, "grey_open_eye.png")))
+        else:
+            self.performance_eye_button.setIcon(QIcon(os.path.join(ICON_PATH, "grey_closed_eye.png")))
+
     def update_x_axis(self):
         # Creates X-Axis range input fields and applies changes to the graph when modified.
         x_axis_widget = QWidget()
@@ -341,6 +455,42 @@ class SettingsPanel(QWidget):
 
         return y_step_widget
 
+    def update_time_limit(self):
+
+        time_limit_widget = QWidget()
+        time_limit_layout = QHBoxLayout(time_limit_widget)
+        time_limit_layout.setContentsMargins(0, 0, 0, 0)
+        time_limit_layout.setSpacing(5)
+
+        validator = QDoubleValidator()
+
+        self.time_limit_input = QLineEdit()
+        self.time_limit_input.setFont(QFont("Calibri", 14))
+        self.time_limit_input.setStyleSheet("color: #595959; background-color: white; border: 1px solid #ccc; padding: 5px;")
+        self.time_limit_input.setFixedWidth(50)
+        self.time_limit_input.setValidator(validator)
+        self.time_limit_input.setPlaceholderText(f"{DEFAULT_TIME_BUDGET:g}")
+        self.time_limit_input.returnPressed.connect(self.apply_time_limit)
+
+        time_limit_text = QLabel("Enter Time Limit (s)", self)
+        time_limit_text.setFont(QFont("Calibri", 14))
+        time_limit_text.setStyleSheet("color: #595959;")
+
+        time_limit_layout.addWidget(self.time_limit_input)
+        time_limit_layout.addWidget(time_limit_text)
+
+        return time_limit_widget
+
+    def apply_time_limit(self):
+        limit = self.time_limit_input.text().strip()
+        try:
+            limit = float(limit)
+            if limit <= 0:
+                raise ValueError
+            self.main_window.maths_panel.time_budget = limit
+        except ValueError:
+            QMessageBox.warning(self, "Invalid Time Limit", "Please enter a positive number of seconds.")
+
     def apply_x_step(self):
         step = self.x_step_input.text().strip()
         try:
@@ -363,6 +513,12 @@ class SettingsPanel(QWidget):
         except ValueError:
             QMessageBox.warning(self, "Invalid Step", "Please enter a positive number for the Y-axis step.")
 
+    def toggle_solve_mode(self):
+        maths_panel = self.main_window.maths_panel
+        modes = list(SOLVE_MODE_LABELS)
+        maths_panel.solve_mode = modes[(modes.index(maths_panel.solve_mode) + 1) % len(modes)]
+        self.solve_button.setText(SOLVE_MODE_LABELS[maths_panel.solve_mode])
+
     def toggle_unit_mode(self):
         if self.unit_mode == "radians":
             self.unit_mode = "degrees"
@@ -373,7 +529,56 @@ class SettingsPanel(QWidget):
             self.unit_button.setText("Convert to Degrees")
             self.main_window.graph_canvas.unit_mode = "radians"
 
-        self.main_window.graph_canvas.plot_default_graph()
+        # Only the curves depend on the unit mode
+        self.main_window.graph_canvas.refresh_equations()
+
+    def clear_saved_results(self):
+        # Empties the on-disk cache of maths operation results.
+        store = self.main_window.maths_panel.result_store
+        count = store.stats()["size"]
+        store.clear()
+        QMessageBox.information(self, "Saved Results", f"Cleared {count} saved result{'s' if count != 1 else ''}.")
+
+    def import_equations(self):
+        # Adds the equations in a text file, one per line as for batch mode, to the equation panel.
+        import batch
+        path, _ = QFileDialog.getOpenFileName(self, "Import Equations", "", "Text (*.txt);;All files (*)")
+        if not path:
+            return
+
+        try:
+            with open(path, encoding="utf-8") as file:
+                texts = [text for _, text in batch.equations(file)]
+        except (OSError, UnicodeDecodeError) as e:
+            QMessageBox.warning(self, "Import Equations", f"Could not read the file.\n{e}")
+            return
+
+        invalid = self.main_window.import_equations(texts)
+        count = len(texts) - len(invalid)
+        message = f"Imported {count} equation{'s' if count != 1 else ''}."
+        if invalid:
+            message += f"\n{len(invalid)} could not be read and are left in the list to correct."
+        QMessageBox.information(self, "Import Equations", message)
+        self.main_window.left_section.setCurrentIndex(0)
+
+    def export_performance_trace(self):
+        # Saves the recorded timing spans for chrome://tracing or Perfetto.
+        if not profiling.spans():
+            QMessageBox.information(self, "Performance Trace",
+                                    "No timings have been recorded. Show the performance overlay, "
+                                    "use the calculator, then export again.")
+            return
+
+        path, _ = QFileDialog.getSaveFileName(self, "Export Performance Trace", "trace.json", "JSON (*.json)")
+        if not path:
+            return
+
+        try:
+            count = profiling.export_chrome_trace(path)
+        except OSError as e:
+            QMessageBox.warning(self, "Performance Trace", f"Could not write the trace.\n{e}")
+            return
+        QMessageBox.information(self, "Performance Trace", f"Exported {count} spans to {path}.")
 
     def open_manual(self):
         self.main_window.left_section.setCurrentIndex(self.main_window.manual_index)
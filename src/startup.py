@@ -0,0 +1,21 @@
+import os
+import sys
+import time
+
+# Run with --trace-startup, or with this environment variable set, to print startup timings
+TRACE_FLAG = "--trace-startup"
+TRACE_VARIABLE = "GRAPHING_CALCULATOR_TRACE_STARTUP"
+
+# Times are measured from the first import of this module, which main.py does before anything else
+_start = time.perf_counter()
+enabled = TRACE_FLAG in sys.argv or bool(os.environ.get(TRACE_VARIABLE))
+
+
+def mark(event):
+    # Prints the time since startup began, when tracing is enabled.
+    if enabled:
+        print(f"[startup] {(time.perf_counter() - _start) * 1000:8.1f} ms  {event}", file=sys.stderr, flush=True)
+
+
+def elapsed():
+    return time.perf_counter() - _start
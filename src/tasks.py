@@ -0,0 +1,292 @@
+import multiprocessing as mp
+import os
+import signal
+import threading
+import time
+from contextlib import contextmanager
+
+# Modules imported once by the fork server so each task starts without re-importing sympy
+_PRELOAD = ["operations"]
+
+_context = None
+
+
+class TaskError(Exception):
+    pass
+
+
+class TaskTimeout(TaskError):
+    pass
+
+
+class TaskCancelled(TaskError):
+    pass
+
+
+class _Interrupted(BaseException):
+    # Not an Exception, so code that catches and carries on, as sympy often does, does not swallow it
+    pass
+
+
+def get_context():
+    # A fork server keeps children free of the GUI's threads while still starting quickly.
+    global _context
+    if _context is None:
+        if "forkserver" in mp.get_all_start_methods():
+            # The fork server is started with python -c and is not given sys.path, so without
+            # this it only finds the preloaded modules when run from this directory
+            source = os.path.dirname(os.path.abspath(__file__))
+            paths = [path for path in os.environ.get("PYTHONPATH", "").split(os.pathsep) if path]
+            if source not in paths:
+                os.environ["PYTHONPATH"] = os.pathsep.join([source] + paths)
+            _context = mp.get_context("forkserver")
+            _context.set_forkserver_preload(_PRELOAD)
+        else:
+            _context = mp.get_context("spawn")
+    return _context
+
+
+def preload(*modules):
+    # Adds modules for the fork server to import once, rather than every task importing
+    # them. Only takes effect before the first task starts.
+    _PRELOAD.extend(module for module in modules if module not in _PRELOAD)
+    if _context is not None and _context.get_start_method() == "forkserver":
+        _context.set_forkserver_preload(_PRELOAD)
+
+
+def can_interrupt():
+    # Whether time_limit can stop work in this thread.
+    return hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread()
+
+
+@contextmanager
+def time_limit(seconds):
+    # Raises TaskTimeout in the block once it has run for seconds, by a timer signal, so
+    # Python code such as sympy is stopped where it is rather than left running. Workers
+    # cannot start Tasks of their own, but can use this. Only where can_interrupt() is true;
+    # a long call into C is stopped when it returns.
+    def interrupt(signum, frame):
+        raise _Interrupted
+
+    previous = signal.signal(signal.SIGALRM, interrupt)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    except _Interrupted:
+        raise TaskTimeout(f"Stopped after {seconds:g} seconds") from None
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _run(conn, func, args):
+    try:
+        conn.send(("ok", func(*args)))
+    except Exception as e:
+        conn.send(("error", f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
+
+
+def _serve(conn, func):
+    # A Worker's process: runs func on each argument tuple it is sent until the pipe closes.
+    while True:
+        try:
+            args = conn.recv()
+        except EOFError:
+            break
+        try:
+            conn.send(("ok", func(*args)))
+        except Exception as e:
+            conn.send(("error", f"{type(e).__name__}: {e}"))
+    conn.close()
+
+
+def _value(outcome):
+    # The value of a finished call, raising TaskError (or a subclass) if it did not succeed.
+    status, value = outcome
+    if status == "ok":
+        return value
+    if status == "timeout":
+        raise TaskTimeout(value)
+    if status == "cancelled":
+        raise TaskCancelled(value)
+    raise TaskError(value)
+
+
+class Task:
+    # Runs func(*args) in a child process, so it can be cancelled or stopped at a time budget.
+
+    def __init__(self, func, args=(), timeout=None):
+        self.func = func
+        self.args = args
+        self.timeout = timeout
+        self.started_at = None
+        self.process = None
+        self.conn = None
+        self.outcome = None
+
+    def start(self):
+        ctx = get_context()
+        self.conn, child_conn = ctx.Pipe(duplex=False)
+        self.process = ctx.Process(target=_run, args=(child_conn, self.func, self.args), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.started_at = time.monotonic()
+        return self
+
+    def started(self):
+        return self.process is not None
+
+    def elapsed(self):
+        return 0.0 if self.started_at is None else time.monotonic() - self.started_at
+
+    def poll(self):
+        # Returns True once the task has finished, failed, timed out or been cancelled.
+        if self.outcome is not None:
+            return True
+
+        if self.process is None:
+            return False
+
+        if self.conn.poll():
+            try:
+                self.outcome = self.conn.recv()
+            except EOFError:
+                self.outcome = ("error", "Worker process exited unexpectedly")
+            self._reap()
+            return True
+
+        if not self.process.is_alive():
+            self.outcome = ("error", "Worker process exited unexpectedly")
+            self._reap()
+            return True
+
+        if self.timeout is not None and self.elapsed() > self.timeout:
+            self.outcome = ("timeout", f"Stopped after {self.timeout:g} seconds")
+            self._terminate()
+            return True
+
+        return False
+
+    def cancel(self):
+        if self.outcome is None:
+            self.outcome = ("cancelled", "Cancelled")
+            self._terminate()
+
+    def result(self):
+        # Returns the task's value, raising TaskError (or a subclass) if it did not succeed.
+        if self.outcome is None:
+            raise TaskError("Task has not finished")
+        return _value(self.outcome)
+
+    def wait(self, interval=0.01):
+        # Blocks until the task is done and returns its result.
+        while not self.poll():
+            time.sleep(interval)
+        return self.result()
+
+    def _terminate(self):
+        # A task cancelled before it started has no process to stop
+        if self.process is None:
+            return
+        if self.process.is_alive():
+            self.process.terminate()
+        self._reap()
+
+    def _reap(self):
+        self.process.join(timeout=1)
+        self.conn.close()
+
+
+class Worker:
+    # Runs func(*args) for one call after another in a child process that is kept between
+    # calls, so a stream of short calls does not start a process for each. A call that
+    # overruns timeout has the process stopped, as a Task would; the next call starts a
+    # fresh one.
+
+    def __init__(self, func, timeout=None):
+        self.func = func
+        self.timeout = timeout
+        self.process = None
+        self.conn = None
+        self.started_at = None
+        self.outcome = None
+
+    def busy(self):
+        # True from submit until the call's result is collected.
+        return self.started_at is not None
+
+    def submit(self, args):
+        if self.busy():
+            raise TaskError("Worker is busy")
+        if self.process is None:
+            ctx = get_context()
+            self.conn, child_conn = ctx.Pipe()
+            self.process = ctx.Process(target=_serve, args=(child_conn, self.func), daemon=True)
+            self.process.start()
+            child_conn.close()
+        self.conn.send(args)
+        self.outcome = None
+        self.started_at = time.monotonic()
+        return self
+
+    def poll(self):
+        # Returns True once the current call has finished, failed or timed out.
+        if self.outcome is not None:
+            return True
+
+        if not self.busy():
+            return False
+
+        if self.conn.poll():
+            try:
+                self.outcome = self.conn.recv()
+            except EOFError:
+                self.outcome = ("error", "Worker process exited unexpectedly")
+                self._stop()
+            return True
+
+        if not self.process.is_alive():
+            self.outcome = ("error", "Worker process exited unexpectedly")
+            self._stop()
+            return True
+
+        if self.timeout is not None and time.monotonic() - self.started_at > self.timeout:
+            self.outcome = ("timeout", f"Stopped after {self.timeout:g} seconds")
+            self._stop()
+            return True
+
+        return False
+
+    def result(self):
+        # Returns the current call's value, raising TaskError (or a subclass) if it did not
+        # succeed, and frees the worker for the next call.
+        if self.outcome is None:
+            raise TaskError("Call has not finished")
+        self.started_at = None
+        return _value(self.outcome)
+
+    def wait(self, interval=0.01):
+        # Blocks until the current call is done and returns its result.
+        while not self.poll():
+            time.sleep(interval)
+        return self.result()
+
+    def close(self):
+        # Stops the process; a call in progress is abandoned.
+        if self.process is not None:
+            self._stop()
+        self.started_at = None
+
+    def _stop(self):
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join(timeout=1)
+        self.conn.close()
+        self.process = None
+        self.conn = None
+
+
+def run(func, args=(), timeout=None):
+    return Task(func, args, timeout).start().wait()
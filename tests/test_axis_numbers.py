@@ -0,0 +1,22 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from axis_numbers import axis_labels, thinned_step
+
+
+def test_thinned_step_keeps_reasonable_steps():
+    assert thinned_step(-10, 10, 1, 900, 40) == 1
+
+
+def test_thinned_step_limits_tiny_steps():
+    step = thinned_step(-10, 10, 0.001, 800, 40)
+    assert step > 0.001
+    assert 20 / step + 1 <= 800 / 40 + 1
+
+
+def test_axis_labels_skip_zero_and_are_cached():
+    values, labels = axis_labels(-2, 2, 1)
+    assert labels == ["-2", "-1", "1", "2"]
+    assert axis_labels(-2, 2, 1)[1] is labels
@@ -0,0 +1,66 @@
+import sys
+import os
+import io
+import json
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import batch
+
+
+def run(argv):
+    output = io.StringIO()
+    batch.main(argv, stdout=output)
+    return [json.loads(line) for line in output.getvalue().splitlines()]
+
+
+def test_results_as_json_lines(tmp_path):
+    source = tmp_path / "equations.txt"
+    source.write_text("x^2 - 4\n# a comment\n\n2x +\nsinx\n")
+
+    first, invalid, sine = run([str(source)])
+    assert first["line"] == 1 and first["type"] == "quadratic"
+    assert first["roots"] == [-2.0, 2.0]
+    assert first["minima"] == [[0.0, -4.0]]
+    assert first["derivative"] == "2*x"
+    assert first["area_exact"] == "32/3"
+    assert invalid == {"line": 4, "equation": "2x +", "error": "could not parse"}
+    assert sine["line"] == 5 and sine["derivative"] == "cos(x)"
+
+
+def test_render_writes_a_file_per_equation(tmp_path):
+    source = tmp_path / "equations.txt"
+    source.write_text("x^2\ncosx\n")
+
+    records = run([str(source), "--render", "svg", "-o", str(tmp_path / "plots")])
+    assert [os.path.basename(r["file"]) for r in records] == ["000001.svg", "000002.svg"]
+    assert (tmp_path / "plots" / "000002.svg").read_bytes().lstrip().startswith(b"<?xml")
+
+
+def test_input_is_streamed_in_order_with_jobs():
+    read = []
+
+    def lines():
+        for n in range(1, 41):
+            read.append(n)
+            yield f"{n}x^2\n"
+
+    options = batch.parse_arguments(["--ops", "derivative"])[1]
+    records = batch.records(lines(), options, jobs=2)
+    first = next(records)
+    # Only the results in flight have been read, not the whole input
+    assert first["derivative"] == "2*x"
+    assert len(read) <= 2 * batch.WINDOW_PER_JOB + 1
+
+    rest = list(records)
+    assert [r["derivative"] for r in rest] == [f"{2 * n}*x" for n in range(2, 41)]
+
+
+def test_an_equation_that_overruns_is_timed_out(tmp_path):
+    source = tmp_path / "equations.txt"
+    # Parsing this alone takes far longer than the budget
+    source.write_text("x^2\ny=99^99^9\nsinx\n")
+
+    first, slow, sine = run([str(source), "--timeout", "1", "--ops", "derivative"])
+    assert first["derivative"] == "2*x" and sine["derivative"] == "cos(x)"
+    assert slow == {"line": 2, "equation": "y=99^99^9", "error": "timed out after 1 seconds"}
@@ -0,0 +1,39 @@
+import sys
+import os
+import io
+import json
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import benchmark
+
+
+def timings(**medians):
+    return {"metadata": {}, "benchmarks": {name: {"median": median} for name, median in medians.items()}}
+
+
+def test_compare_against_baseline():
+    baseline = timings(parse=1.0, plot=1.0, zoom=1.0, removed=1.0)
+    results = timings(parse=1.1, plot=1.5, zoom=0.5, added=1.0)
+
+    comparison = {name: status for name, *_, status in benchmark.compare(results, baseline, threshold=0.25)}
+    assert comparison == {"parse": "unchanged", "plot": "regressed", "zoom": "improved"}
+
+
+def test_results_json_and_regression_exit_status(tmp_path):
+    output = tmp_path / "results.json"
+    assert benchmark.main(["-g", "parse", "-r", "2", "-o", str(output)], stdout=io.StringIO()) == 0
+
+    results = json.loads(output.read_text())
+    assert set(results["benchmarks"]) == {"parse/corpus", "parse/corpus_cached"}
+    assert results["benchmarks"]["parse/corpus"]["repeat"] == 2
+    assert results["metadata"]["cpu_count"] == os.cpu_count()
+    assert "numpy" in results["metadata"]["packages"]
+
+    # A baseline far faster than this run makes every benchmark a regression
+    for timing in results["benchmarks"].values():
+        timing["median"] /= 100
+    output.write_text(json.dumps(results))
+    report = io.StringIO()
+    assert benchmark.main(["-g", "parse", "-r", "2", "-b", str(output)], stdout=report) == 1
+    assert "regressed" in report.getvalue()
@@ -3,18 +3,79 @@ import os
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
 
-from calculations import parse_equation
+from calculations import parse_equation, compile_expression
+from polynomial import to_expression
 
+import numpy as np
 import sympy as sp
 
 def test_parse_linear_equation():
     result = parse_equation("y = 2x + 3")
     assert result is not None
-    eq_type, expr, dep_var, indep_var = result
-    assert eq_type == "symbolic"
+    eq_type, coefficients, dep_var, indep_var = result
+    assert eq_type == "linear"
     assert str(dep_var) == "y"
     assert str(indep_var) == "x"
-    assert sp.simplify(expr - (2*sp.Symbol("x") + 3)) == 0
+    assert coefficients == (2, 3)
+
+
+def test_parse_polynomial_of_any_degree():
+    assert parse_equation("y = (x-1)^3")[:2] == ("cubic", (1, -3, 3, -1))
+    eq_type, coefficients, _, _ = parse_equation("y = x^6 - 2x")
+    assert eq_type == "polynomial"
+    assert coefficients == (1, 0, 0, 0, 0, -2, 0)
+    assert parse_equation("y = sin(x)")[0] == "symbolic"
 
 def test_invalid_equation():
     assert parse_equation("2x +") is None
+
+
+def test_parse_cache_ignores_whitespace():
+    first = parse_equation("y = x^2 + 1")
+    second = parse_equation("y=x^2+1")
+    assert first is second
+
+
+def test_compile_expression_is_cached_per_unit_mode():
+    x = sp.Symbol("x")
+    radians = compile_expression(sp.sin(x), "x", "radians")
+    degrees = compile_expression(sp.sin(x), "x", "degrees")
+    assert compile_expression(sp.sin(x), "x", "radians") is radians
+    assert abs(degrees(np.array([90.0]))[0] - 1.0) < 1e-12
+    assert abs(radians(np.array([np.pi / 2]))[0] - 1.0) < 1e-12
+
+
+def test_parse_calculator_grammar():
+    x = sp.Symbol("x")
+    cases = {
+        "y = sinx": sp.sin(x),
+        "y = sin2x": sp.sin(2 * x),
+        "y = 2sinxcosx": 2 * sp.sin(x) * sp.cos(x),
+        "y = e^3x": sp.exp(3 * x),
+        "y = log[2]x": sp.log(x, 2),
+        "y = (x+1)(x-1": (x + 1) * (x - 1),
+        "y = sin^2x": sp.sin(x) ** 2,
+        "y = -x^2": -x ** 2,
+    }
+    for equation, expected in cases.items():
+        eq_type, expr, _, indep_var = parse_equation(equation)
+        if eq_type != "symbolic":
+            expr = to_expression(expr, indep_var)
+        assert sp.simplify(expr - expected) == 0, equation
+
+
+def test_parse_rejects_unbalanced_close_bracket():
+    assert parse_equation("y = x)") is None
+
+
+def test_parse_implicit_equation():
+    x, y = sp.symbols("x y")
+    assert parse_equation("x^2 + y^2 = 25") == ("implicit", x**2 + y**2 - 25, "y", "x")
+    assert parse_equation("sin(xy) = 0.5")[0] == "implicit"
+    # y on both sides, or x in terms of y
+    assert parse_equation("y = x + y^2")[0] == "implicit"
+    assert parse_equation("x = y^2") == ("implicit", x - y**2, "y", "x")
+    # Linear in y: still a function of x
+    assert parse_equation("x + 2y = 4")[:2] == ("linear", (-sp.Rational(1, 2), 2))
+    assert parse_equation("x^2 + a = 1") is None
+    assert parse_equation("x = y = 1") is None
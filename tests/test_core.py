@@ -0,0 +1,49 @@
+import sys
+import os
+import subprocess
+
+SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, SRC)
+
+import numpy as np
+import sympy as sp
+
+import core
+
+
+def test_import_is_headless_and_light():
+    # A fresh interpreter, so modules loaded by other tests do not count
+    loaded = subprocess.run(
+        [sys.executable, "-c", "import sys, core; print(' '.join(sorted(sys.modules)))"],
+        cwd=SRC, capture_output=True, text=True, check=True
+    ).stdout.split()
+    for heavy in ("PyQt5", "sympy", "scipy", "matplotlib"):
+        assert heavy not in loaded
+
+
+def test_parse_assumes_y():
+    assert core.normalise(" x^2 ") == "y=x^2"
+    assert core.normalise("r=x") == "r=x"
+    assert core.normalise("x^2 + y^2 = 25") == "x^2 + y^2 = 25"
+    assert core.parse("2x + 3")[:2] == ("linear", (2, 3))
+
+
+def test_maths_without_a_gui():
+    x = sp.Symbol("x")
+    parabola = core.parse("x^2 - 4")
+    assert np.allclose(core.roots(parabola), [-2, 2])
+    assert core.differentiate(parabola) == 2 * x
+    assert sp.simplify(core.integrate(parabola) - (x ** 3 / 3 - 4 * x)) == 0
+    area, _ = core.area(parabola)
+    assert area == sp.Rational(32, 3)
+    assert core.extrema(parabola) == ([], [(0.0, -4.0)])
+    points = core.intersections([parabola, core.parse("4 - x^2")])
+    assert np.allclose([p[2] for p in points], [-2, 2])
+
+
+def test_render_graph_formats():
+    equations = [core.parse("sinx"), core.parse("x^2")]
+    image = core.render_graph(equations, (-5, 5, -5, 5, 320, 240), "rgba")
+    assert image.shape == (240, 320, 4)
+    assert core.render_graph(equations, output_format="png").startswith(b"\x89PNG")
+    assert b"<svg" in core.render_graph(equations, output_format="svg")
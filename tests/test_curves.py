@@ -0,0 +1,79 @@
+import sys
+import os
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import core
+from calculations import parse_equation
+from curves import DEFAULT_RANGE, MAX_SEGMENT_PIXELS, CurveCache, sample_curve
+
+
+def test_parse_parametric_and_polar():
+    equation_type, (x_expr, y_expr, t_range), _, parameter = parse_equation("x=cos(3t),y=sin(2t)")
+    assert (equation_type, str(x_expr), str(y_expr), t_range, parameter) == \
+        ("parametric", "cos(3*t)", "sin(2*t)", DEFAULT_RANGE, "t")
+
+    assert parse_equation("r=1+cos(theta)") == parse_equation("r=1+cos(θ)")
+    equation_type, (r_expr, t_range), _, parameter = parse_equation("r=θ,0<θ<4pi")
+    assert (equation_type, parameter) == ("polar", "θ")
+    assert np.allclose(t_range, (0, 4 * np.pi))
+
+    # Mismatched parameters and ranges are rejected
+    assert parse_equation("x=cos(t),y=sin(s)") is None
+    assert parse_equation("r=θ,0<t<1") is None
+
+
+def test_points_lie_on_the_curve():
+    x_values, y_values = core.sample(parse_equation("r=2"))
+    assert np.allclose(np.hypot(x_values, y_values), 2)
+
+    x_values, y_values = core.sample(parse_equation("x=2cos(t),y=sin(t)"))
+    assert np.allclose((x_values / 2) ** 2 + y_values ** 2, 1)
+
+
+def test_segments_are_short_on_screen():
+    # A Lissajous figure with many tight loops is refined until every segment is short
+    x_values, y_values, _ = sample_curve(lambda t: (np.sin(50 * t), np.cos(49 * t)),
+                                         *DEFAULT_RANGE, 40, 40, budget=50000)
+    lengths = np.hypot(np.diff(x_values) * 40, np.diff(y_values) * 40)
+    assert lengths.max() <= MAX_SEGMENT_PIXELS
+
+
+def test_tight_loops_get_more_samples():
+    # Samples follow arc length, so the fast part of the curve gets most of them
+    t_values = []
+
+    def curve(t):
+        t_values.append(t)
+        return t, np.where(t > 1, 20 * np.sin(40 * t), 0)
+
+    sample_curve(curve, 0, 2, 100, 100, budget=20000)
+    t_values = np.concatenate(t_values)
+    assert (t_values > 1).sum() > 10 * (t_values <= 1).sum()
+
+
+def test_poles_are_broken():
+    x_values, y_values, _ = sample_curve(lambda t: (np.tan(t), t), *DEFAULT_RANGE, 40, 40,
+                                         window=(-10, 10, -10, 10), budget=20000)
+    assert np.isnan(x_values).any()
+
+
+def test_cached_curves_are_reused_when_panning():
+    cache = CurveCache()
+    spec = ("parametric", (None, None, DEFAULT_RANGE), "t", "radians")
+    f = lambda t: (np.cos(t), np.sin(t))
+    _, _, evaluations = cache.sample(spec, f, -10, 10, -10, 10, 800, 600)
+    assert evaluations > 0
+    _, _, evaluations = cache.sample(spec, f, -9, 11, -10, 10, 800, 600)
+    assert evaluations == 0
+
+    cache.invalidate(spec)
+    _, _, evaluations = cache.sample(spec, f, -9, 11, -10, 10, 800, 600)
+    assert evaluations > 0
+
+
+def test_curves_are_left_out_of_intersections():
+    equations = [parse_equation("y=x"), parse_equation("r=2"), parse_equation("y=-x")]
+    assert [(a, b) for a, b, _, _ in core.intersections(equations)] == [(0, 2)]
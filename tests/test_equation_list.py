@@ -0,0 +1,64 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from PyQt5.QtCore import Qt
+
+from equation_list import COLOR_ROLE, ID_ROLE, VISIBLE_ROLE, EquationModel
+
+
+def test_ids_are_stable_and_looked_up_directly():
+    model = EquationModel()
+    rows = [model.create(f"y={i}x+1") for i in range(1, 2001)]
+    model.append(rows)
+    assert len(model) == model.rowCount() == 2000
+
+    equation = model.get(rows[1500].id)
+    assert equation.text == "y=1501x+1"
+    assert model.index_of(equation.id).row() == 1500
+    assert model.index_of(equation.id).data(ID_ROLE) == equation.id
+
+    # Removing rows does not change the ids of the others
+    model.pop()
+    assert model.get(rows[-1].id) is None
+    assert model.get(rows[1500].id) is equation
+
+
+def test_one_insertion_per_append():
+    model = EquationModel()
+    inserted = []
+    model.rowsInserted.connect(lambda parent, first, last: inserted.append((first, last)))
+    model.append([model.create() for _ in range(100)])
+    model.append([model.create()])
+    assert inserted == [(0, 99), (100, 100)]
+
+
+def test_update_repaints_one_row():
+    model = EquationModel()
+    model.append([model.create("y=x"), model.create("y=2x")])
+    changed = []
+    model.dataChanged.connect(lambda first, last, roles: changed.append((first.row(), last.row())))
+
+    second = model.rows[1]
+    model.update(second.id, equation_type="linear", coefficients=(2, 0), color="#ff0000", indep_var="y")
+    model.update(second.id, visible=False)
+    assert changed == [(1, 1), (1, 1)]
+
+    index = model.index_of(second.id)
+    assert (index.data(COLOR_ROLE), index.data(VISIBLE_ROLE)) == ("#ff0000", False)
+
+
+def test_only_entered_equations_are_plotted():
+    model = EquationModel()
+    entered, draft = model.create("y=x"), model.create("y=")
+    model.append([entered, draft])
+    model.update(entered.id, equation_type="linear", coefficients=(1, 0), color="#000000", indep_var="y")
+
+    assert list(model.plotted()) == [(entered.id, "linear", (1, 0), "#000000", True, "y")]
+    assert model.texts() == ["y=x", "y="]
+
+    # Typing only changes the text; the equation is parsed when it is entered
+    assert model.setData(model.index_of(draft.id), "y=x^2")
+    assert model.index_of(draft.id).data(Qt.DisplayRole) == "y=x^2"
+    assert draft.equation_type is None
@@ -0,0 +1,66 @@
+import sys
+import os
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from implicit import COARSE_CELLS, ContourCache, contour
+
+
+def circle(radius):
+    return lambda x, y: x**2 + y**2 - radius**2
+
+
+def test_contour_follows_the_curve():
+    x_values, y_values, _ = contour(circle(5), -8, 8, -8, 8, levels=5)
+    points = ~np.isnan(x_values)
+    assert points.sum() > 100
+    assert np.abs(np.hypot(x_values[points], y_values[points]) - 5).max() < 1e-3
+    # Segments are separated by NaN
+    assert np.isnan(x_values[2::3]).all()
+
+
+def test_work_scales_with_curve_length():
+    levels = 6
+    full_grid = ((COARSE_CELLS << levels) + 1) ** 2
+    _, _, small = contour(circle(1), -8, 8, -8, 8, levels)
+    _, _, large = contour(circle(4), -8, 8, -8, 8, levels)
+    assert large < full_grid / 4
+    assert 2 < large / small < 8
+
+
+def test_poles_are_not_drawn():
+    x_values, y_values, _ = contour(lambda x, y: 1 / (x - y) - 1, -4, 4, -4, 4, levels=4)
+    points = ~np.isnan(x_values)
+    # Only x - y = 1, not the sign change across x = y
+    assert np.allclose(x_values[points] - y_values[points], 1)
+
+
+def test_cached_tiles_are_reused_when_panning():
+    cache = ContourCache()
+    f = circle(5)
+    x_values, _, evaluations = cache.sample("circle", f, -10, 10, -10, 10, 800, 600)
+    assert evaluations > 0 and len(x_values)
+    _, _, evaluations = cache.sample("circle", f, -9, 11, -10, 10, 800, 600)
+    assert evaluations == 0
+
+    cache.invalidate("circle")
+    _, _, evaluations = cache.sample("circle", f, -10, 10, -10, 10, 800, 600)
+    assert evaluations > 0
+
+
+def test_curves_at_a_domain_edge_are_found_zoomed_out():
+    # x y = 1 hugs the edge of log's domain, so at this zoom every coarse cell it passes
+    # through also holds points where F is undefined
+    f = lambda x, y: np.log(x) + np.log(y)
+    x_values, y_values, _ = ContourCache().sample("log", f, -100, 100, -100, 100, 800, 600)
+    points = ~np.isnan(x_values)
+    assert points.sum() > 10
+    assert np.allclose(x_values[points] * y_values[points], 1, rtol=0.1)
+
+    x_values, y_values, _ = ContourCache().sample("pole", lambda x, y: 1 / (x - y) - 1,
+                                                  -100, 100, -100, 100, 800, 600)
+    points = ~np.isnan(x_values)
+    assert points.sum() > 20
+    assert np.allclose(x_values[points] - y_values[points], 1)
@@ -0,0 +1,41 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import numpy as np
+
+from intersections import find_intersections
+
+
+def test_parabola_meets_line_at_both_points():
+    points = find_intersections({"a": lambda x: x ** 2, "b": lambda x: x}, -10, 10)
+    assert [(a, b) for a, b, _, _ in points] == [("a", "b"), ("a", "b")]
+    assert np.allclose([p[2] for p in points], [0, 1], atol=1e-12)
+    assert np.allclose([p[3] for p in points], [0, 1], atol=1e-12)
+
+
+def test_every_pair_is_checked():
+    functions = {"x": lambda x: x, "-x": lambda x: -x, "one": lambda x: np.ones_like(x)}
+    pairs = {(a, b) for a, b, _, _ in find_intersections(functions, -5, 5)}
+    assert pairs == {("x", "-x"), ("x", "one"), ("-x", "one")}
+
+
+def test_poles_and_coincident_curves_are_not_intersections():
+    assert find_intersections({"a": lambda x: 1 / x, "b": lambda x: np.zeros_like(x)}, -5, 5) == []
+    assert find_intersections({"a": np.sin, "b": np.sin}, -5, 5) == []
+
+
+def test_existing_samples_are_reused():
+    calls = []
+
+    def f(x):
+        calls.append(x.size)
+        return np.sin(x)
+
+    x_values = np.linspace(-10, 10, 801)
+    points = find_intersections({"sin": f, "zero": lambda x: np.zeros_like(x)}, -10, 10,
+                                {"sin": (x_values, np.sin(x_values))})
+    assert np.allclose([p[2] for p in points], np.arange(-3, 4) * np.pi, atol=1e-10)
+    # Only the brackets are refined; the curve is never evaluated over the whole grid
+    assert max(calls) <= len(points)
@@ -0,0 +1,46 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from polynomial import horner, real_roots, stationary_points
+from calculations import parse_equation
+from operations import find_maximum, find_minimum, solve_equation
+
+
+def test_horner_matches_polyval():
+    coefficients = np.array([3.0, -2.0, 0.5, 7.0])
+    x_values = np.linspace(-3, 3, 13)
+    assert np.allclose(horner(coefficients, x_values), np.polyval(coefficients, x_values))
+
+
+def test_real_roots_skip_complex_and_merge_repeated():
+    assert np.allclose(real_roots((1, 0, -4)), [-2, 2])
+    assert real_roots((1, 0, 1)).size == 0
+    # (x - 1)^3 (x + 2)
+    assert np.allclose(real_roots((1, -1, -3, 5, -2)), [-2, 1])
+
+
+def test_stationary_points_classified_by_higher_derivatives():
+    assert stationary_points((1, 0, 0, 0, 0)) == [(0.0, 0.0, "Minimum")]
+    assert stationary_points((1, 0, 0, 0)) == [(0.0, 0.0, "Point of Inflection")]
+    natures = [nature for _, _, nature in stationary_points((1, 0, -3, 0))]
+    assert natures == ["Maximum", "Minimum"]
+
+
+def test_high_degree_extrema_and_roots():
+    equation_type, coefficients, _, indep_var = parse_equation("y=x^20-3x+1")
+    assert equation_type == "polynomial"
+    (x, y), = find_minimum(equation_type, coefficients, indep_var)
+    assert np.isclose(20 * x ** 19, 3)
+    assert str(find_maximum(equation_type, coefficients, indep_var)) == "No Maximum"
+    assert solve_equation(equation_type, coefficients, indep_var).startswith("When y=0: 0.333333, 1.03815\n")
+
+
+def test_exact_output_on_request():
+    equation_type, coefficients, _, indep_var = parse_equation("y=x^2-2")
+    assert solve_equation(equation_type, coefficients, indep_var).startswith("When y=0: -1.41421, 1.41421")
+    exact = solve_equation(equation_type, coefficients, indep_var, mode="symbolic")
+    assert exact.startswith("When y=0: -sqrt(2), sqrt(2)")
@@ -0,0 +1,80 @@
+import sys
+import os
+import json
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import profiling
+
+
+@pytest.fixture
+def recording():
+    profiling.clear()
+    profiling.enable()
+    yield
+    profiling.enable(profiling.requested)
+    profiling.clear()
+
+
+def test_nothing_is_recorded_while_disabled():
+    profiling.clear()
+    profiling.enable(False)
+    with profiling.span("parse") as span:
+        span.set(evaluations=10)
+    profiling.record("operation", "maths", 0, 1)
+    assert profiling.spans() == []
+
+
+def test_spans_and_summary(recording):
+    with profiling.span("sample", "graphing") as span:
+        span.set(evaluations=42)
+    with profiling.span("sample", "graphing"):
+        pass
+    with profiling.span("draw", "graphing"):
+        pass
+
+    (name, category, _, duration, _, args), *_ = profiling.spans(window=60)
+    assert (name, category, args) == ("sample", "graphing", {"evaluations": 42})
+    assert duration >= 0
+    assert profiling.summary()["sample"][0] == 2
+
+
+def test_ring_buffer_keeps_the_latest_spans(recording):
+    for index in range(profiling.RING_SIZE + 10):
+        profiling.record(f"span {index}", "test", 0, 1)
+    recorded = profiling.spans()
+    assert len(recorded) == profiling.RING_SIZE
+    assert recorded[-1][0] == f"span {profiling.RING_SIZE + 9}"
+
+
+def test_chrome_trace_export(recording, tmp_path):
+    with profiling.span("lambdify", "calculations", expression="sin(x)"):
+        pass
+
+    path = tmp_path / "trace.json"
+    assert profiling.export_chrome_trace(str(path)) == 1
+    events = json.loads(path.read_text())["traceEvents"]
+    complete = [event for event in events if event["ph"] == "X"]
+    assert complete[0]["name"] == "lambdify" and complete[0]["cat"] == "calculations"
+    assert complete[0]["args"] == {"expression": "sin(x)"}
+    assert any(event["ph"] == "M" and event["name"] == "thread_name" for event in events)
+
+
+def test_export_while_another_thread_records(recording):
+    import threading
+    stop = threading.Event()
+
+    def record():
+        while not stop.is_set():
+            profiling.record("background_sample", "graphing", 0, 1)
+
+    thread = threading.Thread(target=record)
+    thread.start()
+    try:
+        for _ in range(50):
+            profiling.chrome_trace()
+    finally:
+        stop.set()
+        thread.join()
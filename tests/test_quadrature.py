@@ -0,0 +1,58 @@
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+import pytest
+import sympy as sp
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from quadrature import integrate, integrate_abs
+from calculations import parse_equation
+from operations import equation_area
+
+
+def test_integrate_reports_error_estimate():
+    value, error = integrate(lambda x: np.exp(x ** 2), 0, 1)
+    assert value == pytest.approx(1.4626517459071816)
+    assert 0 <= error < 1e-8
+
+
+def test_undefined_integrand_gives_nan():
+    value, error = integrate(lambda x: 1 / x, -1, 1)
+    assert np.isnan(value) and np.isnan(error)
+
+
+def test_true_area_splits_at_roots():
+    area, _ = integrate_abs(np.sin, 0, 2 * np.pi, [np.pi])
+    assert area == pytest.approx(4.0)
+    net, _ = integrate(np.sin, 0, 2 * np.pi)
+    assert net == pytest.approx(0.0, abs=1e-12)
+
+
+def test_symbolic_attempt_is_stopped_at_its_budget():
+    # sp.integrate takes half a minute over this; it is stopped, not left running beside the quadrature
+    threads = threading.active_count()
+    started = time.perf_counter()
+    line, area, _ = equation_area("y=log(1+x^3)/(1+x^2)", parse_equation("y=log(1+x^3)/(1+x^2)"),
+                                  "0.1", "2", budget=0.2)
+    assert time.perf_counter() - started < 2
+    assert "numeric" in line and area == pytest.approx(0.5585, abs=1e-3)
+    assert threading.active_count() == threads
+
+
+def test_equation_area_falls_back_to_quadrature():
+    line, area, error = equation_area("y=x^x", parse_equation("y=x^x"), "0.1", "2")
+    assert "numeric" in line
+    assert area == pytest.approx(2.7461, abs=1e-3)
+    assert error < 1e-6
+
+
+def test_equation_area_exact_and_true_modes():
+    _, area, error = equation_area("y=x^3-x", parse_equation("y=x^3-x"), "-1", "1", area_mode="true")
+    assert area == sp.Rational(1, 2) and error == 0.0
+    _, area, _ = equation_area("y=x^3-x", parse_equation("y=x^3-x"), "-1", "1")
+    assert area == 0
+
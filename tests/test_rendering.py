@@ -0,0 +1,28 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import numpy as np
+
+from rendering import PADDING, render_latex
+
+
+def test_render_is_cropped_to_the_text():
+    image = render_latex(r"\frac{x^{3}}{3}", fontsize=20, dpi=100)
+    assert image.dtype == np.uint8 and image.shape[2] == 4
+
+    rows, columns = np.nonzero(image[..., 3])
+    assert rows.size
+    # Only the padding is left around the ink, and the background is transparent
+    assert rows.min() >= PADDING - 1 and rows.max() <= image.shape[0] - PADDING
+    assert columns.min() >= PADDING - 1 and columns.max() <= image.shape[1] - PADDING
+    assert image[0, 0, 3] == 0
+
+
+def test_renders_are_cached_per_size():
+    small = render_latex("x^{2}", fontsize=20, dpi=100)
+    assert render_latex("x^{2}", fontsize=20, dpi=100) is small
+    large = render_latex("x^{2}", fontsize=20, dpi=200)
+    assert large.shape[0] > small.shape[0]
+    assert not small.flags.writeable
@@ -0,0 +1,52 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import sympy as sp
+
+from result_store import ResultStore
+
+x = sp.Symbol("x")
+
+
+def test_results_persist_across_stores(tmp_path):
+    path = str(tmp_path / "results.sqlite")
+    store = ResultStore(path)
+    assert store.get("Integrate", sp.sin(x)) is None
+    store.put("Integrate", sp.sin(x), ("symbolic",), -sp.cos(x), r"- \cos{\left(x \right)}")
+    store.close()
+
+    reopened = ResultStore(path)
+    result, text = reopened.get("Integrate", sp.sin(x), ("symbolic",))
+    assert result == -sp.cos(x)
+    assert text == r"- \cos{\left(x \right)}"
+    # The operation and options are part of the key
+    assert reopened.get("Differentiate", sp.sin(x), ("symbolic",)) is None
+    assert reopened.get("Integrate", sp.sin(x), ("numeric",)) is None
+
+
+def test_least_recently_used_results_are_evicted(tmp_path):
+    store = ResultStore(str(tmp_path / "results.sqlite"), max_bytes=2000)
+    for power in range(10):
+        store.put("Differentiate", x ** power, (), "x" * 300, "x" * 300)
+        store.get("Differentiate", x ** 0)
+
+    assert store.stats()["bytes"] <= 2000
+    assert store.get("Differentiate", x ** 0) is not None
+    assert store.get("Differentiate", x ** 8) is not None
+    assert store.get("Differentiate", x ** 1) is None
+
+
+def test_clear_and_unusable_store(tmp_path):
+    store = ResultStore(str(tmp_path / "results.sqlite"))
+    store.put("Solve", x, (), "0", "0")
+    store.clear()
+    assert store.stats()["size"] == 0
+
+    # A path that cannot be created gives an empty cache rather than an error
+    blocked = tmp_path / "file"
+    blocked.write_text("")
+    broken = ResultStore(str(blocked / "results.sqlite"))
+    broken.put("Solve", x, (), "0", "0")
+    assert broken.get("Solve", x) is None
@@ -0,0 +1,48 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from roots import find_roots
+from calculations import parse_equation
+from operations import x_intercepts, solve_equation
+
+
+def test_sign_changes_are_refined():
+    roots = find_roots(np.sin, -10, 10)
+    assert np.allclose(roots, np.arange(-3, 4) * np.pi)
+
+
+def test_poles_are_not_roots():
+    assert find_roots(lambda x: 1 / x, -5, 5).size == 0
+    roots = find_roots(np.tan, -2, 2)
+    assert np.allclose(roots, [0.0])
+
+
+def test_touching_root():
+    roots = find_roots(lambda x: (x - 1) ** 2, -5, 5)
+    assert np.allclose(roots, [1.0], atol=1e-6)
+
+
+def test_symbolic_intercepts_are_exact():
+    equation_type, coefficients, _, indep_var = parse_equation("y=x^2-4")
+    roots, exact, method = x_intercepts(equation_type, coefficients, indep_var, mode="symbolic")
+    assert method == "symbolic"
+    assert list(roots) == [-2.0, 2.0]
+    assert exact == [-2, 2]
+
+
+def test_falls_back_to_numeric():
+    equation_type, coefficients, _, indep_var = parse_equation("y=cos(x)-x")
+    roots, exact, method = x_intercepts(equation_type, coefficients, indep_var)
+    assert method == "numeric"
+    assert exact is None
+    assert np.allclose(roots, [0.7390851332])
+
+
+def test_numeric_mode_uses_range():
+    equation_type, coefficients, _, indep_var = parse_equation("y=sin(x)")
+    result = solve_equation(equation_type, coefficients, indep_var, x_range=(-1, 4), mode="numeric")
+    assert result.startswith("When y=0: 0, 3.14159 (numeric")
@@ -0,0 +1,45 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import numpy as np
+
+from sampling import adaptive_sample, point_budget, TileCache
+
+
+def test_straight_line_uses_few_evaluations():
+    x, y, evaluations = adaptive_sample(lambda x: 2 * x + 1, -10, 10, -10, 10, 800, 600)
+    assert evaluations < 400
+    assert np.allclose(y, 2 * x + 1)
+
+
+def test_oscillating_curve_is_resolved():
+    x, y, evaluations = adaptive_sample(lambda x: np.sin(50 * x), -10, 10, -2, 2, 800, 600)
+    assert evaluations <= point_budget(800)
+    # Peaks of every period should be reached
+    assert y.max() > 0.95 and y.min() < -0.95
+    assert len(x) > 1000
+
+
+def test_pole_is_broken_with_nan():
+    x, y, _ = adaptive_sample(lambda x: 1 / x, -10, 10, -10, 10, 800, 600)
+    near_zero = np.abs(x) < 0.1
+    assert np.isnan(y[near_zero]).any()
+
+
+def test_tile_cache_reuses_overlapping_tiles():
+    cache = TileCache()
+    spec = ("symbolic", "sin", "x", "radians")
+    _, _, first = cache.sample(spec, np.sin, -10, 10, -10, 10, 800, 600)
+    _, _, panned = cache.sample(spec, np.sin, -9, 11, -10, 10, 800, 600)
+    assert first > 0
+    assert panned == 0
+
+
+def test_tile_cache_invalidates_changed_equation():
+    cache = TileCache()
+    spec = ("symbolic", "sin", "x", "degrees")
+    cache.sample(spec, np.sin, -10, 10, -10, 10, 800, 600)
+    cache.invalidate(spec)
+    assert len(cache.tiles) == 0
@@ -0,0 +1,99 @@
+import sys
+import os
+import json
+import shutil
+import tempfile
+import asyncio
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from tornado.testing import AsyncHTTPTestCase, gen_test
+
+import server
+from result_store import ResultStore
+
+
+class ServerTest(AsyncHTTPTestCase):
+
+    def get_app(self):
+        self.directory = tempfile.mkdtemp()
+        store = ResultStore(os.path.join(self.directory, "results.sqlite"))
+        self.service = server.Service(workers=2, timeout=10, store=store)
+        return server.make_app(self.service)
+
+    def tearDown(self):
+        super().tearDown()
+        self.service.store.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def post(self, path, body):
+        return self.fetch(path, method="POST", body=json.dumps(body), raise_error=False)
+
+    def test_plot_png_and_points(self):
+        response = self.post("/plot", {"equation": "x^2", "viewport": [-5, 5, -5, 5, 200, 150]})
+        assert response.code == 200
+        assert response.headers["Content-Type"] == "image/png"
+        assert response.body.startswith(b"\x89PNG")
+
+        response = self.post("/plot", {"equation": "x^2", "format": "points"})
+        points = json.loads(response.body)
+        assert len(points["x"]) == len(points["y"]) > 0
+        assert all(y == x * x for x, y in zip(points["x"], points["y"]) if y is not None)
+
+    def test_operations(self):
+        solve = json.loads(self.post("/operation", {"equation": "x^2 - 4", "operation": "solve"}).body)
+        assert solve == {"roots": [-2.0, 2.0]}
+
+        diff = json.loads(self.post("/operation", {"equation": "x^3", "operation": "diff"}).body)
+        assert diff["result"] == "3*x**2"
+
+        area = json.loads(self.post("/operation", {"equation": "4 - x^2", "operation": "area"}).body)
+        assert area["exact"] == "32/3"
+
+        stationary = json.loads(self.post("/operation", {"equation": "x^2 - 4", "operation": "stationary"}).body)
+        assert stationary["minima"] == [[0.0, -4.0]]
+
+        # A repeated request is answered from the result store
+        self.post("/operation", {"equation": "x^2 - 4", "operation": "solve"})
+        assert self.service.store.stats()["hits"] >= 1
+
+    def test_bad_requests(self):
+        assert self.post("/operation", {"equation": "2x +", "operation": "solve"}).code == 400
+        assert self.post("/operation", {"equation": "x", "operation": "explode"}).code == 400
+        assert self.post("/plot", {"equation": "x", "viewport": [5, -5, -5, 5, 10, 10]}).code == 400
+        response = self.fetch("/plot", method="POST", body="not json", raise_error=False)
+        assert response.code == 400
+        assert "error" in json.loads(response.body)
+
+        # Too deeply nested for the parser, which fails in the worker rather than the service
+        nested = "(" * 500 + "x" + ")" * 500
+        assert self.post("/plot", {"equation": nested, "format": "points"}).code == 400
+
+    @gen_test(timeout=30)
+    async def test_slow_parse_times_out_without_blocking_others(self):
+        # Parsing this alone takes far longer than the request's budget
+        slow = self.http_client.fetch(
+            self.get_url("/plot"), method="POST", raise_error=False,
+            body=json.dumps({"equation": "y=99^99^9", "format": "points", "timeout": 2}),
+        )
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        # The service keeps answering while the worker is busy parsing
+        while not json.loads((await self.http_client.fetch(self.get_url("/stats"))).body)["running"]:
+            await asyncio.sleep(0.01)
+        answered = loop.time()
+        await self.http_client.fetch(self.get_url("/stats"))
+        assert loop.time() - answered < 0.5 and answered - started < 1.5
+
+        response = await slow
+        assert response.code == 504
+        assert self.service.pool.timeouts == 1
+
+    @gen_test(timeout=30)
+    async def test_identical_requests_share_one_computation(self):
+        request = {"equation": "sinx", "format": "png", "viewport": [-3, 3, -2, 2, 120, 90]}
+        bodies = await asyncio.gather(*(self.service.plot(dict(request)) for _ in range(4)))
+        assert len({body for _, body in bodies}) == 1
+        # The parse and the plot are each shared
+        assert self.service.coalesced == 6
+        assert not self.service.in_flight
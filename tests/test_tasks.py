@@ -0,0 +1,73 @@
+import operator
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from tasks import Task, TaskError, TaskTimeout, TaskCancelled, Worker, run, time_limit
+from operations import stationary_summary
+
+
+def test_run_returns_result():
+    assert run(operator.add, (1, 2)) == 3
+
+
+def test_sympy_operation_in_worker():
+    result = run(stationary_summary, ("quadratic", (1, 0, 0), "x"))
+    assert "Minimum" in result
+
+
+def test_timeout_stops_task():
+    task = Task(time.sleep, (5,), timeout=0.2).start()
+    with pytest.raises(TaskTimeout):
+        task.wait()
+    assert not task.process.is_alive()
+
+
+def test_cancel_stops_task():
+    task = Task(time.sleep, (5,)).start()
+    task.cancel()
+    assert task.poll()
+    with pytest.raises(TaskCancelled):
+        task.result()
+    assert not task.process.is_alive()
+
+
+def test_error_is_reported():
+    with pytest.raises(TaskError, match="ZeroDivisionError"):
+        run(operator.truediv, (1, 0))
+
+
+def test_worker_keeps_its_process_between_calls():
+    worker = Worker(time.sleep, timeout=0.5)
+    try:
+        assert worker.submit((0,)).wait() is None
+        process = worker.process
+        assert worker.submit((0,)).wait() is None
+        assert worker.process is process
+
+        # An overrunning call stops the process, and the next call starts another
+        with pytest.raises(TaskTimeout):
+            worker.submit((5,)).wait()
+        assert not process.is_alive()
+        assert worker.submit((0,)).wait() is None
+    finally:
+        worker.close()
+
+
+def test_time_limit_stops_python_code():
+    def spin():
+        while True:
+            try:
+                sum(range(1000))
+            except Exception:
+                pass
+
+    started = time.perf_counter()
+    with pytest.raises(TaskTimeout):
+        with time_limit(0.1):
+            spin()
+    assert time.perf_counter() - started < 1